@@ -0,0 +1,197 @@
+"""
+Response compression negotiated from `Accept-Encoding`.
+
+  - gzip is always available, `br` and `zstd` when the `brotli` / `zstandard`
+    packages are installed; among the encodings the client accepts with the
+    highest q-value the first of settings.RESPONSE_COMPRESSION["ENCODINGS"]
+    is used
+  - Only GET/HEAD responses with a textual content type are compressed. Bodies
+    under MIN_SIZE bytes are sent as is, streaming responses are compressed
+    chunk by chunk and flushed after every chunk so they stay incremental
+  - Responses of other methods are never compressed: login and token responses
+    carry secrets next to request data (BREACH)
+  - A response may set `cache_compressed`, called with the response once it
+    is compressed so a cache can serve the body later without compressing it
+    again (see article.cache)
+"""
+import gzip
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+)
+
+SAFE_METHODS = ("GET", "HEAD")
+
+accept_encoding_re = _lazy_re_compile(
+    r"^\s*([^\s;]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$"
+)
+
+
+class GzipCodec:
+    name = "gzip"
+
+    def __init__(self, options):
+        self.level = options["GZIP_LEVEL"]
+
+    def compress(self, data):
+        # A fixed mtime keeps the output, and so cached bodies, deterministic
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def stream(self, chunks):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+class BrotliCodec:
+    name = "br"
+
+    def __init__(self, options):
+        self.quality = options["BROTLI_QUALITY"]
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.quality)
+
+    def stream(self, chunks):
+        compressor = brotli.Compressor(quality=self.quality)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class ZstdCodec:
+    name = "zstd"
+
+    def __init__(self, options):
+        self.level = options["ZSTD_LEVEL"]
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self, chunks):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+CODECS = {"gzip": GzipCodec}
+if brotli is not None:
+    CODECS["br"] = BrotliCodec
+if zstandard is not None:
+    CODECS["zstd"] = ZstdCodec
+
+
+def parse_accept_encoding(header):
+    """
+    Returns {coding: q-value} of an Accept-Encoding header.
+    """
+    accepted = {}
+    for item in header.split(","):
+        match = accept_encoding_re.match(item)
+        if not match:
+            continue
+        try:
+            quality = float(match[2]) if match[2] is not None else 1.0
+        except ValueError:
+            continue
+        accepted[match[1].lower()] = quality
+    return accepted
+
+
+def negotiate(request):
+    """
+    Returns the codec to compress the response to `request` with, or None.
+    """
+    if request.method not in SAFE_METHODS:
+        return None
+    accepted = parse_accept_encoding(request.headers.get("Accept-Encoding", ""))
+    default = accepted.get("*", 0)
+    options = settings.RESPONSE_COMPRESSION
+    best, best_quality = None, 0
+    for name in options["ENCODINGS"]:
+        quality = accepted.get(name, default)
+        if name in CODECS and quality > best_quality:
+            best, best_quality = name, quality
+    return CODECS[best](options) if best else None
+
+
+def is_compressible(response):
+    content_type = response.get("Content-Type", "").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def weaken_etag(response):
+    # The compressed body is another representation, as in GZipMiddleware
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response["ETag"] = "W/" + etag
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.compress(request, response)
+
+    def compress(self, request, response):
+        if response.status_code in (204, 304) or not is_compressible(response):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.has_header("Content-Encoding"):
+            return response
+        codec = negotiate(request)
+        if codec is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                # Async iterators (ASGI only) are sent as is
+                return response
+            response.streaming_content = codec.stream(response.streaming_content)
+            del response["Content-Length"]
+        else:
+            if len(response.content) < settings.RESPONSE_COMPRESSION["MIN_SIZE"]:
+                return response
+            compressed = codec.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        weaken_etag(response)
+        response["Content-Encoding"] = codec.name
+        cache_compressed = getattr(response, "cache_compressed", None)
+        if cache_compressed is not None and not response.streaming:
+            cache_compressed(response)
+        return response
@@ -0,0 +1,165 @@
+"""
+Routes the reads of safe requests to read replicas.
+
+Replicas are the DATABASES aliases listed in settings.DATABASE_REPLICAS.
+  - `ReplicaRoutingMiddleware` marks GET/HEAD/OPTIONS requests as replica
+    readable, everything else uses `default`. Safe views must not write: their
+    reads would not see their own writes
+  - Read-your-writes: after a successful write a client (identified by its
+    Authorization header, session or address) reads from the primary for
+    DATABASE_REPLICA_STICKY_SECONDS. The marker is kept in the Django cache,
+    the client's next request may reach another worker: without a shared
+    cache (settings.CACHE_SHARED) every read goes to the primary
+  - `replica_lag` measures each replica's replication lag at most every
+    DATABASE_REPLICA_LAG_CHECK_INTERVAL seconds per process; replicas that are
+    unreachable or behind by more than DATABASE_REPLICA_MAX_LAG seconds are
+    skipped, with none left reads fall back to the primary
+"""
+import contextvars
+import hashlib
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# True while the current request may read from a replica
+replica_reads = contextvars.ContextVar("replica_reads", default=False)
+# Alias of the replica that served a read in the current request, if any
+replica_used = contextvars.ContextVar("replica_used", default=None)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+LAG_QUERY = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class ReplicaLag:
+    """
+    Per-process cache of the replication lag (seconds) of every replica.
+    None means the replica could not be reached.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked = {}
+
+    def measure(self, alias):
+        connection = connections[alias]
+        try:
+            if connection.vendor != "postgresql":
+                # No replication status to read, only check it answers
+                connection.ensure_connection()
+                return 0.0
+            with connection.cursor() as cursor:
+                cursor.execute(LAG_QUERY)
+                lag = cursor.fetchone()[0]
+            return float(lag or 0)
+        except DatabaseError:
+            return None
+
+    def get(self, alias):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.checked.get(alias)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        lag = self.measure(alias)
+        with self.lock:
+            self.checked[alias] = (now + settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL, lag)
+        return lag
+
+    def is_usable(self, alias):
+        lag = self.get(alias)
+        return lag is not None and lag <= settings.DATABASE_REPLICA_MAX_LAG
+
+    def clear(self):
+        with self.lock:
+            self.checked.clear()
+
+    def stats(self):
+        with self.lock:
+            checked = dict(self.checked)
+        return {
+            alias: {
+                "lag": checked[alias][1] if alias in checked else None,
+                "usable": alias in checked
+                and checked[alias][1] is not None
+                and checked[alias][1] <= settings.DATABASE_REPLICA_MAX_LAG,
+            }
+            for alias in settings.DATABASE_REPLICAS
+        }
+
+
+replica_lag = ReplicaLag()
+
+
+class ReplicaRouter:
+    """
+    Sends reads to a usable replica when the request allows it, everything
+    else to `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not replica_reads.get() or not settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        alias = replica_used.get()
+        if alias is None or not replica_lag.is_usable(alias):
+            usable = [
+                alias for alias in settings.DATABASE_REPLICAS if replica_lag.is_usable(alias)
+            ]
+            if not usable:
+                return DEFAULT_DB_ALIAS
+            # One replica per request, so its reads see a single snapshot
+            alias = random.choice(usable)
+            replica_used.set(alias)
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+def sticky_key(request):
+    identity = (
+        request.headers.get("Authorization")
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get("REMOTE_ADDR", "")
+    )
+    return "db-sticky:" + hashlib.md5(identity.encode()).hexdigest()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets safe requests read from replicas, and pins clients to the primary
+    for a short while after they wrote.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS or not settings.CACHE_SHARED:
+            return self.get_response(request)
+
+        key = sticky_key(request)
+        safe = request.method in SAFE_METHODS
+        reads = replica_reads.set(safe and not cache.get(key))
+        used = replica_used.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads.reset(reads)
+            replica_used.reset(used)
+        if not safe and response.status_code < 400:
+            cache.set(key, True, settings.DATABASE_REPLICA_STICKY_SECONDS)
+        return response
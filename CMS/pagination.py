@@ -1,14 +1,303 @@
+import hashlib
+import json
+from base64 import b64decode, b64encode
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_CACHED = "cached"
+COUNT_NONE = "none"
+COUNT_STRATEGIES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_CACHED)
+
+
+def planner_count(queryset):
+    """
+    Returns the Postgres planner row estimate for a queryset, or None when the
+    backend has no planner statistics.
+      - Unfiltered querysets read `pg_class.reltuples` for the table
+      - Filtered querysets use the row estimate of `EXPLAIN`
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where and not queryset.query.distinct:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 (or 0) until the table has been analyzed
+            if row and row[0] > 0:
+                return int(row[0])
+
+        sql, params = queryset.order_by().values("pk").query.sql_with_params()
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_queryset(queryset, strategy, cache_key=None):
+    """
+    Counts a queryset with the given strategy.
+    Returns (count, strategy_used); the used strategy differs from the requested
+    one when it is unavailable (no planner estimate, no cache key) or when the
+    estimate is small enough that an exact COUNT is cheap.
+    """
+    if strategy == COUNT_ESTIMATE:
+        estimate = planner_count(queryset)
+        if estimate is not None and estimate >= settings.PAGINATION_COUNT_EXACT_BELOW:
+            return estimate, COUNT_ESTIMATE
+
+    if strategy == COUNT_CACHED and cache_key:
+        count = cache.get(cache_key)
+        if count is None:
+            count = queryset.count()
+            cache.set(cache_key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count, COUNT_CACHED
+
+    return queryset.count(), COUNT_EXACT
+
+
+class ProbedPage(Page):
+    """
+    Page whose neighbours are known from the rows read, not from the count.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self.next_exists = has_next
+
+    def has_next(self):
+        return self.next_exists
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class CountStrategyPaginator(Paginator):
+    """
+    Django paginator whose `count` is resolved by the pagination count strategy.
+    An estimated or cached count may be off, so it is only reported: pages are
+    then read with one row more than their size, which tells whether a next
+    page exists, and a page past the last row is invalid.
+    """
+
+    def __init__(self, object_list, per_page, counter, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.counter = counter
+
+    @cached_property
+    def counted(self):
+        # (count, strategy used)
+        return self.counter(self.object_list)
+
+    @property
+    def count(self):
+        return self.counted[0]
+
+    def page(self, number):
+        if self.counted[1] == COUNT_EXACT:
+            return super().page(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().page(number)
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_("That page contains no results"))
+        return ProbedPage(
+            rows[: self.per_page], number, self, has_next=len(rows) > self.per_page
+        )
+
 
 class CustomPagination(pagination.PageNumberPagination):
+    """
+    Page number pagination with an opt-in keyset (cursor) mode.
+      - `?pagination=cursor` (or any `?cursor=`) pages on `-id` with
+        `WHERE id < last_id` instead of OFFSET
+      - `?count=exact|estimate|cached` picks how `count` is computed, the
+        strategy actually used is returned as `count_strategy`. Only an exact
+        count decides which pages exist, see CountStrategyPaginator
+      - In cursor mode `count` defaults to the estimate, `?count=none` drops it.
+        Cursors only page on `-id`, so `?ordering=` and a ranked article
+        `?search=` are rejected in cursor mode
+      - `page_size` is capped at PAGINATION_MAX_PAGE_SIZE, see CMS.streaming for
+        reading every row
+    """
+
     page_size = 10
     page_size_query_param = "page_size"
+    mode_query_param = "pagination"
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    cursor_mode = False
+    count_strategy_used = None
+
+    @property
+    def max_page_size(self):
+        return settings.PAGINATION_MAX_PAGE_SIZE
+
+    def django_paginator_class(self, object_list, per_page):
+        return CountStrategyPaginator(
+            object_list, per_page, counter=self.count_with_strategy
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.cursor_mode = (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.cursor_query_param in request.query_params
+        )
+        self.count_strategy = self.get_count_strategy(request)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            raise ValidationError(
+                {"ordering": "Cursor pagination pages on -id, use page numbers to order."}
+            )
+        # Ranked by ArticleSearchFilter, which cursors would drop
+        if "-search_rank" in queryset.query.order_by:
+            raise ValidationError(
+                {
+                    api_settings.SEARCH_PARAM: "Cursor pagination pages on -id, "
+                    "use page numbers for results ranked by relevance."
+                }
+            )
+        return self.paginate_cursor_queryset(queryset, request)
+
+    def get_count_strategy(self, request):
+        requested = request.query_params.get(self.count_query_param)
+        if requested in COUNT_STRATEGIES:
+            return requested
+        if self.cursor_mode:
+            return COUNT_NONE if requested == COUNT_NONE else COUNT_ESTIMATE
+        return settings.PAGINATION_COUNT_STRATEGY
+
+    def get_count_cache_key(self, request):
+        """
+        Cache key built from the path and the filter params, ignoring the
+        params that only select a page.
+        """
+        ignored = {
+            self.page_query_param,
+            self.page_size_query_param,
+            self.mode_query_param,
+            self.cursor_query_param,
+            self.count_query_param,
+        }
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            if key not in ignored
+            for value in values
+            if value != ""
+        )
+        raw = request.path + "?" + urlencode(params)
+        return "pagination-count:" + hashlib.md5(raw.encode()).hexdigest()
+
+    def count_with_strategy(self, queryset):
+        count, self.count_strategy_used = count_queryset(
+            queryset, self.count_strategy, self.get_count_cache_key(self.request)
+        )
+        return count, self.count_strategy_used
+
+    def resolve_count(self, queryset):
+        if self.count_strategy == COUNT_NONE:
+            return None
+        return self.count_with_strategy(queryset)[0]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            direction, last_id = b64decode(encoded.encode("ascii")).decode().split(":")
+            if direction not in ("n", "p"):
+                raise ValueError(direction)
+            return direction == "p", int(last_id)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, reverse, last_id):
+        direction = "p" if reverse else "n"
+        encoded = b64encode(f"{direction}:{last_id}".encode()).decode("ascii")
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def paginate_cursor_queryset(self, queryset, request):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        reverse, last_id = self.decode_cursor(request)
+        self.queryset = queryset
+        if reverse:
+            rows = list(queryset.filter(id__gt=last_id).order_by("id")[: page_size + 1])
+            self.has_previous = len(rows) > page_size
+            self.has_next = True
+            rows = list(reversed(rows[:page_size]))
+        else:
+            if last_id is not None:
+                queryset = queryset.filter(id__lt=last_id)
+            rows = list(queryset.order_by("-id")[: page_size + 1])
+            self.has_next = len(rows) > page_size
+            self.has_previous = last_id is not None
+            rows = rows[:page_size]
+
+        self.rows = rows
+        return rows
+
+    def get_count(self):
+        if not self.cursor_mode:
+            return self.page.paginator.count
+        return self.resolve_count(self.queryset)
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next or not self.rows:
+            return None
+        return self.encode_cursor(False, self.rows[-1].pk)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.has_previous or not self.rows:
+            return None
+        return self.encode_cursor(True, self.rows[0].pk)
 
     def get_paginated_response(self, data):
+        count = self.get_count()
         return {
-            "count": self.page.paginator.count,
+            "count": count,
+            "count_strategy": self.count_strategy_used,
             "next": self.get_next_link(),
             "previous": self.get_previous_link(),
             "results": data,
-        }
\ No newline at end of file
+        }
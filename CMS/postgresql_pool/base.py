@@ -0,0 +1,148 @@
+"""
+PostgreSQL backend that hands out connections from a per-process pool.
+
+Django opens a connection on first use in a request and closes it when the
+request ends (CONN_MAX_AGE = 0). With this backend "closing" returns the
+connection to a psycopg2_pool pool instead of tearing it down, so requests
+reuse warm connections. Pools are keyed by process id, which keeps them safe
+with pre-fork servers: each worker builds its own pool after the fork.
+
+Configured through DATABASES[alias]["POOL"]:
+    MIN_SIZE      connections opened when the pool is created
+    MAX_SIZE      hard limit of connections checked out at once
+    IDLE_TIMEOUT  seconds an idle connection is kept
+    TIMEOUT       seconds to wait for a free connection before failing
+"""
+import os
+import threading
+import time
+
+import psycopg2
+import psycopg2.extras
+import psycopg2_pool
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+DEFAULT_POOL_OPTIONS = {
+    "MIN_SIZE": 1,
+    "MAX_SIZE": 10,
+    "IDLE_TIMEOUT": 600,
+    "TIMEOUT": 5,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool(psycopg2_pool.ThreadSafeConnectionPool):
+    """
+    Thread safe pool that opens connections through `connect` and waits up to
+    `timeout` seconds for a free slot instead of failing right away.
+    """
+
+    def __init__(self, connect, timeout=0, **kwargs):
+        self.connect = connect
+        self.timeout = timeout
+        self.waits = 0
+        self.exhausted = 0
+        super().__init__(**kwargs)
+
+    def _connect(self, for_immediate_use=False):
+        conn = self.connect()
+        if for_immediate_use:
+            self.connections_in_use.add(conn)
+        else:
+            self.return_times[conn] = psycopg2_pool.uptime()
+            self.idle_connections.append(conn)
+        return conn
+
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                with self.lock:
+                    conn = super().getconn()
+                    # The base pool only tracks freshly opened connections as in use
+                    self.connections_in_use.add(conn)
+                    return conn
+            except psycopg2_pool.PoolError:
+                if time.monotonic() >= deadline:
+                    with self.lock:
+                        self.exhausted += 1
+                    raise
+                with self.lock:
+                    self.waits += 1
+                time.sleep(0.01)
+
+    def stats(self):
+        with self.lock:
+            in_use = len(self.connections_in_use)
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "in_use": in_use,
+                "idle": len(self.idle_connections),
+                "utilisation": round(in_use / self.maxconn, 3),
+                "waits": self.waits,
+                "exhausted": self.exhausted,
+            }
+
+
+def get_pool(alias, connect, options):
+    key = (alias, os.getpid())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            options = {**DEFAULT_POOL_OPTIONS, **options}
+            pool = ConnectionPool(
+                connect,
+                timeout=options["TIMEOUT"],
+                minconn=options["MIN_SIZE"],
+                maxconn=options["MAX_SIZE"],
+                idle_timeout=options["IDLE_TIMEOUT"],
+            )
+            _pools[key] = pool
+        return pool
+
+
+def pool_stats():
+    """
+    Returns the stats of the pools owned by the current process.
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        pools = {alias: pool for (alias, owner), pool in _pools.items() if owner == pid}
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_pool(self, conn_params):
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+
+        def connect():
+            connection = psycopg2.connect(**conn_params)
+            if isolation_level is not None:
+                connection.isolation_level = IsolationLevel(isolation_level)
+            psycopg2.extras.register_default_jsonb(
+                conn_or_curs=connection, loads=lambda x: x
+            )
+            return connection
+
+        return get_pool(self.alias, connect, self.settings_dict.get("POOL", {}))
+
+    def get_new_connection(self, conn_params):
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        self.isolation_level = IsolationLevel(
+            IsolationLevel.READ_COMMITTED if isolation_level is None else isolation_level
+        )
+        try:
+            return self.get_pool(conn_params).getconn()
+        except psycopg2_pool.PoolError as e:
+            raise psycopg2.OperationalError(str(e)) from e
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            # putconn() rolls back open transactions and drops broken connections
+            self.get_pool(self.get_connection_params()).putconn(self.connection)
@@ -0,0 +1,68 @@
+"""
+JSON renderer and parser backed by orjson.
+
+Drop-in replacements for DRF's JSONRenderer/JSONParser (see REST_FRAMEWORK
+in settings), producing the same bytes for the compact UTF-8 output DRF is
+configured for:
+  - datetime, date, time and UUID values are encoded natively, aware UTC
+    datetimes end with `Z` like DRF's encoder
+  - Other types (Decimal, lazy strings, timedelta, querysets...) go through
+    DRF's JSONEncoder.default
+  - Indented or ASCII-only output (browsable API, `; indent=` media types,
+    COMPACT_JSON/UNICODE_JSON turned off), payloads orjson cannot encode
+    (integers over 64 bits) and bodies it cannot parse are handed to the
+    stdlib implementation, so behaviour and error messages stay the same
+  - Unlike STRICT_JSON, NaN and infinite floats render as null
+"""
+import io
+
+import orjson
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+_encoder = JSONEncoder()
+
+
+def dumps(data):
+    return orjson.dumps(data, default=_encoder.default, option=OPTIONS)
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = dumps(data)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped by DRF too, they are line terminators in JavaScript
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 from pathlib import Path
 import os
 import environ
+from django.core.exceptions import ImproperlyConfigured
 from datetime import timedelta
 
 env = environ.Env()
@@ -53,6 +54,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "CMS.compression.CompressionMiddleware",
+    "CMS.db_router.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -97,6 +100,78 @@ DATABASES = {
     }
 }
 
+# Connection management, DATABASE_CONN_MODE:
+#   request     open and close a connection in every request (default)
+#   persistent  keep the connection of each worker thread for DATABASE_CONN_MAX_AGE
+#               seconds, checked before reuse (WSGI only)
+#   pooled      per-process pool of DATABASE_POOL_MIN_SIZE..DATABASE_POOL_MAX_SIZE
+#               connections (PostgreSQL only), safe under WSGI and ASGI
+DATABASE_CONN_MODE = env("DATABASE_CONN_MODE", default="request")
+SERVER_INTERFACE = os.environ.get("SERVER_INTERFACE", "wsgi")
+
+if DATABASE_CONN_MODE == "persistent":
+    if SERVER_INTERFACE == "asgi":
+        raise ImproperlyConfigured(
+            "Persistent connections are not safe under ASGI, use DATABASE_CONN_MODE=pooled."
+        )
+    DATABASES["default"]["CONN_MAX_AGE"] = env.int("DATABASE_CONN_MAX_AGE", default=60)
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+elif DATABASE_CONN_MODE == "pooled":
+    if "postgresql" not in (DATABASES["default"]["ENGINE"] or ""):
+        raise ImproperlyConfigured("DATABASE_CONN_MODE=pooled requires PostgreSQL.")
+    DATABASES["default"]["ENGINE"] = "CMS.postgresql_pool"
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["POOL"] = {
+        "MIN_SIZE": env.int("DATABASE_POOL_MIN_SIZE", default=1),
+        "MAX_SIZE": env.int("DATABASE_POOL_MAX_SIZE", default=10),
+        "IDLE_TIMEOUT": env.int("DATABASE_POOL_IDLE_TIMEOUT", default=600),
+        "TIMEOUT": env.int("DATABASE_POOL_TIMEOUT", default=5),
+    }
+elif DATABASE_CONN_MODE != "request":
+    raise ImproperlyConfigured(f"Unknown DATABASE_CONN_MODE {DATABASE_CONN_MODE!r}.")
+
+# Read replicas, DATABASE_REPLICA_HOSTS=host[:port],... are copies of `default`
+# (same credentials and connection mode) on other hosts. GET requests read from
+# them, see CMS.db_router
+DATABASE_REPLICAS = []
+for index, replica in enumerate(env.list("DATABASE_REPLICA_HOSTS", default=[]), 1):
+    host, _, port = replica.partition(":")
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ["CMS.db_router.ReplicaRouter"]
+# Seconds a client reads from the primary after a write (read-your-writes)
+DATABASE_REPLICA_STICKY_SECONDS = env.int("DATABASE_REPLICA_STICKY_SECONDS", default=5)
+# Replicas lagging more than MAX_LAG seconds are skipped, lag is re-checked
+# every LAG_CHECK_INTERVAL seconds per process
+DATABASE_REPLICA_MAX_LAG = env.float("DATABASE_REPLICA_MAX_LAG", default=5)
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = env.float(
+    "DATABASE_REPLICA_LAG_CHECK_INTERVAL", default=2
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+# Whether all server processes read the same cache. Local memory is a copy per
+# process, the article response cache would keep serving what another worker
+# changed, so it is turned off unless CACHE_URL points to a shared cache (Redis)
+PER_PROCESS_CACHES = [
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+]
+CACHE_SHARED = env.bool(
+    "CACHE_SHARED", default=CACHES["default"]["BACKEND"] not in PER_PROCESS_CACHES
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -149,16 +224,75 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "article.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # orjson based JSON, same output as DRF's JSONRenderer/JSONParser
+    "DEFAULT_RENDERER_CLASSES": [
+        "CMS.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "CMS.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 AUTH_USER_MODEL = "article.User"
 
+AUTHENTICATION_BACKENDS = ["article.hashing.PooledModelBackend"]
+
+# Password hashing runs on a per-process pool of WORKERS threads with QUEUE_SIZE
+# waiting slots; a full queue answers 429, a wait over TIMEOUT seconds 503
+PASSWORD_HASHING = {
+    "WORKERS": env.int("PASSWORD_HASHING_WORKERS", default=2),
+    "QUEUE_SIZE": env.int("PASSWORD_HASHING_QUEUE_SIZE", default=8),
+    "TIMEOUT": env.float("PASSWORD_HASHING_TIMEOUT", default=5),
+    "RETRY_AFTER": env.int("PASSWORD_HASHING_RETRY_AFTER", default=2),
+}
+
+# Background jobs (article.jobs) run by `manage.py run_jobs` on CONCURRENCY
+# threads; failures retry after RETRY_BACKOFF * 2 ** (attempt - 1) seconds
+JOB_QUEUE = {
+    "CONCURRENCY": env.int("JOB_QUEUE_CONCURRENCY", default=2),
+    "POLL_INTERVAL": env.float("JOB_QUEUE_POLL_INTERVAL", default=1),
+    "MAX_ATTEMPTS": env.int("JOB_QUEUE_MAX_ATTEMPTS", default=5),
+    "RETRY_BACKOFF": env.float("JOB_QUEUE_RETRY_BACKOFF", default=5),
+    "RETRY_BACKOFF_MAX": env.float("JOB_QUEUE_RETRY_BACKOFF_MAX", default=600),
+    # A job running longer than this is assumed to have lost its worker
+    "STALE_AFTER": env.int("JOB_QUEUE_STALE_AFTER", default=3600),
+    # Finished jobs are kept this many seconds
+    "KEEP_DONE": env.int("JOB_QUEUE_KEEP_DONE", default=86400),
+}
+
+# Response compression (CMS.compression): the first of ENCODINGS the client
+# accepts, br and zstd need the brotli/zstandard packages; smaller bodies than
+# MIN_SIZE bytes are not worth compressing
+RESPONSE_COMPRESSION = {
+    "ENCODINGS": env.list(
+        "RESPONSE_COMPRESSION_ENCODINGS", default=["br", "zstd", "gzip"]
+    ),
+    "MIN_SIZE": env.int("RESPONSE_COMPRESSION_MIN_SIZE", default=1024),
+    "GZIP_LEVEL": env.int("RESPONSE_COMPRESSION_GZIP_LEVEL", default=6),
+    "BROTLI_QUALITY": env.int("RESPONSE_COMPRESSION_BROTLI_QUALITY", default=5),
+    "ZSTD_LEVEL": env.int("RESPONSE_COMPRESSION_ZSTD_LEVEL", default=3),
+}
+
+# List endpoint counts: "exact", "estimate" (Postgres planner estimate) or
+# "cached" (exact count cached per filter querystring)
+PAGINATION_COUNT_STRATEGY = env("PAGINATION_COUNT_STRATEGY", default="exact")
+PAGINATION_COUNT_CACHE_TIMEOUT = env.int("PAGINATION_COUNT_CACHE_TIMEOUT", default=60)
+# Estimates below this many rows are replaced by an exact count
+PAGINATION_COUNT_EXACT_BELOW = env.int("PAGINATION_COUNT_EXACT_BELOW", default=1000)
+# Larger ?page_size values are capped, ?stream=true returns every row instead
+PAGINATION_MAX_PAGE_SIZE = env.int("PAGINATION_MAX_PAGE_SIZE", default=100)
+# Rows fetched and serialized per chunk by ?stream=true
+PAGINATION_STREAM_CHUNK_SIZE = env.int("PAGINATION_STREAM_CHUNK_SIZE", default=500)
+
 # CSRF_TRUSTED_ORIGINS = [
 #     "http://localhost:8000",
 #     "http://127.0.0.1:8000",
@@ -193,8 +327,26 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_LIFETIME': timedelta(days=30),
     'SLIDING_TOKEN_REFRESH_LIFETIME_LATE_USER': timedelta(days=7),
     'SLIDING_TOKEN_LIFETIME_LATE_USER': timedelta(days=30),
+    'TOKEN_OBTAIN_SERIALIZER': 'article.authentication.ClaimsTokenObtainPairSerializer',
 }
 
+# Authenticated JWT users are cached per process for TIMEOUT seconds, SHARED
+# also keeps them in the default cache for the other workers
+JWT_USER_CACHE = {
+    "MAX_SIZE": env.int("JWT_USER_CACHE_MAX_SIZE", default=1024),
+    "TIMEOUT": env.int("JWT_USER_CACHE_TIMEOUT", default=30),
+    "SHARED": env.bool("JWT_USER_CACHE_SHARED", default=False),
+}
+# Authorise tokens carrying role/is_active/token_version claims from the claims,
+# the user row is only loaded when a view reads another attribute
+JWT_CLAIMS_USER = env.bool("JWT_CLAIMS_USER", default=True)
+
+# Seconds a cached article list/detail response is kept, writes invalidate earlier
+ARTICLE_RESPONSE_CACHE_TIMEOUT = env.int("ARTICLE_RESPONSE_CACHE_TIMEOUT", default=300)
+
+# Most articles accepted by one request to the batch endpoints
+ARTICLE_BATCH_MAX_SIZE = env.int("ARTICLE_BATCH_MAX_SIZE", default=100)
+
 SWAGGER_SETTINGS = {
     "DEFAULT_INFO": f"{ROOT_URLCONF}.api_info",
     "SECURITY_DEFINITIONS": {
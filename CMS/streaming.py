@@ -0,0 +1,160 @@
+"""
+Streaming of list endpoints.
+
+  - `?stream=true` on a list endpoint returns every matching row in the usual
+    JSON envelope instead of one page
+  - The `export` actions write the rows as NDJSON or CSV, ordered by id, and
+    resume after `?since_id=`
+
+Rows are read with `QuerySet.iterator(chunk_size=...)`, which uses a server-side
+cursor on Postgres, and serialized one chunk at a time, so memory stays flat
+whatever the size of the result. JSON is rendered by the API renderer
+(CMS.renderers.ORJSONRenderer).
+
+The content is generated after the view returned, once ReplicaRoutingMiddleware
+reset its routing state, so the database is picked while the request is still
+being handled and pinned with `using()`.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from CMS.renderers import ORJSONRenderer
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+json_renderer = ORJSONRenderer()
+
+
+def iter_chunks(queryset, chunk_size):
+    chunk = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Echo:
+    """
+    File-like object for csv.writer that returns the line instead of storing it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, cls=DjangoJSONEncoder)
+
+
+def iter_ndjson(rows):
+    for chunk in rows:
+        yield b"".join(json_renderer.render(row) + b"\n" for row in chunk)
+
+
+def iter_csv(rows, header):
+    # The header is written even when there is no row
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for chunk in rows:
+        yield "".join(
+            writer.writerow([csv_value(row.get(name)) for name in header])
+            for row in chunk
+        )
+
+
+class StreamingListMixin:
+    """
+    Streaming list and export support for model viewsets.
+      - `stream_list` answers `?stream=true` with all rows in the envelope:
+        {"success": true, "message": "...", "payload": {"results": [...]}}
+      - `export_list` answers the export actions, `?export_format=ndjson|csv`
+        (`format` is DRF's renderer override) and `?since_id=<last seen id>`
+    """
+
+    stream_query_param = "stream"
+    export_format_query_param = "export_format"
+    since_id_query_param = "since_id"
+
+    def wants_stream(self, request):
+        value = request.query_params.get(self.stream_query_param, "")
+        return value.lower() in ("1", "true")
+
+    def iter_serialized(self, queryset):
+        for chunk in iter_chunks(queryset, settings.PAGINATION_STREAM_CHUNK_SIZE):
+            yield self.get_serializer(chunk, many=True).data
+
+    def pin_database(self, queryset):
+        # Routed now, the generator reads after the routing state is reset
+        return queryset.using(queryset.db)
+
+    def stream_list(self, queryset, message):
+        queryset = self.pin_database(queryset)
+
+        def content():
+            yield b'{"success":true,"message":%s,"payload":{"results":[' % (
+                json_renderer.render(message)
+            )
+            separator = b""
+            for rows in self.iter_serialized(queryset):
+                # The rows of the chunk without the list brackets
+                yield separator + json_renderer.render(rows)[1:-1]
+                separator = b","
+            yield b"]}}"
+
+        return StreamingHttpResponse(content(), content_type="application/json")
+
+    def export_list(self, queryset, filename):
+        params = self.request.query_params
+        export_format = params.get(self.export_format_query_param, "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {
+                    "success": False,
+                    "message": "'export_format' must be one of: "
+                    + ", ".join(EXPORT_FORMATS)
+                    + ".",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.pin_database(queryset.order_by("id"))
+        since_id = params.get(self.since_id_query_param)
+        if since_id:
+            try:
+                queryset = queryset.filter(id__gt=int(since_id))
+            except ValueError:
+                return Response(
+                    {"success": False, "message": "'since_id' must be an integer."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        rows = self.iter_serialized(queryset)
+        if export_format == "csv":
+            header = [
+                name
+                for name, field in self.get_serializer().fields.items()
+                if not field.write_only
+            ]
+            content = iter_csv(rows, header)
+        else:
+            content = iter_ndjson(rows)
+        response = StreamingHttpResponse(
+            content, content_type=EXPORT_FORMATS[export_format]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{filename}.{export_format}"'
+        )
+        return response
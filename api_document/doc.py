@@ -1,5 +1,7 @@
 REGISTER_DOCS = """
     register - API for register new user with user role.
+    - Passwords are hashed on a bounded pool: when it is full the API answers
+      429, when the hash waits too long 503, both with a `Retry-After` header.
 
     ## Role Choice
         ADMIN = "admin", _("Admin")
@@ -35,11 +37,24 @@ REGISTER_DOCS = """
                 "email": "adminuser@yopmail.com"
             }
         }
+
+    # Already Registered Email (400)
+        {
+            "success": false,
+            "message": "adminuser@yopmail.com is already registered, please try different email.",
+            "payload": []
+        }
     """
 
 
 LOGIN_DOCS = """
     login - API for login user.
+    - The tokens carry `role`, `is_active` and `token_version` claims, requests
+      are authorised from them without loading the user row.
+    - Changing a user's role, is_active or is_delete bumps `token_version` and
+      revokes the tokens issued before (401 `token_revoked`), log in again.
+    - Passwords are hashed on a bounded pool: when it is full the API answers
+      429, when the hash waits too long 503, both with a `Retry-After` header.
 
     # Sample Request Data
         {
@@ -76,6 +91,13 @@ LOGIN_DOCS = """
 USER_DOCS = """
     # RetrieveUsers : API for get user list with filter and pagination.
     - `http://localhost:8000/api/users/?page=1&page_size=1&role=viewer`
+    - `http://localhost:8000/api/users/?pagination=cursor&page_size=10`
+      keyset pagination on `-id` for deep pages: follow the `next`/`previous` links,
+      `count` is an estimate (add `&count=none` to drop it).
+    - `http://localhost:8000/api/users/?stream=true`
+      `page_size` is capped at 100 (PAGINATION_MAX_PAGE_SIZE); `stream=true` returns
+      every matching row instead, streamed as `{"payload": {"results": [...]}}`
+      without `count`/`next`/`previous`.
 
     ## Success Response Data
         {
@@ -83,6 +105,7 @@ USER_DOCS = """
             "message": "Users list fetched successfully.",
             "payload": {
                 "count": 5,
+                "count_strategy": "exact",
                 "next": "http://localhost:8000/api/users/?page=2&page_size=2",
                 "previous": null,
                 "results": [
@@ -104,6 +127,12 @@ USER_DOCS = """
             }
         }
 
+    # ExportUsers : API for export all users, only admins are allowed.
+    - `http://localhost:8000/api/users/export/?role=viewer&export_format=csv`
+      same filters and `fields`/`omit` as the list, rows ordered by `id`.
+      `export_format=ndjson` (default, one JSON object per line) or `csv`;
+      `since_id=<last exported id>` resumes an interrupted export.
+
     # GetUser : API for get user by id.
     - `http://localhost:8000/api/users/4/`
 
@@ -152,6 +181,8 @@ USER_DOCS = """
         
     # DeleteUser : API for delete user by id.
     - `http://localhost:8000/api/users/5/`
+    - The user, their articles and comments are hidden at once and their tokens
+      are revoked; the rows are removed later by `manage.py purge_deleted`
 
     ## Success Response Data
         {
@@ -179,8 +210,11 @@ ARTICLE_DOCS = """
                 "id": 6,
                 "title": "article1",
                 "body": "testing article",
+                "excerpt": "testing article",
                 "author": 2,
                 "published": false,
+                "comment_count": 0,
+                "last_commented_at": null,
                 "created_at": "2024-12-23T00:04:04.796664",
                 "updated_at": "2024-12-23T00:04:04.796691"
             }
@@ -188,6 +222,30 @@ ARTICLE_DOCS = """
 
     # RetrieveArticles : API for get list of articles based on pagination and filter
     - `http://localhost:8000/api/articles/?author__email=adminuser@yopmail.com&page=1&page_size=1`
+    - `http://localhost:8000/api/articles/?search=django caching`
+      search matches title/body words through the search index (ranked by relevance)
+      and author username/email/role.
+    - `http://localhost:8000/api/articles/?published=true&count=cached`
+      `count=exact|estimate|cached` picks how `count` is computed, `count_strategy`
+      in the response tells which one was used. `next` and the valid pages come
+      from the rows themselves, an estimated or cached `count` is only informative.
+    - `http://localhost:8000/api/articles/?pagination=cursor&page_size=10`
+      keyset pagination on `-id` for deep pages: follow the `next`/`previous` links,
+      `count` is an estimate (add `&count=none` to drop it). `search` results are
+      ranked by relevance and answer 400 in cursor mode.
+    - `http://localhost:8000/api/articles/?comment_count__gte=5&ordering=-last_commented_at`
+      `comment_count` (exact/gte/lte) and `last_commented_at` (gte/lte/isnull) filters;
+      `ordering` accepts id, created_at, comment_count and last_commented_at (prefix
+      `-` for descending), never commented articles come last. Not available with
+      `pagination=cursor`.
+    - `http://localhost:8000/api/articles/?stream=true`
+      `page_size` is capped at 100 (PAGINATION_MAX_PAGE_SIZE); `stream=true` returns
+      every matching row instead, streamed as `{"payload": {"results": [...]}}`
+      without `count`/`next`/`previous`.
+    - `http://localhost:8000/api/articles/?fields=id,title,excerpt`
+      renders only the listed fields (`?omit=body` drops fields instead), columns of
+      fields left out are not read from the database. `excerpt` is a short preview of
+      `body`. Also supported by GetArticle, the user and the comment endpoints.
 
     ## Success Response Data
         {
@@ -195,6 +253,7 @@ ARTICLE_DOCS = """
             "message": "Articles retrieved successfully.",
             "payload": {
                 "count": 4,
+                "count_strategy": "exact",
                 "next": "http://localhost:8000/api/articles/?author__email=adminuser%40yopmail.com&page=2&page_size=1",
                 "previous": null,
                 "results": [
@@ -202,6 +261,7 @@ ARTICLE_DOCS = """
                         "id": 6,
                         "title": "str2",
                         "body": "string",
+                        "excerpt": "string",
                         "author": 2,
                         "published": false,
                         "created_at": "2024-12-23T00:04:04.796664",
@@ -211,6 +271,20 @@ ARTICLE_DOCS = """
             }
         }
         
+    With a shared cache (CACHE_URL, see CACHE_SHARED), article list and
+    detail responses are cached per role and carry an `ETag`
+    (send it back as `If-None-Match` to get `304 Not Modified`) and an
+    `X-Cache: HIT|MISS` header. With `Accept-Encoding: gzip` (or `br`/`zstd`
+    when installed) bodies over RESPONSE_COMPRESSION_MIN_SIZE bytes are
+    compressed and the `ETag` becomes weak (`W/"..."`), a cache hit sends
+    the stored compressed bytes.
+
+    # ExportArticles : API for export all articles.
+    - `http://localhost:8000/api/articles/export/?published=true&since_id=1200`
+      same filters and `fields`/`omit` as the list, rows ordered by `id`.
+      `export_format=ndjson` (default, one JSON object per line) or `csv`;
+      `since_id=<last exported id>` resumes an interrupted export.
+
     # GetArticle : API for get article by id.
     - `http://localhost:8000/api/articles/5/`
 
@@ -222,6 +296,7 @@ ARTICLE_DOCS = """
                 "id": 5,
                 "title": "string",
                 "body": "string",
+                "excerpt": "string",
                 "author": 2,
                 "published": false,
                 "created_at": "2024-12-23T00:03:10.820392",
@@ -245,6 +320,7 @@ ARTICLE_DOCS = """
                 "id": 5,
                 "title": "string",
                 "body": "string",
+                "excerpt": "string",
                 "author": 2,
                 "published": true,
                 "created_at": "2024-12-23T00:03:10.820392",
@@ -269,6 +345,7 @@ ARTICLE_DOCS = """
                 "id": 5,
                 "title": "string",
                 "body": "string",
+                "excerpt": "string",
                 "author": 2,
                 "published": true,
                 "created_at": "2024-12-23T00:03:10.820392",
@@ -278,12 +355,89 @@ ARTICLE_DOCS = """
         
     # DeleteArticle : API for delete article.
     - `http://localhost:8000/api/articles/6/`
+    - The article and its comments are hidden at once; the rows are removed
+      later by `manage.py purge_deleted`
 
     ## Success Response Data
         {
             "success": true,
             "message": "Article deleted successfully."
         }
+
+    # BatchCreateArticles : API for create up to 100 articles at once (admin, author).
+    - `POST http://localhost:8000/api/articles/batch/`
+      every item is validated first; if any item is invalid nothing is saved and
+      the response is 400 with the result of every item.
+
+    ## Sample Request Data
+        {
+            "articles": [
+                {"title": "article1", "body": "testing article"},
+                {"title": "article2", "body": "testing article"}
+            ]
+        }
+
+    ## Success Response Data
+        {
+            "success": true,
+            "message": "2 articles created successfully.",
+            "payload": {
+                "results": [
+                    {
+                        "index": 0,
+                        "success": true,
+                        "status": 201,
+                        "payload": {"id": 7, "title": "article1", ...}
+                    },
+                    ...
+                ]
+            }
+        }
+
+    # BatchUpdateArticles : API for update up to 100 articles at once.
+    - `PATCH http://localhost:8000/api/articles/batch/`
+      admins can edit any article, authors only their own (`status: 403` per item).
+
+    ## Sample Request Data
+        {
+            "articles": [
+                {"id": 7, "title": "renamed"},
+                {"id": 8, "body": "new body"}
+            ]
+        }
+
+    ## Error Response Data
+        {
+            "success": false,
+            "message": "1 of 2 articles are invalid, nothing was saved.",
+            "payload": {
+                "results": [
+                    {"id": 7, "success": true, "status": 200},
+                    {"id": 8, "success": false, "status": 404, "message": "Article not found."}
+                ]
+            }
+        }
+
+    # BatchPublishArticles : API for publish/unpublish articles at once (admin).
+    - `PATCH http://localhost:8000/api/articles/batch/publish/`
+
+    ## Sample Request Data
+        {
+            "ids": [7, 8],
+            "is_published": true
+        }
+
+    ## Success Response Data
+        {
+            "success": true,
+            "message": "2 articles successfully published.",
+            "payload": {
+                "results": [
+                    {"id": 7, "success": true, "status": 200},
+                    {"id": 8, "success": true, "status": 200}
+                ]
+            }
+        }
     """
 
 
@@ -312,6 +466,16 @@ COMMENT_DOCS = """
 
     # RetrieveComments : API for get list of comment with pagination and filter
     - `http://localhost:8000/api/articles/2/comments/?commenter__username=adminuser&page=1&page_size=1`
+    - `http://localhost:8000/api/articles/2/comments/?pagination=cursor&page_size=10`
+      keyset pagination on `-id` for deep pages: follow the `next`/`previous` links,
+      `count` is an estimate (add `&count=none` to drop it).
+    - `http://localhost:8000/api/articles/2/comments/?stream=true`
+      `page_size` is capped at 100 (PAGINATION_MAX_PAGE_SIZE); `stream=true` returns
+      every matching row instead, streamed as `{"payload": {"results": [...]}}`
+      without `count`/`next`/`previous`.
+    - `http://localhost:8000/api/articles/2/comments/?expand=commenter`
+      embeds the commenter as `{"id", "username", "role"}` instead of the email,
+      also accepted by AddComment, GetComment and UpdateComment.
 
     ## Success Response Data
         {
@@ -319,6 +483,7 @@ COMMENT_DOCS = """
             "message": "Comments retrieved successfully.",
             "payload": {
                 "count": 1,
+                "count_strategy": "exact",
                 "next": null,
                 "previous": null,
                 "results": [
@@ -334,6 +499,12 @@ COMMENT_DOCS = """
             }
         }
         
+    # ExportComments : API for export all comments of an article.
+    - `http://localhost:8000/api/articles/2/comments/export/?export_format=csv`
+      same filters and `fields`/`omit` as the list, rows ordered by `id`.
+      `export_format=ndjson` (default, one JSON object per line) or `csv`;
+      `since_id=<last exported id>` resumes an interrupted export.
+
     # GetComment : API for get comment by id.
     - `http://localhost:8000/api/comments/1/`
 
@@ -377,3 +548,65 @@ COMMENT_DOCS = """
             "message": "Comment deleted successfully."
         }
     """
+
+
+METRICS_DOCS = """
+    # Metrics : API for get runtime metrics, only admins are allowed.
+    - `http://localhost:8000/api/metrics/`
+
+    ## Success Response Data
+        {
+            "success": true,
+            "message": "Metrics fetched successfully.",
+            "payload": {
+                "article_response_cache": {
+                    "hits": 120,
+                    "misses": 14
+                },
+                "database_pools": {
+                    "default": {
+                        "min_size": 1,
+                        "max_size": 10,
+                        "in_use": 2,
+                        "idle": 3,
+                        "utilisation": 0.2,
+                        "waits": 0,
+                        "exhausted": 0
+                    }
+                },
+                "database_replicas": {
+                    "replica_1": {
+                        "lag": 0.4,
+                        "usable": true
+                    }
+                },
+                "job_queue": {
+                    "queued": 4,
+                    "due": 1,
+                    "running": 2,
+                    "failed": 0,
+                    "started_last_5m": 37,
+                    "oldest_due_seconds": 0.8,
+                    "avg_wait_ms": 640.2,
+                    "max_wait_ms": 1210.5
+                },
+                "jwt_user_cache": {
+                    "size": 3,
+                    "max_size": 1024,
+                    "hits": 250,
+                    "misses": 3
+                },
+                "password_hashing": {
+                    "workers": 2,
+                    "queue_size": 8,
+                    "running": 1,
+                    "queued": 0,
+                    "completed": 42,
+                    "rejected": 3,
+                    "timeouts": 0,
+                    "avg_wait_ms": 4.1,
+                    "avg_hash_ms": 310.5
+                }
+            }
+        }
+    """
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from article.forms import UserChangeForm, UserCreationForm
-from .models import User, Article, Comment
+from .models import User, Article, Comment, Job
 from django.contrib.auth import admin as auth_admin
 
 # Register your models here.
@@ -54,3 +54,4 @@ class UserAdmin(auth_admin.UserAdmin):
 
 admin.site.register(Article, ModelField(Article))
 admin.site.register(Comment, ModelField(Comment))
+admin.site.register(Job, ModelField(Job))
@@ -0,0 +1,258 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, models
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+CLAIMS = ("role", "is_active", "token_version")
+
+
+class UserCache:
+    """
+    Bounded in-process LRU of authenticated users.
+      - Entries expire after JWT_USER_CACHE["TIMEOUT"] seconds, which bounds how
+        long other processes can serve a stale role/is_active after a change
+      - With JWT_USER_CACHE["SHARED"] the Django cache is used as a second level
+      - `invalidate` is called from the User post_save/post_delete signals
+    """
+
+    key_prefix = "jwt-user:"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def options(self):
+        return settings.JWT_USER_CACHE
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(user_id)
+                self.hits += 1
+                return copy.copy(entry[1])
+            self.entries.pop(user_id, None)
+
+        user = None
+        if self.options["SHARED"]:
+            user = cache.get(self.key_prefix + str(user_id))
+            if user is not None:
+                self.store_local(user_id, user)
+
+        with self.lock:
+            if user is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return copy.copy(user) if user is not None else None
+
+    def store_local(self, user_id, user):
+        expires_at = time.monotonic() + self.options["TIMEOUT"]
+        with self.lock:
+            self.entries[user_id] = (expires_at, user)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.options["MAX_SIZE"]:
+                self.entries.popitem(last=False)
+
+    def set(self, user_id, user):
+        self.store_local(user_id, user)
+        if self.options["SHARED"]:
+            cache.set(self.key_prefix + str(user_id), user, self.options["TIMEOUT"])
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+        if self.options["SHARED"]:
+            cache.delete(self.key_prefix + str(user_id))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "max_size": self.options["MAX_SIZE"],
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+user_cache = UserCache()
+
+
+class TokenVersionCache:
+    """
+    Current `token_version` per user id in the Django cache, so claims-only
+    authentication can reject revoked tokens without loading the user row.
+    Entries expire after JWT_USER_CACHE["TIMEOUT"] seconds like cached users.
+    """
+
+    key_prefix = "jwt-token-version:"
+
+    def get(self, user_id):
+        """
+        Returns the current version, or None when the user does not exist.
+        """
+        key = self.key_prefix + str(user_id)
+        version = cache.get(key)
+        if version is None:
+            # Read from the primary, a lagging replica would cache a revoked version
+            version = (
+                get_user_model()
+                .objects.using(DEFAULT_DB_ALIAS)
+                .filter(pk=user_id)
+                .values_list("token_version", flat=True)
+                .first()
+            )
+            if version is not None:
+                cache.set(key, version, settings.JWT_USER_CACHE["TIMEOUT"])
+        return version
+
+    def invalidate(self, user_id):
+        cache.delete(self.key_prefix + str(user_id))
+
+
+token_versions = TokenVersionCache()
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the `role`, `is_active` and `token_version` claims,
+    which are copied into the access tokens made from it.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsUser:
+    """
+    Request user built from the token claims.
+      - `id`, `pk`, `role` and `is_active` are read from the token
+      - Any other attribute loads the user row (through `user_cache`) on first use
+      - Compares equal to the User instance with the same pk
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token, loader):
+        self.token = token
+        self.id = self.pk = token[api_settings.USER_ID_CLAIM]
+        self.role = token["role"]
+        self.is_active = token["is_active"]
+        self._loader = loader
+
+    @cached_property
+    def instance(self):
+        return self._loader(self.pk)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.instance, name)
+
+    def __eq__(self, other):
+        if isinstance(other, ClaimsUser):
+            return self.pk == other.pk
+        if isinstance(other, models.Model):
+            return other._meta.label == settings.AUTH_USER_MODEL and other.pk == self.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return str(self.instance)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the token user through `user_cache`
+    instead of querying the user table on every request.
+      - With JWT_CLAIMS_USER, tokens carrying the CLAIMS authenticate as a
+        `ClaimsUser`; only the token version is checked (see TokenVersionCache)
+      - A `token_version` claim older than the user's version is rejected
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        has_claims = all(claim in validated_token for claim in CLAIMS)
+        if has_claims and settings.JWT_CLAIMS_USER:
+            if not validated_token["is_active"]:
+                raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+            version = token_versions.get(user_id)
+            if version is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            self.check_token_version(validated_token, version)
+            return ClaimsUser(validated_token, self.load_user)
+
+        user = self.load_user(user_id)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if user.is_delete:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        if has_claims:
+            self.check_token_version(validated_token, user.token_version)
+        return user
+
+    def load_user(self, user_id):
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.using(DEFAULT_DB_ALIAS).get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(user_id, user)
+        return user
+
+    def check_token_version(self, validated_token, version):
+        if validated_token["token_version"] != version:
+            raise AuthenticationFailed(
+                _("Token has been revoked, please log in again."), code="token_revoked"
+            )
@@ -0,0 +1,392 @@
+"""
+Bulk loading of articles, comments and users from NDJSON or CSV files.
+
+Records are read lazily and handled in batches:
+  - Every record is validated with the API serializer, relations (`author`,
+    `article`, `commenter`) are resolved with one query per batch
+  - Valid rows are written with Postgres `COPY` (ids are reserved from the
+    table sequence first) or with `bulk_create` on other databases
+  - Model signals do not fire, so derived data (article excerpt, search
+    index, comment counts, response cache) is written by the importer itself
+"""
+import csv
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from article.cache import response_cache
+from article.comment_stats import refresh_articles
+from article.models import Article, Comment, User, build_excerpt
+from article.search import index_articles
+from article.serializers import (
+    ArticleSerializer,
+    CommentSerializer,
+    ProvisionUserSerializer,
+)
+
+FILE_FORMATS = ("ndjson", "csv")
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if extension in ("json", "jsonl"):
+        return "ndjson"
+    return extension
+
+
+def read_records(path, file_format):
+    """
+    Yields one dict per NDJSON line or CSV row without loading the file.
+    """
+    with open(path, newline="", encoding="utf-8") as input_file:
+        if file_format == "csv":
+            yield from csv.DictReader(input_file)
+            return
+        for line in input_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def batched(records, batch_size):
+    iterator = iter(records)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def parse_reference(value):
+    """
+    Accepts the shapes produced by the export endpoints for a relation:
+    an id, an email (commenter) or an expanded `{"id": ...}` object.
+    """
+    if isinstance(value, str) and value.startswith("{"):
+        value = json.loads(value)
+    if isinstance(value, dict):
+        value = value.get("id")
+    if value in (None, ""):
+        return None
+    if isinstance(value, str) and not value.isdigit():
+        return value.strip().lower()
+    return int(value)
+
+
+class BaseImporter:
+    """
+    Validates and writes one batch of records at a time.
+    Subclasses build the model rows and list the columns written by COPY.
+    """
+
+    model = None
+    serializer_class = None
+    copy_columns = ()
+    copy_text_columns = ()
+
+    def __init__(self):
+        self.validator = self.serializer_class()
+        self.use_copy = connection.vendor == "postgresql"
+
+    def validate(self, records, first_line):
+        """
+        Returns (rows, errors), errors are (line number, detail) pairs.
+        """
+        rows = []
+        errors = []
+        references = self.load_references(records)
+        for line, record in enumerate(records, first_line):
+            try:
+                data = self.validator.run_validation(record)
+                rows.append(self.build(record, data, references))
+            except serializers.ValidationError as e:
+                errors.append((line, e.detail))
+        return rows, errors
+
+    def load_references(self, records):
+        return {}
+
+    def build(self, record, data, references):
+        raise NotImplementedError
+
+    def write(self, rows):
+        with transaction.atomic():
+            if self.use_copy:
+                self.copy(rows)
+            else:
+                self.model.objects.bulk_create(rows)
+            self.after_write(rows)
+
+    def copy(self, rows):
+        table = self.model._meta.db_table
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+                "FROM generate_series(1, %s)",
+                [table, len(rows)],
+            )
+            for row, (pk,) in zip(rows, cursor.fetchall()):
+                row.pk = pk
+                row.created_at = row.updated_at = now
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow(
+                    [
+                        getattr(row, self.model._meta.get_field(column).attname)
+                        for column in self.copy_columns
+                    ]
+                )
+            buffer.seek(0)
+            columns = ", ".join(
+                connection.ops.quote_name(self.model._meta.get_field(column).column)
+                for column in self.copy_columns
+            )
+            not_null = ", ".join(self.copy_text_columns)
+            cursor.copy_expert(
+                f"COPY {connection.ops.quote_name(table)} ({columns}) FROM STDIN "
+                f"WITH (FORMAT csv, FORCE_NOT_NULL ({not_null}))",
+                buffer,
+            )
+
+    def after_write(self, rows):
+        pass
+
+    def finish(self):
+        pass
+
+
+class ArticleImporter(BaseImporter):
+    """
+    Article records: `title`, `body`, optional `published` and `author`
+    (user id, falls back to the `--author` user).
+    """
+
+    model = Article
+    serializer_class = ArticleSerializer
+    copy_columns = (
+        "id",
+        "title",
+        "body",
+        "excerpt",
+        "author",
+        "published",
+        "is_delete",
+        "comment_count",
+        "created_at",
+        "updated_at",
+    )
+    copy_text_columns = ("title", "body", "excerpt")
+
+    def __init__(self, default_author=None):
+        super().__init__()
+        self.default_author = default_author
+        self.published_field = serializers.BooleanField()
+
+    def load_references(self, records):
+        ids = set()
+        for record in records:
+            try:
+                author = parse_reference(record.get("author"))
+            except (TypeError, ValueError):
+                continue
+            if isinstance(author, int):
+                ids.add(author)
+        return {
+            "authors": set(
+                User.objects.filter(id__in=ids, is_delete=False).values_list(
+                    "id", flat=True
+                )
+            )
+        }
+
+    def build(self, record, data, references):
+        try:
+            author_id = parse_reference(record.get("author"))
+        except (TypeError, ValueError):
+            raise serializers.ValidationError({"author": "Invalid user id."})
+        if author_id is None:
+            if self.default_author is None:
+                raise serializers.ValidationError({"author": "This field is required."})
+            author_id = self.default_author.pk
+        elif author_id not in references["authors"]:
+            raise serializers.ValidationError({"author": f"User {author_id} not found."})
+
+        published = record.get("published")
+        if published in (None, ""):
+            published = False
+        try:
+            published = self.published_field.run_validation(published)
+        except serializers.ValidationError as e:
+            raise serializers.ValidationError({"published": e.detail})
+
+        return Article(
+            title=data["title"],
+            body=data["body"],
+            excerpt=build_excerpt(data["body"]),
+            author_id=author_id,
+            published=published,
+        )
+
+    def after_write(self, rows):
+        index_articles(rows)
+
+    def finish(self):
+        response_cache.invalidate_lists()
+
+
+class CommentImporter(BaseImporter):
+    """
+    Comment records: `body`, `article` (id) and `commenter` (user id or email).
+    """
+
+    model = Comment
+    serializer_class = CommentSerializer
+    copy_columns = ("id", "article", "commenter", "body", "created_at", "updated_at")
+    copy_text_columns = ("body",)
+
+    def load_references(self, records):
+        article_ids, user_ids, emails = set(), set(), set()
+        for record in records:
+            try:
+                article = parse_reference(record.get("article"))
+                commenter = parse_reference(record.get("commenter"))
+            except (TypeError, ValueError):
+                continue
+            if isinstance(article, int):
+                article_ids.add(article)
+            if isinstance(commenter, int):
+                user_ids.add(commenter)
+            elif commenter:
+                emails.add(commenter)
+        users = User.objects.filter(is_delete=False).filter(
+            Q(id__in=user_ids) | Q(email__in=emails)
+        )
+        return {
+            "articles": set(
+                Article.objects.filter(id__in=article_ids, is_delete=False).values_list(
+                    "id", flat=True
+                )
+            ),
+            "users": {
+                key: user_id
+                for user_id, email in users.values_list("id", "email")
+                for key in (user_id, email.lower())
+            },
+        }
+
+    def build(self, record, data, references):
+        try:
+            article_id = parse_reference(record.get("article"))
+            commenter = parse_reference(record.get("commenter"))
+        except (TypeError, ValueError):
+            raise serializers.ValidationError("Invalid article or commenter.")
+        if article_id not in references["articles"]:
+            raise serializers.ValidationError(
+                {"article": f"Article {article_id} not found."}
+            )
+        if commenter not in references["users"]:
+            raise serializers.ValidationError(
+                {"commenter": f"User {commenter} not found."}
+            )
+        return Comment(
+            body=data["body"],
+            article_id=article_id,
+            commenter_id=references["users"][commenter],
+        )
+
+    def after_write(self, rows):
+        article_ids = {row.article_id for row in rows}
+        refresh_articles(article_ids)
+        response_cache.invalidate_articles(article_ids)
+
+
+class UserImporter(BaseImporter):
+    """
+    User records: `email`, `username`, `role`, optional `first_name`,
+    `last_name` and `password` (without one the password is unusable).
+      - Emails/usernames already taken, in the database or earlier in the
+        file, are rejected with one lookup query per batch
+      - Passwords of a batch are hashed in parallel on `hash_workers` threads
+        (hashlib releases the GIL), the slow part of provisioning
+    """
+
+    model = User
+    serializer_class = ProvisionUserSerializer
+    copy_columns = (
+        "id",
+        "password",
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "role",
+        "is_active",
+        "is_staff",
+        "is_superuser",
+        "is_delete",
+        "token_version",
+        "date_joined",
+    )
+    copy_text_columns = (
+        "password",
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "role",
+    )
+
+    def __init__(self, hash_workers=None):
+        super().__init__()
+        self.hash_workers = hash_workers or os.cpu_count() or 1
+        self.seen_emails = set()
+        self.seen_usernames = set()
+
+    def validate(self, records, first_line):
+        rows, errors = super().validate(records, first_line)
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as executor:
+            hashes = executor.map(make_password, [row.password or None for row in rows])
+            for row, password in zip(rows, hashes):
+                row.password = password
+        return rows, errors
+
+    def load_references(self, records):
+        emails = {str(record.get("email") or "") for record in records}
+        usernames = {str(record.get("username") or "") for record in records}
+        taken = User.objects.filter(
+            Q(email__in=emails) | Q(username__in=usernames)
+        ).values_list("email", "username")
+        return {
+            "emails": {email for email, _ in taken},
+            "usernames": {username for _, username in taken},
+        }
+
+    def build(self, record, data, references):
+        email, username = data["email"], data["username"]
+        if email in references["emails"] or email in self.seen_emails:
+            raise serializers.ValidationError(
+                {"email": f"{email} is already registered."}
+            )
+        if username in references["usernames"] or username in self.seen_usernames:
+            raise serializers.ValidationError(
+                {"username": f"{username} is already taken."}
+            )
+        self.seen_emails.add(email)
+        self.seen_usernames.add(username)
+        return User(
+            username=username,
+            email=email,
+            first_name=data.get("first_name") or "",
+            last_name=data.get("last_name") or "",
+            role=data["role"],
+            # Replaced by the hash in validate()
+            password=data.get("password", ""),
+            is_active=True,
+        )
@@ -0,0 +1,191 @@
+import hashlib
+import json
+from functools import partial, wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from CMS.compression import negotiate
+from CMS.db_router import replica_used
+
+
+class ArticleResponseCache:
+    """
+    Read-through cache of article list/detail payloads.
+      - Keys are built from host, path, normalized query params and the caller role
+      - Every key embeds a version number: the list version for list responses
+        and the article version for detail responses. Writes bump the versions,
+        so stale entries are never read again and simply expire
+      - Each entry stores the payload with its ETag. The compressed bodies of
+        an entry are stored next to it, keyed by ETag, media type and encoding
+    """
+
+    prefix = "article-response:"
+
+    def version_key(self, article_id=None):
+        if article_id is None:
+            return self.prefix + "version:list"
+        return self.prefix + f"version:{article_id}"
+
+    def get_version(self, article_id=None):
+        return cache.get_or_set(self.version_key(article_id), 1, None)
+
+    def increment(self, key, initial):
+        if not cache.add(key, initial, None):
+            cache.incr(key)
+
+    def bump_version(self, article_id=None):
+        # A missing version reads as 1, so a bump starts at 2
+        self.increment(self.version_key(article_id), 2)
+
+    def get_key(self, request, article_id=None):
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values
+            if value != ""
+        )
+        raw = "|".join(
+            [
+                request.get_host(),
+                request.path,
+                urlencode(params),
+                str(getattr(request.user, "role", "")),
+                str(self.get_version(article_id)),
+            ]
+        )
+        return self.prefix + hashlib.md5(raw.encode()).hexdigest()
+
+    def get(self, key):
+        entry = cache.get(key)
+        self.increment(self.prefix + ("hits" if entry else "misses"), 1)
+        return entry
+
+    def set(self, key, data, timeout=None):
+        body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+        entry = {"data": data, "etag": '"%s"' % hashlib.md5(body.encode()).hexdigest()}
+        if timeout is None:
+            timeout = settings.ARTICLE_RESPONSE_CACHE_TIMEOUT
+        cache.set(key, entry, timeout)
+        return entry
+
+    def compressed_key(self, key, etag, media_type, encoding):
+        raw = "|".join([key, etag, media_type, encoding])
+        return self.prefix + "compressed:" + hashlib.md5(raw.encode()).hexdigest()
+
+    def get_compressed(self, key):
+        return cache.get(key)
+
+    def set_compressed(self, key, response):
+        # The key embeds the ETag, the body can never outlive its payload
+        cache.set(
+            key,
+            {"content_type": response["Content-Type"], "body": response.content},
+            settings.ARTICLE_RESPONSE_CACHE_TIMEOUT,
+        )
+
+    def invalidate_article(self, article_id):
+        self.bump_version()
+        self.bump_version(article_id)
+
+    def invalidate_articles(self, article_ids):
+        self.bump_version()
+        for article_id in article_ids:
+            self.bump_version(article_id)
+
+    def invalidate_lists(self):
+        self.bump_version()
+
+    def stats(self):
+        return {
+            "hits": cache.get(self.prefix + "hits", 0),
+            "misses": cache.get(self.prefix + "misses", 0),
+        }
+
+
+response_cache = ArticleResponseCache()
+
+
+def strip_weak(etag):
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(header, etag):
+    """
+    Weak comparison of `If-None-Match` with `etag`: a compressed response
+    carries the weak form of the entry's ETag.
+    """
+    if not header:
+        return False
+    tags = {strip_weak(tag) for tag in parse_etags(header)}
+    return "*" in tags or strip_weak(etag) in tags
+
+
+def cache_article_response(view_method):
+    """
+    Serves list/retrieve from `response_cache`, answering `If-None-Match`
+    with 304 and tagging responses with `ETag` and `X-Cache: HIT|MISS`.
+    Only 200 responses are cached, streamed responses are passed through.
+    Once CompressionMiddleware compressed an entry for an encoding and media
+    type, hits are answered with the stored bytes, neither rendered nor
+    compressed again.
+    Responses read from a replica may miss a write that just bumped the version,
+    they are only kept for DATABASE_REPLICA_MAX_LAG seconds.
+    Without a shared cache (settings.CACHE_SHARED) every request is passed
+    through: the version bumps of a write would not reach the other processes.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if not settings.CACHE_SHARED:
+            return view_method(self, request, *args, **kwargs)
+        key = response_cache.get_key(request, kwargs.get(self.lookup_field))
+        entry = response_cache.get(key)
+        state = "HIT"
+        if entry is None:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK or response.streaming:
+                return response
+            timeout = None
+            if replica_used.get() is not None:
+                timeout = min(
+                    settings.DATABASE_REPLICA_MAX_LAG,
+                    settings.ARTICLE_RESPONSE_CACHE_TIMEOUT,
+                )
+            entry = response_cache.set(key, response.data, timeout)
+            state = "MISS"
+
+        if etag_matches(request.headers.get("If-None-Match"), entry["etag"]):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response["ETag"] = entry["etag"]
+            response["X-Cache"] = state
+            return response
+
+        codec = negotiate(request)
+        compressed_key = codec and response_cache.compressed_key(
+            key, entry["etag"], request.accepted_media_type, codec.name
+        )
+        compressed = codec and response_cache.get_compressed(compressed_key)
+        if compressed:
+            response = HttpResponse(
+                compressed["body"], content_type=compressed["content_type"]
+            )
+            response["Content-Encoding"] = codec.name
+            response["ETag"] = "W/" + entry["etag"]
+        else:
+            response = Response(entry["data"], status=status.HTTP_200_OK)
+            response["ETag"] = entry["etag"]
+            if codec:
+                response.cache_compressed = partial(
+                    response_cache.set_compressed, compressed_key
+                )
+        response["X-Cache"] = state
+        return response
+
+    return wrapper
@@ -0,0 +1,110 @@
+"""
+Denormalized `Article.comment_count` and `Article.last_commented_at`.
+
+Creating or deleting a comment updates its article with a single UPDATE using
+F() expressions (see the Comment signals), so concurrent writers never lose an
+increment. The API views run the comment write and that UPDATE in one
+transaction. Paths that bypass the signals (bulk import, raw SQL) and any drift
+are fixed by recomputing the values from the comments, see `reconcile`.
+
+Like the comment list, the values leave out comments by soft deleted users:
+soft deleting a user recomputes the articles they commented on (see
+article.purge).
+"""
+from django.db.models import Count, Exists, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from article.models import Article, Comment, User
+
+
+def visible_comments():
+    return Comment.objects.filter(
+        article=OuterRef("pk"), commenter__is_delete=False
+    )
+
+
+def latest_comment_date():
+    # The (article, -id) index serves this, ids grow with created_at
+    return Subquery(
+        visible_comments()
+        .order_by("-id")
+        .values("created_at")[:1]
+    )
+
+
+def comment_total():
+    return Coalesce(
+        Subquery(
+            visible_comments()
+            .order_by()
+            .values("article")
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def comment_added(comment):
+    created_at = Value(comment.created_at)
+    Article.objects.filter(pk=comment.article_id).update(
+        comment_count=F("comment_count") + 1,
+        # Never moves back when an older comment's update lands last
+        last_commented_at=Greatest(
+            Coalesce(F("last_commented_at"), created_at), created_at
+        ),
+    )
+
+
+def comment_removed(comment):
+    # A comment by a soft deleted user was never counted
+    Article.objects.filter(
+        Exists(User.objects.filter(pk=comment.commenter_id, is_delete=False)),
+        pk=comment.article_id,
+    ).update(
+        comment_count=Greatest(F("comment_count") - 1, Value(0)),
+        last_commented_at=latest_comment_date(),
+    )
+
+
+def refresh_articles(article_ids):
+    """
+    Recomputes the values of the given articles with one UPDATE.
+    """
+    return Article.objects.filter(pk__in=article_ids).update(
+        comment_count=comment_total(), last_commented_at=latest_comment_date()
+    )
+
+
+def reconcile(batch_size=500):
+    """
+    Compares the stored values with the comments in batches of `batch_size`
+    articles and rewrites the ones that drifted.
+    Yields (articles_checked, drifted_ids) after every batch.
+    """
+    articles_checked = 0
+    last_id = 0
+    while True:
+        batch = list(
+            Article.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .only("id", "comment_count", "last_commented_at")
+            .annotate(actual_count=comment_total(), actual_last=latest_comment_date())[
+                :batch_size
+            ]
+        )
+        if not batch:
+            return
+        drifted = [
+            article
+            for article in batch
+            if (article.comment_count, article.last_commented_at)
+            != (article.actual_count, article.actual_last)
+        ]
+        for article in drifted:
+            article.comment_count = article.actual_count
+            article.last_commented_at = article.actual_last
+        Article.objects.bulk_update(drifted, ["comment_count", "last_commented_at"])
+        articles_checked += len(batch)
+        last_id = batch[-1].id
+        yield articles_checked, [article.id for article in drifted]
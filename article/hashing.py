@@ -0,0 +1,204 @@
+"""
+Password hashing on a bounded worker pool.
+
+PBKDF2 runs hundreds of thousands of iterations per call. Running it on the
+request threads lets a burst of logins/registrations occupy every server
+thread and starve the content API. Here hashing is submitted to a per-process
+thread pool instead (hashlib releases the GIL while hashing):
+  - At most WORKERS hashes run at once and QUEUE_SIZE more may wait
+  - A full queue is rejected right away with 429, a request still waiting
+    after TIMEOUT seconds gets 503, both with a `Retry-After` header
+  - `stats` is reported by /api/metrics/
+Only the hashing runs on the pool, user lookups and saves stay on the request
+thread (and its database connection).
+
+Configured through settings.PASSWORD_HASHING.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.exceptions import PermissionDenied
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Sign-in is busy, please retry shortly."
+    default_code = "hashing_timeout"
+
+    def __init__(self, wait):
+        super().__init__()
+        # Read by the DRF exception handler to set the Retry-After header
+        self.wait = wait
+
+
+class HashingSaturated(HashingUnavailable):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    default_code = "hashing_saturated"
+
+
+class HashingPool:
+    """
+    Thread pool with admission control, created lazily per process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.slots = None
+        self.size = None
+        self.in_flight = 0
+        self.running = 0
+        self.reset_stats()
+
+    @property
+    def options(self):
+        return settings.PASSWORD_HASHING
+
+    def reset_stats(self):
+        # Only the counters, `in_flight` and `running` track live calls
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+
+    def get_executor(self):
+        size = (self.options["WORKERS"], self.options["QUEUE_SIZE"])
+        with self.lock:
+            if self.size != size:
+                if self.executor is not None:
+                    self.executor.shutdown(wait=False)
+                self.executor = ThreadPoolExecutor(
+                    max_workers=size[0], thread_name_prefix="password-hashing"
+                )
+                self.slots = threading.BoundedSemaphore(sum(size))
+                self.size = size
+            return self.executor, self.slots
+
+    def run(self, func, *args):
+        """
+        Runs `func(*args)` on the pool and returns its result.
+        Raises HashingSaturated when no slot is free and HashingUnavailable
+        when the result is not ready within TIMEOUT seconds.
+        """
+        executor, slots = self.get_executor()
+        if not slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise HashingSaturated(self.options["RETRY_AFTER"])
+        with self.lock:
+            self.in_flight += 1
+
+        future = executor.submit(self.call, func, args, time.monotonic())
+        future.add_done_callback(lambda _: self.release(slots))
+        try:
+            return future.result(timeout=self.options["TIMEOUT"])
+        except FutureTimeoutError:
+            # Still queued: drop it. Already running: the slot frees when it ends.
+            future.cancel()
+            with self.lock:
+                self.timeouts += 1
+            raise HashingUnavailable(self.options["RETRY_AFTER"])
+
+    def release(self, slots):
+        with self.lock:
+            self.in_flight -= 1
+        slots.release()
+
+    def call(self, func, args, submitted_at):
+        started = time.monotonic()
+        with self.lock:
+            self.running += 1
+            self.wait_time += started - submitted_at
+        try:
+            return func(*args)
+        finally:
+            with self.lock:
+                self.running -= 1
+                self.completed += 1
+                self.run_time += time.monotonic() - started
+
+    def stats(self):
+        with self.lock:
+            completed = self.completed or 1
+            return {
+                "workers": self.options["WORKERS"],
+                "queue_size": self.options["QUEUE_SIZE"],
+                "running": self.running,
+                "queued": self.in_flight - self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_time / completed * 1000, 2),
+                "avg_hash_ms": round(self.run_time / completed * 1000, 2),
+            }
+
+
+password_hashing = HashingPool()
+
+
+def hash_password(raw_password):
+    return password_hashing.run(make_password, raw_password)
+
+
+def verify_password(user, raw_password):
+    """
+    Checks the password on the pool, upgrading the stored hash when the
+    hasher or its work factor changed.
+    """
+    upgrade = []
+    is_correct = password_hashing.run(
+        check_password, raw_password, user.password, upgrade.append
+    )
+    if upgrade:
+        user.password = hash_password(raw_password)
+        user.save(update_fields=["password"])
+    return is_correct
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ModelBackend that verifies passwords through `password_hashing`, used by
+    `authenticate()` on login, /api/token/ and the admin.
+    A busy pool raises HashingUnavailable (429/503) only for DRF requests.
+    Elsewhere (the admin login form) no handler turns it into a response, the
+    login is refused with PermissionDenied, which `authenticate()` returns as
+    None.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        try:
+            return self.authenticate_pooled(username, password, **kwargs)
+        except HashingUnavailable:
+            if isinstance(request, Request):
+                raise
+            raise PermissionDenied
+
+    def authenticate_pooled(self, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            hash_password(password)
+            return None
+        if verify_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def user_can_authenticate(self, user):
+        # Soft deleted users are waiting to be purged, see article.purge
+        return super().user_can_authenticate(user) and not user.is_delete
@@ -0,0 +1,273 @@
+"""
+Database backed job queue for work that should not run in the request.
+
+  - `register` names a function as a job, `enqueue` adds a Job row for it once
+    the current transaction commits (nothing is queued for rolled back work)
+  - The `run_jobs` command runs `Worker`: CONCURRENCY threads that claim due
+    jobs one at a time. On PostgreSQL a claim reads with
+    `SELECT ... FOR UPDATE SKIP LOCKED`, so workers never wait on each other;
+    where row locks are not supported (SQLite) the claim is a conditional
+    UPDATE and a worker that loses the race tries the next job
+  - A failed job is retried after RETRY_BACKOFF * 2 ** (attempts - 1) seconds
+    (at most RETRY_BACKOFF_MAX) until it has run `max_attempts` times, a job
+    still running after STALE_AFTER seconds (dead worker) is claimed again
+  - Jobs must be idempotent: a job may run again after a crash
+  - `stats` (queue depth and latency) is reported by /api/metrics/
+
+Configured through settings.JOB_QUEUE.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import (
+    Avg,
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Max,
+    Min,
+    Q,
+)
+from django.utils import timezone
+
+from article.models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def register(name):
+    """
+    Decorator registering the function as the job called `name`.
+    """
+
+    def decorator(func):
+        registry[name] = func
+        return func
+
+    return decorator
+
+
+def create_job(name, payload, delay=0):
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=settings.JOB_QUEUE["MAX_ATTEMPTS"],
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue(name, delay=0, **payload):
+    """
+    Queues `name(**payload)` when the current transaction commits (right away
+    outside of one). The payload must be JSON serializable.
+    """
+    if name not in registry:
+        raise KeyError(f"Unknown job {name!r}.")
+    transaction.on_commit(partial(create_job, name, payload, delay))
+
+
+def retry_delay(attempts):
+    options = settings.JOB_QUEUE
+    return min(
+        options["RETRY_BACKOFF"] * 2 ** (attempts - 1), options["RETRY_BACKOFF_MAX"]
+    )
+
+
+def claimable(now):
+    stale = now - timedelta(seconds=settings.JOB_QUEUE["STALE_AFTER"])
+    return Job.objects.filter(
+        Q(status=JobStatus.QUEUED, run_at__lte=now)
+        | Q(status=JobStatus.RUNNING, started_at__lt=stale)
+    )
+
+
+def claim(worker_id):
+    """
+    Marks the next due job as running for `worker_id` and returns it, or None
+    when nothing is due.
+    """
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    while True:
+        now = timezone.now()
+        # Without row locks (SQLite) the read stays out of a transaction, a
+        # read lock there cannot be upgraded while other workers write
+        with transaction.atomic() if skip_locked else nullcontext():
+            candidates = claimable(now).order_by("run_at", "id")
+            if skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True)
+            job = candidates.first()
+            if job is None:
+                return None
+            # `status` and `attempts` identify the version that was read, the
+            # update matches nothing when another worker claimed it meanwhile
+            claimed = Job.objects.filter(
+                pk=job.pk, status=job.status, attempts=job.attempts
+            ).update(
+                status=JobStatus.RUNNING,
+                attempts=F("attempts") + 1,
+                locked_by=worker_id,
+                started_at=now,
+            )
+        if claimed:
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.started_at = now
+            return job
+
+
+def run(job):
+    """
+    Runs a claimed job and records the outcome.
+    """
+    func = registry.get(job.name)
+    try:
+        if func is None:
+            raise KeyError(f"Unknown job {job.name!r}.")
+        func(**job.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.pk, job.name)
+        job.last_error = traceback.format_exc()
+        if func is not None and job.attempts < job.max_attempts:
+            job.status = JobStatus.QUEUED
+            job.run_at = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        else:
+            job.status = JobStatus.FAILED
+            job.finished_at = timezone.now()
+    else:
+        job.status = JobStatus.DONE
+        job.finished_at = timezone.now()
+    # Matches nothing when the job was reclaimed as stale meanwhile
+    Job.objects.filter(
+        pk=job.pk, locked_by=job.locked_by, attempts=job.attempts
+    ).update(
+        status=job.status,
+        run_at=job.run_at,
+        last_error=job.last_error,
+        finished_at=job.finished_at,
+    )
+    return job
+
+
+def prune():
+    """
+    Deletes a batch of jobs finished more than KEEP_DONE seconds ago.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_QUEUE["KEEP_DONE"])
+    ids = list(
+        Job.objects.filter(status=JobStatus.DONE, finished_at__lt=cutoff).values_list(
+            "id", flat=True
+        )[:1000]
+    )
+    return Job.objects.filter(pk__in=ids).delete()[0] if ids else 0
+
+
+def stats():
+    """
+    Queue depth by status, the age of the oldest due job and the average and
+    longest wait (claim time - run_at) of the jobs started in the last 5 minutes.
+    """
+    now = timezone.now()
+    due = Q(status=JobStatus.QUEUED, run_at__lte=now)
+    recent = Q(started_at__gte=now - timedelta(minutes=5))
+    wait = ExpressionWrapper(
+        F("started_at") - F("run_at"), output_field=DurationField()
+    )
+    counts = Job.objects.aggregate(
+        queued=Count("id", filter=Q(status=JobStatus.QUEUED)),
+        due=Count("id", filter=due),
+        running=Count("id", filter=Q(status=JobStatus.RUNNING)),
+        failed=Count("id", filter=Q(status=JobStatus.FAILED)),
+        oldest_due=Min("run_at", filter=due),
+        started_last_5m=Count("id", filter=recent),
+        avg_wait=Avg(wait, filter=recent),
+        max_wait=Max(wait, filter=recent),
+    )
+    oldest_due = counts.pop("oldest_due")
+    counts["oldest_due_seconds"] = (
+        round((now - oldest_due).total_seconds(), 3) if oldest_due else 0
+    )
+    for name in ("avg_wait", "max_wait"):
+        value = counts.pop(name)
+        counts[f"{name}_ms"] = round(value.total_seconds() * 1000, 2) if value else 0
+    return counts
+
+
+class Worker:
+    """
+    Runs due jobs on `concurrency` threads until `stop` is set. With `burst`
+    the threads return once no job is due.
+    """
+
+    def __init__(self, concurrency=None, poll_interval=None, burst=False):
+        options = settings.JOB_QUEUE
+        self.concurrency = concurrency or options["CONCURRENCY"]
+        self.poll_interval = (
+            options["POLL_INTERVAL"] if poll_interval is None else poll_interval
+        )
+        self.burst = burst
+        self.stop = threading.Event()
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.lock = threading.Lock()
+        self.processed = {status: 0 for status in JobStatus.values}
+        self.pruned_at = None
+
+    def run(self):
+        if self.concurrency == 1:
+            self.loop(self.name)
+            return
+        threads = [
+            threading.Thread(
+                target=self.loop, args=(f"{self.name}:{index}",), name=f"jobs-{index}"
+            )
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def prune(self):
+        # Once a minute per process is plenty
+        with self.lock:
+            if self.pruned_at is not None and time.monotonic() - self.pruned_at < 60:
+                return
+            self.pruned_at = time.monotonic()
+        prune()
+
+    def loop(self, worker_id):
+        try:
+            while not self.stop.is_set():
+                try:
+                    job = claim(worker_id)
+                    if job is not None:
+                        run(job)
+                except DatabaseError:
+                    # The job, if any, is claimed again once stale
+                    logger.exception("Job worker %s lost its database", worker_id)
+                    connection.close()
+                    self.stop.wait(self.poll_interval)
+                    continue
+                if job is not None:
+                    with self.lock:
+                        self.processed[job.status] += 1
+                    continue
+                if self.burst:
+                    return
+                self.prune()
+                self.stop.wait(self.poll_interval)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
@@ -0,0 +1,122 @@
+import json
+import subprocess
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from article.authentication import user_cache
+from benchmarks.suite import Replayer, compare, load_endpoints, parse_weights, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway test database and replays the weighted request mix "
+        "of the Postman collection, reporting per-endpoint throughput, "
+        "p50/p95/p99 latency and queries per request as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--articles", type=int, default=1000)
+        parser.add_argument("--comments", type=int, default=5000)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--warmup", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--weight",
+            action="append",
+            default=[],
+            help="Override a request weight, e.g. --weight DeleteComment=1",
+        )
+        parser.add_argument(
+            "--collection",
+            default=str(settings.BASE_DIR / "CMS.postman_collection.json"),
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument(
+            "--baseline", help="Previous JSON report to check for regressions"
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed p95 growth against the baseline (0.2 = 20%%)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            weights = parse_weights(options["weight"])
+        except ValueError as e:
+            raise CommandError(e)
+        endpoints = load_endpoints(options["collection"], weights)
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            cache.clear()
+            user_cache.clear()
+            admin = seed(options["users"], options["articles"], options["comments"])
+            replayer = Replayer(endpoints, admin, options["seed"])
+            elapsed = replayer.run(options["requests"], options["warmup"])
+            report = replayer.report(elapsed)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report["meta"] = {
+            "commit": self.get_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "database": connection.vendor,
+            **{
+                key: options[key]
+                for key in ("users", "articles", "comments", "requests", "seed")
+            },
+            "weights": {endpoint.name: endpoint.weight for endpoint in endpoints},
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as output_file:
+                output_file.write(output + "\n")
+            self.write_table(report)
+        else:
+            self.stdout.write(output)
+
+        if options["baseline"]:
+            with open(options["baseline"]) as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = compare(report, baseline, options["tolerance"])
+            if regressions:
+                raise CommandError("Regressions:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
+
+    def write_table(self, report):
+        columns = ("requests", "errors", "p50_ms", "p95_ms", "p99_ms")
+        self.stdout.write(
+            "%-18s" % "endpoint"
+            + "".join("%10s" % column for column in columns)
+            + "%10s" % "queries"
+        )
+        rows = sorted(report["endpoints"].items()) + [("overall", report["overall"])]
+        for name, row in rows:
+            self.stdout.write(
+                "%-18s" % name
+                + "".join("%10s" % row[column] for column in columns)
+                + "%10s" % row.get("queries_per_request", "")
+            )
+
+    def get_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except OSError:
+            return None
@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from benchmarks.renderers import compare_renderers, load_payloads
+from benchmarks.suite import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway test database and compares render time and memory "
+        "of DRF's JSONRenderer and the orjson renderer on list page payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--rounds", type=int, default=200)
+        parser.add_argument("--json", action="store_true", help="Print a JSON report")
+
+    def handle(self, *args, **options):
+        page_size = options["page_size"]
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            seed(users=page_size, articles=page_size, comments=page_size)
+            report = compare_renderers(load_payloads(page_size), options["rounds"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+            return
+        columns = ("bytes", "mean_us", "p50_us", "p95_us", "peak_alloc_kb", "speedup")
+        self.stdout.write(
+            "%-24s" % "payload / renderer"
+            + "".join("%14s" % column for column in columns)
+        )
+        for payload, results in report.items():
+            for renderer, row in results.items():
+                self.stdout.write(
+                    "%-24s" % f"{payload} / {renderer}"
+                    + "".join("%14s" % row[column] for column in columns)
+                )
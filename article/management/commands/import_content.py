@@ -0,0 +1,145 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from article.bulk_import import (
+    FILE_FORMATS,
+    ArticleImporter,
+    CommentImporter,
+    UserImporter,
+    batched,
+    detect_format,
+    read_records,
+)
+from article.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk imports articles, comments or users from an NDJSON or CSV file "
+        "(the format of the export endpoints). Records are validated with the "
+        "API serializers and written in batches with COPY on Postgres or "
+        "bulk_create elsewhere."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON (.ndjson/.jsonl) or CSV file")
+        parser.add_argument("--model", choices=["articles", "comments", "users"], required=True)
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=FILE_FORMATS,
+            help="File format, detected from the extension by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of records validated and written per transaction.",
+        )
+        parser.add_argument(
+            "--author",
+            help="Email of the author of article records without an `author`.",
+        )
+        parser.add_argument(
+            "--hash-workers",
+            type=int,
+            help="Threads hashing user passwords, the number of CPUs by default.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help=(
+                "Progress file written after every committed batch. When it "
+                "exists the import resumes after the last committed record."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["file_format"] or detect_format(path)
+        if file_format not in FILE_FORMATS:
+            raise CommandError(f"Unknown file format for {path}, use --format.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        if options["model"] == "articles":
+            author = None
+            if options["author"]:
+                author = User.objects.filter(email=options["author"]).first()
+                if author is None:
+                    raise CommandError(f"User {options['author']} not found.")
+            importer = ArticleImporter(default_author=author)
+        elif options["model"] == "users":
+            importer = UserImporter(hash_workers=options["hash_workers"])
+        else:
+            importer = CommentImporter()
+
+        progress = self.load_checkpoint(options["checkpoint"], path)
+        skip = progress["records"]
+        if skip:
+            self.stdout.write(f"Resuming after record {skip}.")
+
+        started = time.monotonic()
+        imported = 0
+        records = read_records(path, file_format)
+        for _ in range(skip):
+            if next(records, None) is None:
+                break
+
+        for batch in batched(records, options["batch_size"]):
+            rows, errors = importer.validate(batch, progress["records"] + 1)
+            if rows:
+                importer.write(rows)
+            for line, detail in errors:
+                self.stderr.write(f"Record {line} rejected: {detail}")
+
+            imported += len(rows)
+            progress["records"] += len(batch)
+            progress["imported"] += len(rows)
+            progress["rejected"] += len(errors)
+            self.save_checkpoint(options["checkpoint"], progress)
+
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{progress['records']} records read, {progress['imported']} "
+                f"imported, {progress['rejected']} rejected "
+                f"({imported / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+
+        importer.finish()
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} {options['model']} in {elapsed:.1f}s "
+                f"({imported / elapsed if elapsed else 0:.0f} rows/s), "
+                f"{progress['rejected']} records rejected in total."
+            )
+        )
+
+    def load_checkpoint(self, checkpoint, path):
+        progress = {
+            "source": os.path.abspath(path),
+            "records": 0,
+            "imported": 0,
+            "rejected": 0,
+        }
+        if not checkpoint or not os.path.exists(checkpoint):
+            return progress
+        with open(checkpoint) as checkpoint_file:
+            saved = json.load(checkpoint_file)
+        if saved.get("source") != progress["source"]:
+            raise CommandError(
+                f"{checkpoint} belongs to {saved.get('source')}, not {progress['source']}."
+            )
+        return {**progress, **saved}
+
+    def save_checkpoint(self, checkpoint, progress):
+        if not checkpoint:
+            return
+        # Write then rename, so a crash never leaves a truncated checkpoint
+        temporary = checkpoint + ".tmp"
+        with open(temporary, "w") as checkpoint_file:
+            json.dump(progress, checkpoint_file)
+        os.replace(temporary, checkpoint)
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from article.purge import pending_deletions, purge_deleted
+
+
+class Command(BaseCommand):
+    help = (
+        "Purges soft deleted users and articles together with their articles "
+        "and comments, in small batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of comments deleted per transaction.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches, to spread the load.",
+        )
+        parser.add_argument(
+            "--watch",
+            type=float,
+            default=None,
+            help="Keep running and look for new deletions every WATCH seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.purge(options["batch_size"], options["pause"])
+            if options["watch"] is None:
+                return
+            time.sleep(options["watch"])
+
+    def purge(self, batch_size, pause):
+        pending = pending_deletions()
+        if not any(pending.values()):
+            return
+        self.stdout.write(
+            f"Purging {pending['users']} users and {pending['articles']} articles..."
+        )
+        purged = 0
+        comments = {}
+        for name, pk, comments_deleted in purge_deleted(batch_size):
+            label = f"{name} {pk}"
+            if comments_deleted is None:
+                purged += 1
+                self.stdout.write(
+                    f"{label} purged, {comments.pop(label, 0)} comments removed."
+                )
+                continue
+            comments[label] = comments.get(label, 0) + comments_deleted
+            self.stdout.write(f"{label}: {comments[label]} comments removed...")
+            if pause:
+                time.sleep(pause)
+        self.stdout.write(self.style.SUCCESS(f"Purge finished: {purged} purged."))
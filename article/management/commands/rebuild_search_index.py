@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from article.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the article full-text search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of articles indexed per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        articles_indexed = terms_written = 0
+        for articles_indexed, terms_written in rebuild_index(options["batch_size"]):
+            self.stdout.write(f"Indexed {articles_indexed} articles...")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Search index rebuilt: {articles_indexed} articles, {terms_written} terms."
+            )
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from article.cache import response_cache
+from article.comment_stats import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes Article.comment_count and last_commented_at from the "
+        "comments and fixes the articles that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of articles checked per query.",
+        )
+
+    def handle(self, *args, **options):
+        articles_checked = drifted = 0
+        for articles_checked, drifted_ids in reconcile(options["batch_size"]):
+            if drifted_ids:
+                drifted += len(drifted_ids)
+                response_cache.invalidate_articles(drifted_ids)
+            self.stdout.write(
+                f"Checked {articles_checked} articles, {drifted} fixed..."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Comment stats reconciled: {articles_checked} articles, "
+                f"{drifted} fixed."
+            )
+        )
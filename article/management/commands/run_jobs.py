@@ -0,0 +1,47 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from article.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs, see article.jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="Number of jobs run at once (defaults to JOB_QUEUE_CONCURRENCY).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Seconds to wait when no job is due.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no job is due instead of waiting for more.",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options["concurrency"],
+            poll_interval=options["poll_interval"],
+            burst=options["burst"],
+        )
+        if not options["burst"]:
+            # Finish the running jobs on SIGTERM/SIGINT, then exit
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *_: worker.stop.set())
+            self.stdout.write(
+                f"Running jobs on {worker.concurrency} threads as {worker.name}..."
+            )
+        worker.run()
+        processed = ", ".join(
+            f"{count} {status}" for status, count in worker.processed.items()
+        )
+        self.stdout.write(self.style.SUCCESS(f"Worker stopped: {processed}."))
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.13 on 2026-10-18 07:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0009_alter_article_author'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=0)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='article.article')),
+            ],
+            options={
+                'unique_together': {('term', 'article')},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.13 on 2026-10-18 07:25
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def build_excerpt(body):
+    # Frozen copy of article.models.build_excerpt as of this migration
+    return Truncator(" ".join((body or "").split())).chars(200)
+
+
+def populate_excerpts(apps, schema_editor):
+    Article = apps.get_model("article", "Article")
+    articles = Article.objects.using(schema_editor.connection.alias)
+    batch = []
+    for article in articles.only("id", "body").iterator(chunk_size=500):
+        article.excerpt = build_excerpt(article.body)
+        batch.append(article)
+        if len(batch) == 500:
+            articles.bulk_update(batch, ["excerpt"])
+            batch = []
+    if batch:
+        articles.bulk_update(batch, ["excerpt"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0011_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.RunPython(populate_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.13 on 2026-10-18 07:59
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_comment_stats(apps, schema_editor):
+    Article = apps.get_model("article", "Article")
+    Comment = apps.get_model("article", "Comment")
+    articles = Article.objects.using(schema_editor.connection.alias)
+    stats = (
+        Comment.objects.filter(article=OuterRef("pk"))
+        .order_by()
+        .values("article")
+    )
+    last_id = articles.aggregate(last_id=Max("id"))["last_id"] or 0
+    # One UPDATE per range of 500 ids keeps each statement short
+    for start in range(0, last_id, 500):
+        articles.filter(id__gt=start, id__lte=start + 500).update(
+            comment_count=Coalesce(
+                Subquery(stats.annotate(total=Count("id")).values("total")), 0
+            ),
+            last_commented_at=Subquery(
+                stats.annotate(last=Max("created_at")).values("last")
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0013_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='last_commented_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-comment_count', '-id'], name='article_comment_count_idx'),
+        ),
+        migrations.RunPython(populate_comment_stats, migrations.RunPython.noop),
+    ]
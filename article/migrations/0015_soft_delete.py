@@ -0,0 +1,26 @@
+# Generated by Django 4.2.13 on 2026-10-18 08:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0014_article_comment_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='is_delete',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('is_delete', True)), fields=['id'], name='article_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_delete', True)), fields=['id'], name='user_deleted_idx'),
+        ),
+    ]
@@ -1,7 +1,18 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.utils.text import Truncator
 from django.utils.translation import gettext_lazy as _
 
+EXCERPT_LENGTH = 200
+
+
+def build_excerpt(body):
+    """
+    Plain preview of an article body: whitespace collapsed and truncated to
+    EXCERPT_LENGTH characters.
+    """
+    return Truncator(" ".join((body or "").split())).chars(EXCERPT_LENGTH)
+
 
 # Create your models here.
 class UserManager(BaseUserManager):
@@ -60,10 +71,56 @@ class User(AbstractUser):
     )
     email = models.EmailField(unique=True)
     is_delete = models.BooleanField(default=False)
+    # Embedded in issued tokens, bumped to revoke them when a claim field changes
+    token_version = models.PositiveIntegerField(default=0, editable=False)
     objects = UserManager()
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
+    CLAIM_FIELDS = ("role", "is_active", "is_delete")
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=["role", "-id"], name="user_role_id_idx"),
+            # Soft deleted users waiting to be purged, see article.purge
+            models.Index(
+                fields=["id"], condition=models.Q(is_delete=True), name="user_deleted_idx"
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_claims = user.get_claims()
+        return user
+
+    def get_claims(self):
+        # Deferred fields are left out instead of being loaded
+        return {
+            name: self.__dict__[name] for name in self.CLAIM_FIELDS if name in self.__dict__
+        }
+
+    def save(self, *args, **kwargs):
+        """
+        Bumps `token_version` when a saved role, is_active or is_delete differs
+        from the loaded value, which revokes the tokens issued before.
+        """
+        loaded = getattr(self, "_loaded_claims", {})
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+        saved = {
+            name: value
+            for name, value in self.get_claims().items()
+            if update_fields is None or name in update_fields
+        }
+        if any(name in loaded and loaded[name] != value for name, value in saved.items()):
+            self.token_version += 1
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "token_version"}
+        super().save(*args, **kwargs)
+        self._loaded_claims = {**loaded, **saved}
+
     def __str__(self):
         return str(self.email)
 
@@ -71,6 +128,8 @@ class User(AbstractUser):
 class Article(models.Model):
     title = models.CharField(max_length=255)
     body = models.TextField()
+    # Precomputed from `body` on save, so lists can preview without reading it
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -79,12 +138,56 @@ class Article(models.Model):
         related_name="article_user",
     )
     published = models.BooleanField(default=False)
+    # Hidden from the API until purged with its comments, see article.purge
+    is_delete = models.BooleanField(default=False)
+    # Maintained from the comments, see article.comment_stats
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_commented_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    COMMENT_STATS_FIELDS = ("comment_count", "last_commented_at")
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-id"],
+                condition=models.Q(published=True),
+                name="article_published_id_idx",
+            ),
+            models.Index(fields=["title"], name="article_title_idx"),
+            models.Index(
+                fields=["-comment_count", "-id"], name="article_comment_count_idx"
+            ),
+            models.Index(
+                fields=["id"],
+                condition=models.Q(is_delete=True),
+                name="article_deleted_idx",
+            ),
+        ]
+
     def __str__(self):
         return str(self.id) + "-" + str(self.title)
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None and not self._state.adding:
+            # The comment stats are only written with F() updates, a full save
+            # of a loaded article must not overwrite them with stale values
+            deferred = self.get_deferred_fields()
+            update_fields = kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COMMENT_STATS_FIELDS
+                and field.attname not in deferred
+            ]
+        if update_fields is None or "body" in update_fields:
+            self.excerpt = build_excerpt(self.body)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "excerpt"}
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     article = models.ForeignKey(
@@ -96,3 +199,72 @@ class Comment(models.Model):
     body = models.TextField(max_length=500)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["article", "-id"], name="comment_article_id_idx"),
+        ]
+
+
+class ArticleSearchTerm(models.Model):
+    """
+    Inverted index row used by the article search filter.
+      - One row per (term, article) pair
+      - Weight is the ranked term frequency (title hits count more than body hits)
+    """
+
+    term = models.CharField(max_length=64)
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="search_terms"
+    )
+    weight = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [("term", "article")]
+
+    def __str__(self):
+        return str(self.term) + "-" + str(self.article_id)
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "queued", _("Queued")
+    RUNNING = "running", _("Running")
+    DONE = "done", _("Done")
+    FAILED = "failed", _("Failed")
+
+
+class Job(models.Model):
+    """
+    Deferred work run by the `run_jobs` worker, see article.jobs.
+      - `name` selects the registered function, `payload` its keyword arguments
+      - A job is due once `run_at` has passed, failed attempts are re-queued
+        with a later `run_at` until `max_attempts` is reached
+    """
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10, choices=JobStatus.choices, default=JobStatus.QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Claiming reads the due queued jobs in run_at order
+            models.Index(
+                fields=["run_at", "id"],
+                condition=models.Q(status="queued"),
+                name="job_queued_run_at_idx",
+            ),
+            models.Index(fields=["status", "finished_at"], name="job_status_idx"),
+        ]
+
+    def __str__(self):
+        return str(self.id) + "-" + str(self.name)
@@ -0,0 +1,120 @@
+"""
+Deferred deletion of users and articles.
+
+`Article.author` and `Comment.commenter` cascade, deleting a prolific author
+in the request would delete every article and every comment on them in one
+transaction. The API soft deletes instead:
+  - `soft_delete_user` / `soft_delete_article` set `is_delete`, which hides the
+    row from the API right away (a user's articles are hidden with them) and
+    revokes the user's tokens
+  - The purge then removes the rows and their dependents `batch_size`
+    comments at a time, each batch in its own short transaction. Every soft
+    delete queues a purge job for the `run_jobs` worker (see article.tasks),
+    the `purge_deleted` command purges whatever is still pending
+"""
+from django.db import transaction
+
+from article.cache import response_cache
+from article.comment_stats import refresh_articles
+from article.jobs import enqueue
+from article.models import Article, Comment, User
+
+
+def soft_delete_user(user):
+    with transaction.atomic():
+        user.is_delete = True
+        user.save(update_fields=["is_delete"])
+        article_ids = list(
+            Article.objects.filter(author=user, is_delete=False).values_list(
+                "id", flat=True
+            )
+        )
+        Article.objects.filter(pk__in=article_ids).update(is_delete=True)
+        # Their comments are hidden and no longer counted on other articles
+        commented_ids = set(
+            Comment.objects.filter(commenter=user)
+            .exclude(article_id__in=article_ids)
+            .values_list("article_id", flat=True)
+        )
+        refresh_articles(commented_ids)
+        enqueue("purge_user", user_id=user.pk)
+    response_cache.invalidate_articles([*article_ids, *commented_ids])
+
+
+def soft_delete_article(article):
+    article.is_delete = True
+    article.save(update_fields=["is_delete"])
+    enqueue("purge_article", article_id=article.pk)
+
+
+def pending_deletions():
+    """
+    Number of soft deleted rows waiting to be purged.
+    """
+    return {
+        "users": User.objects.filter(is_delete=True).count(),
+        "articles": Article.objects.filter(is_delete=True).count(),
+    }
+
+
+def delete_comments(comments, batch_size):
+    """
+    Deletes the `comments` queryset in batches and refreshes the stats of
+    their articles once per batch (the Comment post_delete signal skips
+    QuerySet deletes). Yields the number of comments deleted by every batch.
+    """
+    while True:
+        with transaction.atomic():
+            batch = list(
+                comments.order_by("id").values_list("id", "article_id")[:batch_size]
+            )
+            if not batch:
+                return
+            comment_ids = [comment_id for comment_id, _ in batch]
+            Comment.objects.filter(pk__in=comment_ids).delete()
+            article_ids = {article_id for _, article_id in batch}
+            refresh_articles(article_ids)
+        response_cache.invalidate_articles(article_ids)
+        yield len(batch)
+
+
+def purge_article(article, batch_size=500):
+    """
+    Deletes the comments of the article in batches, then the article (its
+    search index rows go with the FK cascade).
+    Yields the number of comments deleted by every batch.
+    """
+    yield from delete_comments(Comment.objects.filter(article=article), batch_size)
+    article.delete()
+
+
+def purge_user(user, batch_size=500):
+    """
+    Purges the articles of the user, then their comments on other articles,
+    then the user, nothing is left for the delete to cascade to.
+    Yields the number of comments deleted by every batch.
+    """
+    for article in Article.objects.filter(author=user).only("id").order_by("id"):
+        yield from purge_article(article, batch_size)
+    yield from delete_comments(Comment.objects.filter(commenter=user), batch_size)
+    user.delete()
+
+
+def purge_deleted(batch_size=500):
+    """
+    Purges every soft deleted article, then every soft deleted user.
+    Yields (model name, id, comments_deleted) after every batch, and
+    (model name, id, None) once the row itself is deleted.
+    """
+    articles = Article.objects.filter(is_delete=True).only("id")
+    users = User.objects.filter(is_delete=True)
+    for queryset, purge in ((articles, purge_article), (users, purge_user)):
+        name = queryset.model.__name__
+        while True:
+            instance = queryset.order_by("id").first()
+            if instance is None:
+                break
+            pk = instance.pk
+            for comments_deleted in purge(instance, batch_size):
+                yield name, pk, comments_deleted
+            yield name, pk, None
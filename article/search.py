@@ -0,0 +1,146 @@
+import operator
+import re
+from collections import Counter
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from rest_framework.filters import SearchFilter
+
+from article.models import Article, ArticleSearchTerm
+
+TITLE_WEIGHT = 3
+BODY_WEIGHT = 1
+MAX_TERM_LENGTH = 64
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """
+    Splits text into lower cased index terms.
+    """
+    if not text:
+        return []
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall(text.lower())]
+
+
+def build_terms(article):
+    """
+    Returns a Counter of term -> weight for an article.
+    """
+    weights = Counter()
+    for token in tokenize(article.title):
+        weights[token] += TITLE_WEIGHT
+    for token in tokenize(article.body):
+        weights[token] += BODY_WEIGHT
+    return weights
+
+
+def index_articles(articles):
+    """
+    Replaces the index rows of the given articles in a single transaction.
+    """
+    articles = list(articles)
+    if not articles:
+        return 0
+
+    rows = [
+        ArticleSearchTerm(term=term, article_id=article.pk, weight=weight)
+        for article in articles
+        for term, weight in build_terms(article).items()
+    ]
+    with transaction.atomic():
+        ArticleSearchTerm.objects.filter(
+            article_id__in=[article.pk for article in articles]
+        ).delete()
+        ArticleSearchTerm.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def index_article(article):
+    return index_articles([article])
+
+
+def rebuild_index(batch_size=500):
+    """
+    Re-indexes every article in batches of `batch_size`.
+    Yields (articles_indexed, terms_written) after every batch.
+    """
+    articles_indexed = 0
+    terms_written = 0
+    batch = []
+    queryset = Article.objects.only("id", "title", "body").order_by("id")
+    for article in queryset.iterator(chunk_size=batch_size):
+        batch.append(article)
+        if len(batch) >= batch_size:
+            terms_written += index_articles(batch)
+            articles_indexed += len(batch)
+            batch = []
+            yield articles_indexed, terms_written
+    if batch:
+        terms_written += index_articles(batch)
+        articles_indexed += len(batch)
+        yield articles_indexed, terms_written
+
+
+class ArticleSearchFilter(SearchFilter):
+    """
+    Search filter for articles backed by the ArticleSearchTerm inverted index.
+      - `title` and `body` are matched through the index instead of ILIKE scans
+      - The view `search_fields` (small author columns) are still matched with
+        the default SearchFilter lookups
+      - Results are ranked by the summed term weights, newest first on ties
+    """
+
+    def term_condition(self, term, orm_lookups):
+        conditions = [Q(**{orm_lookup: term}) for orm_lookup in orm_lookups]
+        tokens = tokenize(term)
+        if tokens:
+            conditions.append(
+                reduce(
+                    operator.and_,
+                    (
+                        Q(
+                            pk__in=ArticleSearchTerm.objects.filter(
+                                term=token
+                            ).values("article_id")
+                        )
+                        for token in tokens
+                    ),
+                )
+            )
+        return reduce(operator.or_, conditions) if conditions else None
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        search_fields = self.get_search_fields(view, request) or []
+        orm_lookups = [
+            self.construct_search(str(search_field), queryset)
+            for search_field in search_fields
+        ]
+
+        tokens = []
+        for term in search_terms:
+            condition = self.term_condition(term, orm_lookups)
+            if condition is not None:
+                queryset = queryset.filter(condition)
+            tokens += tokenize(term)
+
+        if not tokens:
+            return queryset
+
+        rank = (
+            ArticleSearchTerm.objects.filter(article=OuterRef("pk"), term__in=tokens)
+            .order_by()
+            .values("article")
+            .annotate(total=Sum("weight"))
+            .values("total")
+        )
+        return queryset.annotate(search_rank=Coalesce(Subquery(rank), 0)).order_by(
+            "-search_rank", "-id"
+        )
@@ -2,12 +2,44 @@ from rest_framework import serializers
 from .models import Article, Comment, User
 
 
+class SparseFieldsMixin:
+    """
+    Renders only the fields selected by the `fields` / `omit` serializer
+    context (filled from `?fields=` / `?omit=`), unknown names are ignored.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get("fields")
+        omit = self.context.get("omit", ())
+        for name in list(self.fields):
+            if (fields and name not in fields) or name in omit:
+                self.fields.pop(name)
+
+
 class RegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, min_length=8)
 
     class Meta:
         model = User
         fields = ["username", "email", "password", "role", "first_name", "last_name"]
+        # Uniqueness is enforced by the INSERT (see RegisterViewSet), not by a
+        # SELECT per unique field
+        extra_kwargs = {
+            "username": {"validators": [User.username_validator]},
+            "email": {"validators": []},
+        }
+
+
+class ProvisionUserSerializer(RegistrationSerializer):
+    """
+    Bulk provisioned users may come without a password, they get an
+    unusable one until it is reset.
+    """
+
+    password = serializers.CharField(
+        write_only=True, required=False, allow_blank=True, min_length=8
+    )
 
 
 class LoginSerializer(serializers.Serializer):
@@ -15,30 +47,62 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(required=True)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
-        exclude = ["password", "groups", "user_permissions"]
+        # token_version is the internal token revocation counter
+        exclude = ["password", "groups", "user_permissions", "token_version"]
 
 
-class ArticleSerializer(serializers.ModelSerializer):
+class ArticleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Article
         fields = [
             "id",
             "title",
             "body",
+            "excerpt",
             "author",
             "published",
+            "comment_count",
+            "last_commented_at",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = [
+            "id",
+            "excerpt",
+            "comment_count",
+            "last_commented_at",
+            "author",
             "created_at",
             "updated_at",
+            "published",
         ]
-        read_only_fields = ["id", "author", "created_at", "updated_at", "published"]
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommenterSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ["id", "username", "role"]
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Comment serializer, `commenter` is rendered as the commenter email.
+    Fields listed in the `expand` context (`?expand=commenter`) are rendered
+    as nested objects instead.
+    """
+
     commenter = serializers.StringRelatedField(read_only=True)
     article = serializers.PrimaryKeyRelatedField(read_only=True)
+    expandable_fields = {"commenter": CommenterSerializer}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in self.context.get("expand", ()):
+            if name in self.expandable_fields and name in self.fields:
+                self.fields[name] = self.expandable_fields[name](read_only=True)
 
     class Meta:
         model = Comment
@@ -0,0 +1,92 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from article.authentication import token_versions, user_cache
+from article.cache import response_cache
+from article.comment_stats import comment_added, comment_removed, refresh_articles
+from article.models import Article, Comment, User
+from article.search import index_article
+
+SEARCH_FIELDS = {"title", "body"}
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article_responses(sender, instance, **kwargs):
+    """
+    Drops cached list/detail responses that contain the article.
+    """
+    response_cache.invalidate_article(instance.pk)
+
+
+@receiver(post_save, sender=Article)
+def update_article_search_index(sender, instance, update_fields=None, **kwargs):
+    """
+    Keeps the search index in sync with article title/body.
+    Index rows are removed together with the article through the FK cascade.
+    """
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    index_article(instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, update_fields=None, **kwargs):
+    """
+    Drops the cached JWT user and token version so role and is_active changes
+    apply right away.
+    Article lists filter on author fields, so they are dropped too unless only
+    `last_login` changed.
+    """
+    user_cache.invalidate(instance.pk)
+    token_versions.invalidate(instance.pk)
+    if update_fields is None or set(update_fields) - {"last_login"}:
+        response_cache.invalidate_lists()
+
+
+@receiver(post_save, sender=Comment)
+def count_created_comment(sender, instance, created, **kwargs):
+    """
+    Updates the article comment_count/last_commented_at, the cached
+    article responses show them.
+    """
+    if not created:
+        return
+    comment_added(instance)
+    response_cache.invalidate_article(instance.article_id)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, origin=None, **kwargs):
+    """
+    Same as `count_created_comment`. Skipped when the comment goes with its
+    article, or with its commenter (see `refresh_commented_articles`), and for
+    QuerySet deletes, which refresh their articles once (see article.purge).
+    """
+    if isinstance(origin, (Article, User, QuerySet)):
+        return
+    comment_removed(instance)
+    response_cache.invalidate_article(instance.article_id)
+
+
+@receiver(pre_delete, sender=User)
+def collect_commented_articles(sender, instance, **kwargs):
+    instance._commented_article_ids = set(
+        Comment.objects.filter(commenter_id=instance.pk).values_list(
+            "article_id", flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=User)
+def refresh_commented_articles(sender, instance, **kwargs):
+    """
+    Refreshes the comment stats of every article the deleted user commented
+    on with one UPDATE, instead of one per cascaded comment.
+    """
+    article_ids = getattr(instance, "_commented_article_ids", None)
+    if article_ids:
+        refresh_articles(article_ids)
+        response_cache.invalidate_articles(article_ids)
@@ -0,0 +1,28 @@
+"""
+Jobs run by the `run_jobs` worker, see article.jobs. Registered on app load.
+"""
+from collections import deque
+
+from article.jobs import register
+from article.models import Article, User
+from article.purge import purge_article, purge_user
+
+
+@register("purge_article")
+def purge_deleted_article(article_id, batch_size=500):
+    """
+    Purges the article if it is still soft deleted.
+    """
+    article = Article.objects.filter(pk=article_id, is_delete=True).only("id").first()
+    if article is not None:
+        deque(purge_article(article, batch_size), maxlen=0)
+
+
+@register("purge_user")
+def purge_deleted_user(user_id, batch_size=500):
+    """
+    Purges the user with their articles and comments if still soft deleted.
+    """
+    user = User.objects.filter(pk=user_id, is_delete=True).first()
+    if user is not None:
+        deque(purge_user(user, batch_size), maxlen=0)
@@ -1,8 +1,56 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest import mock
+import psycopg2_pool
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from article.models import Article, Comment, User
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection, connections
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+from CMS.compression import CODECS, GzipCodec, negotiate, parse_accept_encoding
+from CMS.db_router import replica_lag
+from CMS.postgresql_pool.base import ConnectionPool
+from CMS.renderers import ORJSONParser, ORJSONRenderer
+from article.authentication import ClaimsRefreshToken, ClaimsUser, user_cache
+from article.cache import response_cache
+from article.comment_stats import reconcile
+from article.hashing import HashingUnavailable, password_hashing
+from article.jobs import claim, enqueue, registry, retry_delay, run
+from article.models import (
+    EXCERPT_LENGTH,
+    Article,
+    ArticleSearchTerm,
+    Comment,
+    Job,
+    JobStatus,
+    User,
+)
+from article.purge import soft_delete_article, soft_delete_user
+from benchmarks.renderers import compare_renderers, load_payloads
+from benchmarks.suite import Replayer, load_endpoints, path_template, seed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
 
 class UserViewSetTestCase(APITestCase):
@@ -127,6 +175,13 @@ class UserViewSetTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(response.data["success"], True)
         self.assertEqual(response.data["message"], "User deleted successfully.")
+        self.assertTrue(
+            get_user_model().objects.get(id=self.author_user.id).is_delete
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        call_command("purge_deleted", stdout=StringIO())
         self.assertFalse(
             get_user_model().objects.filter(id=self.author_user.id).exists()
         )
@@ -376,6 +431,24 @@ class CommentViewSetTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["payload"]["results"]), 1)
 
+    def test_list_comments_expand_commenter(self):
+        """
+        Test that `?expand=commenter` embeds the commenter id, username and role.
+        """
+        url = f"/api/articles/{self.article1.id}/comments/"
+        self.authenticate(self.admin_user)
+        response = self.client.get(url)
+        self.assertEqual(
+            response.data["payload"]["results"][0]["commenter"], "author@example.com"
+        )
+
+        response = self.client.get(url, {"expand": "commenter"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["payload"]["results"][0]["commenter"],
+            {"id": self.author_user.id, "username": "authoruser", "role": "author"},
+        )
+
     def test_create_comment_with_valid_permissions(self):
         """
         Test that a logged-in user (author, admin, or viewer) can create a comment.
@@ -467,3 +540,2805 @@ class CommentViewSetTestCase(APITestCase):
         response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.data["body"][0], "This field is required.")
+
+
+class ArticleSearchTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up articles that are indexed through the post_save signal.
+        """
+        self.author_user = get_user_model().objects.create_user(
+            username="authoruser",
+            email="author@example.com",
+            password="authorpassword",
+            role="author",
+        )
+        self.django_article = Article.objects.create(
+            title="Django tips",
+            body="Caching querysets in python",
+            author=self.author_user,
+        )
+        self.python_article = Article.objects.create(
+            title="Python news",
+            body="A release of python and django",
+            author=self.author_user,
+        )
+        self.client.force_authenticate(user=self.author_user)
+
+    def search(self, term):
+        response = self.client.get("/api/articles/", {"search": term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [article["id"] for article in response.data["payload"]["results"]]
+
+    def test_search_ranks_title_matches_first(self):
+        """
+        Test that a title hit ranks above a body hit.
+        """
+        self.assertEqual(
+            self.search("django"), [self.django_article.id, self.python_article.id]
+        )
+        self.assertEqual(
+            self.search("python"), [self.python_article.id, self.django_article.id]
+        )
+
+    def test_search_requires_every_term(self):
+        """
+        Test that multiple terms must all match.
+        """
+        self.assertEqual(self.search("caching django"), [self.django_article.id])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        """
+        Test that the index is refreshed on save and cleaned up on delete.
+        """
+        self.django_article.body = "Nothing relevant"
+        self.django_article.save()
+        self.assertEqual(self.search("caching"), [])
+
+        self.python_article.delete()
+        self.assertFalse(
+            ArticleSearchTerm.objects.filter(article_id=self.python_article.id).exists()
+        )
+
+    def test_search_matches_author_fields(self):
+        """
+        Test that author columns are still searchable.
+        """
+        self.assertEqual(len(self.search("authoruser")), 2)
+
+    def test_rebuild_search_index_command(self):
+        """
+        Test that the management command rebuilds a wiped index.
+        """
+        ArticleSearchTerm.objects.all().delete()
+        call_command("rebuild_search_index", batch_size=1, stdout=StringIO())
+        self.assertEqual(self.search("caching"), [self.django_article.id])
+
+
+class CursorPaginationTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up an admin, five articles and three comments.
+        """
+        self.admin_user = get_user_model().objects.create_user(
+            username="adminuser",
+            email="admin@example.com",
+            password="adminpassword",
+            role="admin",
+        )
+        self.articles = [
+            Article.objects.create(
+                title=f"Article {index}", body="body", author=self.admin_user
+            )
+            for index in range(5)
+        ]
+        self.comments = [
+            Comment.objects.create(
+                body=f"Comment {index}",
+                article=self.articles[0],
+                commenter=self.admin_user,
+            )
+            for index in range(3)
+        ]
+        self.client.force_authenticate(user=self.admin_user)
+
+    def walk(self, url, params):
+        """
+        Follows `next` links and returns the ids of every page.
+        """
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            payload = response.data["payload"]
+            pages.append([row["id"] for row in payload["results"]])
+            if not payload["next"]:
+                return pages, payload
+            response = self.client.get(payload["next"])
+
+    def test_cursor_pages_articles_newest_first(self):
+        """
+        Test that cursor mode walks every article once in `-id` order.
+        """
+        pages, payload = self.walk(
+            "/api/articles/", {"pagination": "cursor", "page_size": 2}
+        )
+        expected = [article.id for article in reversed(self.articles)]
+        self.assertEqual(pages, [expected[0:2], expected[2:4], expected[4:5]])
+        self.assertEqual(payload["count"], 5)
+
+    def test_cursor_previous_link(self):
+        """
+        Test that the previous link returns the page before.
+        """
+        response = self.client.get(
+            "/api/articles/", {"pagination": "cursor", "page_size": 2}
+        )
+        first_page = response.data["payload"]["results"]
+        self.assertIsNone(response.data["payload"]["previous"])
+        response = self.client.get(response.data["payload"]["next"])
+        response = self.client.get(response.data["payload"]["previous"])
+        self.assertEqual(response.data["payload"]["results"], first_page)
+
+    def test_cursor_count_can_be_dropped(self):
+        """
+        Test that `count=none` leaves the count out of the envelope.
+        """
+        response = self.client.get(
+            "/api/users/", {"pagination": "cursor", "count": "none"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["payload"]["count"])
+        self.assertEqual(len(response.data["payload"]["results"]), 1)
+
+    def test_cursor_pages_comments(self):
+        """
+        Test that comment listing supports cursor mode.
+        """
+        pages, payload = self.walk(
+            f"/api/articles/{self.articles[0].id}/comments/",
+            {"pagination": "cursor", "page_size": 2},
+        )
+        expected = [comment.id for comment in reversed(self.comments)]
+        self.assertEqual(pages, [expected[0:2], expected[2:3]])
+
+    def test_invalid_cursor(self):
+        """
+        Test that a tampered cursor returns 404.
+        """
+        response = self.client.get("/api/articles/", {"cursor": "bm9wZQ=="})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_mode_rejects_ranked_search(self):
+        """
+        Test that an article search, ordered by relevance, is refused in cursor mode.
+        """
+        response = self.client.get(
+            "/api/articles/", {"pagination": "cursor", "search": "article"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("search", response.data)
+
+        # Other searches keep the -id order and still page with cursors
+        response = self.client.get(
+            "/api/users/", {"pagination": "cursor", "search": "admin"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["payload"]["results"]), 1)
+
+
+class CountStrategyTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up an admin and three articles.
+        """
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            username="adminuser",
+            email="admin@example.com",
+            password="adminpassword",
+            role="admin",
+        )
+        for index in range(3):
+            Article.objects.create(
+                title=f"Article {index}", body="body", author=self.admin_user
+            )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def get_payload(self, params):
+        response = self.client.get("/api/articles/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["payload"]
+
+    def test_exact_count_by_default(self):
+        """
+        Test that page number mode reports an exact count.
+        """
+        payload = self.get_payload({"page_size": 1})
+        self.assertEqual(payload["count"], 3)
+        self.assertEqual(payload["count_strategy"], "exact")
+
+    def test_cached_count_is_reused_per_filter(self):
+        """
+        Test that cached counts are keyed by the filter querystring only.
+        """
+        payload = self.get_payload({"count": "cached", "published": "false"})
+        self.assertEqual(payload["count"], 3)
+        self.assertEqual(payload["count_strategy"], "cached")
+
+        Article.objects.create(title="Article 4", body="body", author=self.admin_user)
+        payload = self.get_payload(
+            {"count": "cached", "published": "false", "page_size": 2}
+        )
+        self.assertEqual(payload["count"], 3)
+
+        payload = self.get_payload({"count": "cached", "published": "true"})
+        self.assertEqual(payload["count"], 0)
+
+    def test_estimate_falls_back_to_exact(self):
+        """
+        Test that estimates fall back to exact counts when unavailable or small.
+        """
+        payload = self.get_payload({"count": "estimate"})
+        self.assertEqual(payload["count"], 3)
+        self.assertEqual(payload["count_strategy"], "exact")
+
+    def test_low_estimate_keeps_trailing_pages(self):
+        """
+        Test that an estimate below the row count still serves the last pages.
+        """
+        with mock.patch("CMS.pagination.count_queryset", return_value=(1, "estimate")):
+            payload = self.get_payload({"count": "estimate", "page_size": 1, "page": 2})
+            self.assertEqual(payload["count"], 1)
+            self.assertEqual(len(payload["results"]), 1)
+            self.assertIn("page=3", payload["next"])
+            self.assertIn("page_size=1", payload["previous"])
+
+            payload = self.get_payload({"count": "estimate", "page_size": 1, "page": 3})
+            self.assertEqual(len(payload["results"]), 1)
+            self.assertIsNone(payload["next"])
+            self.assertIn("page=2", payload["previous"])
+
+            response = self.client.get(
+                "/api/articles/", {"count": "estimate", "page_size": 1, "page": 4}
+            )
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_high_cached_count_has_no_empty_pages(self):
+        """
+        Test that a cached count above the row count links to no page past the rows.
+        """
+        with mock.patch("CMS.pagination.count_queryset", return_value=(100, "cached")):
+            payload = self.get_payload({"count": "cached", "page_size": 2, "page": 2})
+            self.assertEqual(payload["count"], 100)
+            self.assertEqual(len(payload["results"]), 1)
+            self.assertIsNone(payload["next"])
+
+            response = self.client.get(
+                "/api/articles/", {"count": "cached", "page_size": 2, "page": 3}
+            )
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QueryPlanTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up users, articles and comments for the list endpoints.
+        """
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            username="adminuser",
+            email="admin@example.com",
+            password="adminpassword",
+            role="admin",
+        )
+        self.article = Article.objects.create(
+            title="Article 1", body="body", author=self.admin_user, published=True
+        )
+        Comment.objects.create(
+            body="comment", article=self.article, commenter=self.admin_user
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # Tiny test tables are always cheaper to seq scan
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("EXPLAIN " + sql)
+            else:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+    def assert_uses_index(self, url, params, table):
+        """
+        Runs the endpoint and checks the plan of every query on `table`.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if f'FROM "{table}"' in query["sql"]
+        ]
+        self.assertTrue(queries, f"No query on {table}")
+        for sql in queries:
+            plan = self.explain(sql)
+            message = f"Sequential scan on {table}:\n{sql}\n{plan}"
+            self.assertNotIn(f"Seq Scan on {table}", plan, message)
+            self.assertNotRegex(plan, rf"SCAN {table}(?! USING)", message)
+            self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan, message)
+
+    def test_comment_list_uses_article_index(self):
+        """
+        Test that comments of an article are read through (article_id, -id).
+        """
+        self.assert_uses_index(
+            f"/api/articles/{self.article.id}/comments/", {}, "article_comment"
+        )
+
+    def test_published_article_list_uses_partial_index(self):
+        """
+        Test that the published filter uses the partial index.
+        """
+        self.assert_uses_index("/api/articles/", {"published": "true"}, "article_article")
+
+    def test_article_title_filter_uses_index(self):
+        """
+        Test that the title filter uses the title index.
+        """
+        self.assert_uses_index("/api/articles/", {"title": "Article 1"}, "article_article")
+
+    def test_user_role_filter_uses_index(self):
+        """
+        Test that the role filter uses the (role, -id) index.
+        """
+        self.assert_uses_index("/api/users/", {"role": "author"}, "article_user")
+
+
+class CachedJWTAuthenticationTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up a viewer with a real access token.
+        """
+        user_cache.clear()
+        self.viewer_user = get_user_model().objects.create_user(
+            email="viewer@example.com",
+            password="viewerpass",
+            role="viewer",
+            username="viewerexample",
+        )
+        token = str(RefreshToken.for_user(self.viewer_user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if 'FROM "article_user"' in query["sql"]
+        ]
+        return response, queries
+
+    def test_user_lookup_is_cached(self):
+        """
+        Test that only the first request loads the token user.
+        """
+        response, queries = self.user_queries("/api/articles/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.user_queries("/api/articles/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+        self.assertEqual(user_cache.stats()["hits"], 1)
+
+    def test_role_change_invalidates_cache(self):
+        """
+        Test that a role change applies on the next request.
+        """
+        response, _ = self.user_queries("/api/users/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.viewer_user.role = "admin"
+        self.viewer_user.save()
+        response, _ = self.user_queries("/api/users/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_is_rejected(self):
+        """
+        Test that deactivation applies to cached users.
+        """
+        self.user_queries("/api/articles/")
+        self.viewer_user.is_active = False
+        self.viewer_user.save()
+        response, _ = self.user_queries("/api/articles/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(
+        JWT_USER_CACHE={"MAX_SIZE": 1, "TIMEOUT": 30, "SHARED": False}
+    )
+    def test_cache_is_bounded(self):
+        """
+        Test that the LRU evicts past MAX_SIZE.
+        """
+        user_cache.set(1, self.viewer_user)
+        user_cache.set(2, self.viewer_user)
+        self.assertIsNone(user_cache.get(1))
+        self.assertIsNotNone(user_cache.get(2))
+
+
+class ClaimsTokenTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up a viewer and an admin.
+        """
+        cache.clear()
+        user_cache.clear()
+        self.viewer_user = get_user_model().objects.create_user(
+            email="viewer@example.com",
+            password="viewerpass",
+            role="viewer",
+            username="viewerexample",
+        )
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com",
+            password="adminpass",
+            role="admin",
+            username="adminexample",
+        )
+
+    def login(self, email, password):
+        self.client.credentials()
+        response = self.client.post(
+            "/api/login/", {"email": email, "password": password}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = response.data["payload"]["access_token"]
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+        return AccessToken(token)
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if 'FROM "article_user"' in query["sql"]
+        ]
+        return response, queries
+
+    def test_tokens_carry_claims(self):
+        """
+        Test that login and the token endpoint issue role/is_active/token_version claims.
+        """
+        token = self.login("viewer@example.com", "viewerpass")
+        self.assertEqual(token["role"], "viewer")
+        self.assertTrue(token["is_active"])
+        self.assertEqual(token["token_version"], 0)
+
+        response = self.client.post(
+            "/api/token/",
+            {"email": "admin@example.com", "password": "adminpass"},
+            format="json",
+        )
+        self.assertEqual(AccessToken(response.data["access"])["role"], "admin")
+
+    def test_user_payloads_hide_token_version(self):
+        """
+        Test that the revocation counter is not part of login, user or export payloads.
+        """
+        self.login("admin@example.com", "adminpass")
+        response = self.client.post(
+            "/api/login/",
+            {"email": "viewer@example.com", "password": "viewerpass"},
+            format="json",
+        )
+        self.assertNotIn("token_version", response.data["payload"]["user"])
+        self.login("admin@example.com", "adminpass")
+        response = self.client.get(f"/api/users/{self.viewer_user.id}/")
+        self.assertNotIn("token_version", response.data["payload"])
+        response = self.client.get("/api/users/")
+        self.assertNotIn("token_version", response.data["payload"]["results"][0])
+        response = self.client.get("/api/users/export/")
+        self.assertNotIn(b"token_version", b"".join(response.streaming_content))
+
+    def test_permission_checks_skip_the_user_row(self):
+        """
+        Test that requests authorise from the claims, reading only the token version once.
+        """
+        self.login("admin@example.com", "adminpass")
+        response, queries = self.user_queries("/api/metrics/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"token_version"', queries[0])
+        self.assertNotIn('"password"', queries[0])
+
+        response, queries = self.user_queries("/api/metrics/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+
+    def test_role_change_revokes_tokens(self):
+        """
+        Test that a role change rejects older tokens until the user logs in again.
+        """
+        self.login("viewer@example.com", "viewerpass")
+        response, _ = self.user_queries("/api/users/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.viewer_user.role = "admin"
+        self.viewer_user.save()
+        self.assertEqual(self.viewer_user.token_version, 1)
+        response, _ = self.user_queries("/api/users/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.login("viewer@example.com", "viewerpass")
+        response, _ = self.user_queries("/api/users/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(JWT_CLAIMS_USER=False)
+    def test_token_version_is_checked_without_claims_user(self):
+        """
+        Test that revocation also applies when the full user is loaded.
+        """
+        self.login("viewer@example.com", "viewerpass")
+        response, _ = self.user_queries("/api/articles/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.viewer_user.is_delete = True
+        self.viewer_user.save(update_fields=["is_delete"])
+        self.viewer_user.is_delete = False
+        self.viewer_user.save(update_fields=["is_delete"])
+        response, _ = self.user_queries("/api/articles/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_claims_user_loads_the_row_on_demand(self):
+        """
+        Test that non-claim attributes load the user and ids compare with User instances.
+        """
+        token = ClaimsRefreshToken.for_user(self.viewer_user).access_token
+        user = ClaimsUser(token, lambda pk: get_user_model().objects.get(pk=pk))
+        with self.assertNumQueries(0):
+            self.assertEqual(user.role, "viewer")
+            self.assertEqual(user, self.viewer_user)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "viewer@example.com")
+            self.assertEqual(user.username, "viewerexample")
+
+
+class RegistrationTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up an existing user and registration data.
+        """
+        get_user_model().objects.create_user(
+            email="viewer@example.com",
+            password="viewerpass",
+            role="viewer",
+            username="viewerexample",
+        )
+        self.data = {
+            "email": "new@example.com",
+            "password": "newpass123",
+            "role": "author",
+            "username": "newexample",
+            "first_name": "new",
+            "last_name": "user",
+        }
+
+    def register(self, **data):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                "/api/register/", {**self.data, **data}, format="json"
+            )
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if '"article_user"' in query["sql"]
+        ]
+        return response, queries
+
+    def test_register_is_a_single_insert(self):
+        """
+        Test that registration writes the hashed user with one INSERT and no lookup.
+        """
+        response, queries = self.register()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0].startswith("INSERT"))
+        user = get_user_model().objects.get(email="new@example.com")
+        self.assertEqual(user.role, "author")
+        self.assertTrue(user.check_password("newpass123"))
+
+    def test_register_duplicate_email(self):
+        """
+        Test that the email unique constraint answers with the 400 message.
+        """
+        response, _ = self.register(email="viewer@example.com")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data["success"])
+        self.assertEqual(
+            response.data["message"],
+            "viewer@example.com is already registered, please try different email.",
+        )
+        self.assertEqual(get_user_model().objects.count(), 1)
+
+    def test_register_duplicate_username(self):
+        """
+        Test that a taken username is reported on the username field.
+        """
+        response, _ = self.register(username="viewerexample")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["username"], ["A user with that username already exists."]
+        )
+
+    def test_register_duplicate_username_mentioning_email(self):
+        """
+        Test that the violated constraint, not the error text, picks the field.
+        """
+        # PostgreSQL quotes the conflicting value: "Key (username)=(myemail)"
+        error = IntegrityError(
+            'duplicate key value violates unique constraint "article_user_username_key"'
+            "\nDETAIL:  Key (username)=(myemail) already exists."
+        )
+        error.__cause__ = Exception()
+        error.__cause__.diag = SimpleNamespace(
+            constraint_name="article_user_username_key"
+        )
+        constraints = {
+            "article_user_username_key": {"columns": ["username"], "unique": True},
+            "article_user_email_key": {"columns": ["email"], "unique": True},
+        }
+        with mock.patch.object(User, "save", side_effect=error), mock.patch.object(
+            connection.introspection, "get_constraints", return_value=constraints
+        ):
+            response, _ = self.register(username="myemail")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["username"], ["A user with that username already exists."]
+        )
+
+    def test_register_validates_username_format(self):
+        """
+        Test that the username validator still applies.
+        """
+        response, queries = self.register(username="not valid!")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("username", response.data)
+        self.assertEqual(queries, [])
+
+
+class PasswordHashingPoolTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up a user and a fresh pool.
+        """
+        password_hashing.reset_stats()
+        self.user = get_user_model().objects.create_user(
+            email="viewer@example.com",
+            password="viewerpass",
+            role="viewer",
+            username="viewerexample",
+        )
+        self.login_data = {"email": "viewer@example.com", "password": "viewerpass"}
+
+    def occupy_workers(self):
+        """
+        Blocks every pool worker until the returned event is set.
+        """
+        release = threading.Event()
+
+        def block():
+            try:
+                password_hashing.run(release.wait, 5)
+            except HashingUnavailable:
+                pass
+
+        threads = [
+            threading.Thread(target=block)
+            for _ in range(settings.PASSWORD_HASHING["WORKERS"])
+        ]
+        for thread in threads:
+            thread.start()
+        while password_hashing.stats()["running"] < len(threads):
+            time.sleep(0.01)
+        self.addCleanup(lambda: [release.set(), *[t.join() for t in threads]])
+        return release
+
+    def test_login_and_register_hash_on_the_pool(self):
+        """
+        Test that login and registration run their hashing on the pool.
+        """
+        response = self.client.post("/api/login/", self.login_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(
+            "/api/register/",
+            {
+                "email": "new@example.com",
+                "password": "newpass123",
+                "role": "viewer",
+                "username": "newexample",
+                "first_name": "new",
+                "last_name": "user",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            get_user_model().objects.get(email="new@example.com").check_password(
+                "newpass123"
+            )
+        )
+        self.assertEqual(password_hashing.stats()["completed"], 2)
+
+    @override_settings(
+        PASSWORD_HASHING={"WORKERS": 1, "QUEUE_SIZE": 0, "TIMEOUT": 5, "RETRY_AFTER": 3}
+    )
+    def test_saturated_pool_rejects_with_429(self):
+        """
+        Test that a full pool rejects logins and registrations right away.
+        """
+        self.occupy_workers()
+        response = self.client.post("/api/login/", self.login_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "3")
+
+        response = self.client.post(
+            "/api/register/",
+            {
+                "email": "new@example.com",
+                "password": "newpass123",
+                "role": "viewer",
+                "username": "newexample",
+                "first_name": "new",
+                "last_name": "user",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertFalse(get_user_model().objects.filter(email="new@example.com").exists())
+        self.assertEqual(password_hashing.stats()["rejected"], 2)
+
+    @override_settings(
+        PASSWORD_HASHING={"WORKERS": 1, "QUEUE_SIZE": 1, "TIMEOUT": 0.05, "RETRY_AFTER": 1}
+    )
+    def test_queued_hash_times_out_with_503(self):
+        """
+        Test that a login waiting longer than TIMEOUT in the queue gets 503.
+        """
+        self.occupy_workers()
+        response = self.client.post("/api/login/", self.login_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "1")
+        # The cancelled login no longer holds a queue slot
+        self.assertEqual(password_hashing.stats()["queued"], 0)
+        self.assertGreaterEqual(password_hashing.stats()["timeouts"], 1)
+
+    @override_settings(
+        PASSWORD_HASHING={"WORKERS": 1, "QUEUE_SIZE": 0, "TIMEOUT": 5, "RETRY_AFTER": 3}
+    )
+    def test_saturated_pool_refuses_admin_login(self):
+        """
+        Test that the admin login form refuses the login instead of failing with 500.
+        """
+        self.user.is_staff = True
+        self.user.save()
+        self.occupy_workers()
+        response = self.client.post(
+            "/admin/login/",
+            {"username": "viewer@example.com", "password": "viewerpass"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.context["form"].is_valid())
+        self.assertNotIn("_auth_user_id", self.client.session)
+
+        # /api/token/ is a DRF view and answers 429
+        response = self.client.post(
+            "/api/token/",
+            {"email": "viewer@example.com", "password": "viewerpass"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_metrics_report_the_pool(self):
+        """
+        Test that /api/metrics/ reports the hashing pool.
+        """
+        self.user.role = "admin"
+        self.user.save()
+        response = self.client.post("/api/login/", self.login_data, format="json")
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer " + response.data["payload"]["access_token"]
+        )
+        response = self.client.get("/api/metrics/")
+        stats = response.data["payload"]["password_hashing"]
+        self.assertEqual(stats["completed"], 1)
+        self.assertEqual(stats["queued"], 0)
+        self.assertEqual(stats["workers"], settings.PASSWORD_HASHING["WORKERS"])
+
+
+class CommentStatsTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up an author, a viewer and three articles.
+        """
+        cache.clear()
+        user_cache.clear()
+        self.author_user = get_user_model().objects.create_user(
+            email="author@example.com",
+            password="authorpass",
+            role="author",
+            username="authorexample",
+        )
+        self.viewer_user = get_user_model().objects.create_user(
+            email="viewer@example.com",
+            password="viewerpass",
+            role="viewer",
+            username="viewerexample",
+        )
+        self.articles = [
+            Article.objects.create(
+                title=f"Article {index}", body="Body", author=self.author_user
+            )
+            for index in range(3)
+        ]
+        self.client.force_authenticate(user=self.viewer_user)
+
+    def comment(self, article, body="Comment"):
+        response = self.client.post(
+            f"/api/articles/{article.id}/comments/", {"body": body}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Comment.objects.get(pk=response.data["payload"]["id"])
+
+    def test_comments_update_the_article_stats(self):
+        """
+        Test that creating and deleting comments keep count and last activity, also in cached responses.
+        """
+        article = self.articles[0]
+        response = self.client.get(f"/api/articles/{article.id}/")
+        self.assertEqual(response.data["payload"]["comment_count"], 0)
+        self.assertIsNone(response.data["payload"]["last_commented_at"])
+
+        first = self.comment(article)
+        second = self.comment(article)
+        response = self.client.get(f"/api/articles/{article.id}/")
+        self.assertEqual(response.data["payload"]["comment_count"], 2)
+        article.refresh_from_db()
+        self.assertEqual(article.last_commented_at, second.created_at)
+
+        response = self.client.delete(f"/api/comments/{second.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        article.refresh_from_db()
+        self.assertEqual(article.comment_count, 1)
+        self.assertEqual(article.last_commented_at, first.created_at)
+
+        first.delete()
+        article.refresh_from_db()
+        self.assertEqual(article.comment_count, 0)
+        self.assertIsNone(article.last_commented_at)
+
+    def test_article_save_keeps_the_stats(self):
+        """
+        Test that saving an article loaded before a comment does not reset its stats.
+        """
+        stale = Article.objects.get(pk=self.articles[0].pk)
+        self.comment(self.articles[0])
+        stale.title = "Renamed"
+        stale.save()
+        stale.refresh_from_db()
+        self.assertEqual(stale.title, "Renamed")
+        self.assertEqual(stale.comment_count, 1)
+
+    def test_filter_and_order_by_stats(self):
+        """
+        Test filtering and ordering the article list on the comment stats.
+        """
+        for _ in range(2):
+            self.comment(self.articles[0])
+        self.comment(self.articles[1])
+
+        response = self.client.get("/api/articles/?ordering=-comment_count")
+        ids = [row["id"] for row in response.data["payload"]["results"]]
+        self.assertEqual(ids, [self.articles[0].id, self.articles[1].id, self.articles[2].id])
+
+        response = self.client.get("/api/articles/?ordering=-last_commented_at")
+        ids = [row["id"] for row in response.data["payload"]["results"]]
+        # Never commented articles come last in both directions
+        self.assertEqual(ids[-1], self.articles[2].id)
+        response = self.client.get("/api/articles/?ordering=last_commented_at")
+        ids = [row["id"] for row in response.data["payload"]["results"]]
+        self.assertEqual(ids[-1], self.articles[2].id)
+
+        response = self.client.get("/api/articles/?comment_count__gte=1")
+        self.assertEqual(response.data["payload"]["count"], 2)
+        response = self.client.get("/api/articles/?last_commented_at__isnull=true")
+        self.assertEqual(
+            [row["id"] for row in response.data["payload"]["results"]],
+            [self.articles[2].id],
+        )
+
+    def test_cursor_mode_rejects_ordering(self):
+        """
+        Test that cursor pagination refuses an ordering it cannot page on.
+        """
+        response = self.client.get("/api/articles/?pagination=cursor&ordering=-comment_count")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ordering", response.data)
+
+    def test_deleting_a_commenter_refreshes_the_stats(self):
+        """
+        Test that deleting a user refreshes the articles they commented on at once.
+        """
+        self.comment(self.articles[0])
+        self.comment(self.articles[1])
+        self.viewer_user.delete()
+        self.assertEqual(
+            list(Article.objects.order_by("id").values_list("comment_count", flat=True)),
+            [0, 0, 0],
+        )
+
+    def test_failed_stats_update_rolls_back_the_comment(self):
+        """
+        Test that a comment is not kept when its article stats update fails.
+        """
+        comment = self.comment(self.articles[0])
+        with mock.patch(
+            "article.signals.comment_added", side_effect=DatabaseError("boom")
+        ), self.assertRaises(DatabaseError):
+            self.client.post(
+                f"/api/articles/{self.articles[0].id}/comments/",
+                {"body": "Lost"},
+                format="json",
+            )
+        with mock.patch(
+            "article.signals.comment_removed", side_effect=DatabaseError("boom")
+        ), self.assertRaises(DatabaseError):
+            self.client.delete(f"/api/comments/{comment.id}/")
+        self.assertEqual(
+            list(Comment.objects.values_list("id", flat=True)), [comment.id]
+        )
+        self.articles[0].refresh_from_db()
+        self.assertEqual(self.articles[0].comment_count, 1)
+
+    def test_soft_deleted_commenters_are_not_counted(self):
+        """
+        Test that the stats leave out comments by soft deleted users, like the comment list.
+        """
+        first = self.comment(self.articles[0])
+        self.comment(self.articles[0])
+        self.client.force_authenticate(user=self.author_user)
+        self.comment(self.articles[0])
+        second_viewer = get_user_model().objects.create_user(
+            email="second@example.com",
+            password="secondpass",
+            role="viewer",
+            username="secondexample",
+        )
+        self.client.force_authenticate(user=second_viewer)
+        last = self.comment(self.articles[0])
+
+        soft_delete_user(second_viewer)
+        soft_delete_user(self.viewer_user)
+        article = Article.objects.get(pk=self.articles[0].pk)
+        self.assertEqual(article.comment_count, 1)
+        self.assertNotEqual(article.last_commented_at, last.created_at)
+        response = self.client.get(f"/api/articles/{article.id}/comments/")
+        self.assertEqual(response.data["payload"]["count"], 1)
+        self.assertEqual(list(reconcile()), [(3, [])])
+
+        # Deleting a comment that was not counted leaves the count alone
+        first.delete()
+        article.refresh_from_db()
+        self.assertEqual(article.comment_count, 1)
+
+    def test_reconcile_command_fixes_drift(self):
+        """
+        Test that reconcile_comment_stats rewrites only the drifted articles.
+        """
+        comment = self.comment(self.articles[0])
+        Article.objects.filter(pk=self.articles[0].pk).update(comment_count=7)
+        Article.objects.filter(pk=self.articles[1].pk).update(
+            last_commented_at=comment.created_at
+        )
+        stdout = StringIO()
+        call_command("reconcile_comment_stats", batch_size=2, stdout=stdout)
+
+        self.assertIn("3 articles, 2 fixed", stdout.getvalue())
+        self.assertEqual(
+            list(
+                Article.objects.order_by("id").values_list(
+                    "comment_count", "last_commented_at"
+                )
+            ),
+            [(1, comment.created_at), (0, None), (0, None)],
+        )
+
+
+class SoftDeleteTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up an admin, an author with two articles and a viewer who
+        commented on them and on an admin article.
+        """
+        cache.clear()
+        user_cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com",
+            password="adminpass",
+            role="admin",
+            username="adminexample",
+        )
+        self.author_user = get_user_model().objects.create_user(
+            email="author@example.com",
+            password="authorpass",
+            role="author",
+            username="authorexample",
+        )
+        self.viewer_user = get_user_model().objects.create_user(
+            email="viewer@example.com",
+            password="viewerpass",
+            role="viewer",
+            username="viewerexample",
+        )
+        self.articles = [
+            Article.objects.create(
+                title=f"Python {index}", body="Body", author=self.author_user
+            )
+            for index in range(2)
+        ]
+        self.admin_article = Article.objects.create(
+            title="Admin", body="Body", author=self.admin_user
+        )
+        for article in [*self.articles, self.admin_article]:
+            for index in range(3):
+                Comment.objects.create(
+                    body=f"Comment {index}", article=article, commenter=self.viewer_user
+                )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_deleted_article_is_hidden_then_purged(self):
+        """
+        Test that a deleted article disappears from the API at once and is purged with its comments in batches.
+        """
+        article = self.articles[0]
+        self.assertEqual(self.client.get(f"/api/articles/{article.id}/").status_code, 200)
+        response = self.client.delete(f"/api/articles/{article.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(Article.objects.filter(pk=article.pk, is_delete=True).exists())
+
+        response = self.client.get(f"/api/articles/{article.id}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get("/api/articles/")
+        self.assertNotIn(article.id, [row["id"] for row in response.data["payload"]["results"]])
+        response = self.client.get(f"/api/articles/{article.id}/comments/")
+        self.assertEqual(response.data["payload"]["results"], [])
+        response = self.client.post(
+            f"/api/articles/{article.id}/comments/", {"body": "Late"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        stdout = StringIO()
+        call_command("purge_deleted", batch_size=2, stdout=stdout)
+        self.assertIn(f"Article {article.id}: 2 comments removed...", stdout.getvalue())
+        self.assertIn(
+            f"Article {article.id} purged, 3 comments removed.", stdout.getvalue()
+        )
+        self.assertFalse(Article.objects.filter(pk=article.pk).exists())
+        self.assertFalse(Comment.objects.filter(article_id=article.pk).exists())
+        self.assertFalse(ArticleSearchTerm.objects.filter(article_id=article.pk).exists())
+        self.assertEqual(Article.objects.count(), 2)
+
+    def test_deleted_user_is_hidden_with_their_content(self):
+        """
+        Test that deleting a user hides them, their articles and comments, and blocks their logins.
+        """
+        self.client.force_authenticate(user=None)
+        response = self.client.post(
+            "/api/login/",
+            {"email": "viewer@example.com", "password": "viewerpass"},
+            format="json",
+        )
+        token = response.data["payload"]["access_token"]
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.delete(f"/api/users/{self.viewer_user.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.delete(f"/api/users/{self.author_user.id}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get("/api/users/")
+        self.assertEqual(
+            [row["id"] for row in response.data["payload"]["results"]],
+            [self.admin_user.id],
+        )
+        response = self.client.get("/api/articles/")
+        self.assertEqual(
+            [row["id"] for row in response.data["payload"]["results"]],
+            [self.admin_article.id],
+        )
+        response = self.client.get(f"/api/articles/{self.admin_article.id}/comments/")
+        self.assertEqual(response.data["payload"]["results"], [])
+
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + token)
+        response = self.client.get(f"/api/articles/{self.admin_article.id}/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        response = self.client.post(
+            "/api/login/",
+            {"email": "viewer@example.com", "password": "viewerpass"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_purge_removes_users_and_refreshes_stats(self):
+        """
+        Test that purging deleted users removes their articles and comments and refreshes the articles they commented on.
+        """
+        soft_delete_user(self.author_user)
+        soft_delete_user(self.viewer_user)
+        stdout = StringIO()
+        call_command("purge_deleted", batch_size=2, stdout=stdout)
+
+        self.assertIn("Purging 2 users and 2 articles...", stdout.getvalue())
+        self.assertIn("Purge finished: 4 purged.", stdout.getvalue())
+        self.assertEqual(
+            list(User.objects.values_list("id", flat=True)), [self.admin_user.id]
+        )
+        self.assertEqual(
+            list(Article.objects.values_list("id", flat=True)), [self.admin_article.id]
+        )
+        self.assertFalse(Comment.objects.exists())
+        self.admin_article.refresh_from_db()
+        self.assertEqual(self.admin_article.comment_count, 0)
+        self.assertIsNone(self.admin_article.last_commented_at)
+
+
+class JobQueueTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up an admin and an article with a comment.
+        """
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com",
+            password="adminpass",
+            role="admin",
+            username="adminexample",
+        )
+        self.article = Article.objects.create(
+            title="Queued", body="Body", author=self.admin_user
+        )
+        Comment.objects.create(
+            body="Comment", article=self.article, commenter=self.admin_user
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.calls = []
+
+    def run_worker(self, **options):
+        stdout = StringIO()
+        call_command("run_jobs", burst=True, concurrency=1, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def flaky(self, fail_times):
+        def job(value):
+            self.calls.append(value)
+            if len(self.calls) <= fail_times:
+                raise ValueError(f"Attempt {len(self.calls)} failed")
+
+        return mock.patch.dict(registry, {"flaky": job})
+
+    def test_delete_queues_a_purge_job_at_commit(self):
+        """
+        Test that deleting an article queues its purge when the transaction commits and the worker runs it.
+        """
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.delete(f"/api/articles/{self.article.id}/")
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            self.assertFalse(Job.objects.exists())
+        for callback in callbacks:
+            callback()
+        job = Job.objects.get()
+        self.assertEqual(
+            (job.name, job.payload), ("purge_article", {"article_id": self.article.id})
+        )
+
+        output = self.run_worker()
+        self.assertIn("1 done", output)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.DONE, 1))
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(Article.objects.filter(pk=self.article.pk).exists())
+        self.assertFalse(Comment.objects.exists())
+
+    def test_failed_jobs_retry_with_backoff(self):
+        """
+        Test that a failing job is re-queued with exponential backoff, then marked failed after max_attempts.
+        """
+        with override_settings(
+            JOB_QUEUE={
+                **settings.JOB_QUEUE,
+                "RETRY_BACKOFF": 10,
+                "RETRY_BACKOFF_MAX": 15,
+            }
+        ):
+            delays = [retry_delay(attempt) for attempt in (1, 2, 3)]
+            self.assertEqual(delays, [10, 15, 15])
+
+        with self.flaky(fail_times=1), self.captureOnCommitCallbacks(execute=True):
+            enqueue("flaky", value=1)
+        job = Job.objects.get()
+        with self.flaky(fail_times=1):
+            before = timezone.now()
+            self.run_worker()
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (JobStatus.QUEUED, 1))
+            self.assertIn("Attempt 1 failed", job.last_error)
+            backoff = timedelta(seconds=settings.JOB_QUEUE["RETRY_BACKOFF"])
+            self.assertGreaterEqual(job.run_at, before + backoff)
+
+            # Not due yet
+            self.run_worker()
+            self.assertEqual(self.calls, [1])
+            Job.objects.update(run_at=timezone.now())
+            self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.DONE, 2))
+
+        Job.objects.all().delete()
+        self.calls = []
+        with override_settings(
+            JOB_QUEUE={**settings.JOB_QUEUE, "MAX_ATTEMPTS": 3, "RETRY_BACKOFF": 0}
+        ), self.flaky(fail_times=5):
+            with self.captureOnCommitCallbacks(execute=True):
+                enqueue("flaky", value=2)
+            self.assertIn("1 failed", self.run_worker())
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (JobStatus.FAILED, 3))
+        self.assertEqual(self.calls, [2, 2, 2])
+
+    def test_claims_are_exclusive_and_stale_jobs_are_reclaimed(self):
+        """
+        Test that a claimed job is not claimed again until it is stale, and unknown jobs fail at once.
+        """
+        now = timezone.now()
+        first = Job.objects.create(name="flaky", payload={"value": 1}, run_at=now)
+        Job.objects.create(name="later", run_at=now + timedelta(hours=1))
+
+        claimed = claim("worker-a")
+        self.assertEqual((claimed.pk, claimed.locked_by), (first.pk, "worker-a"))
+        self.assertIsNone(claim("worker-b"))
+
+        Job.objects.filter(pk=first.pk).update(started_at=now - timedelta(hours=2))
+        reclaimed = claim("worker-b")
+        self.assertEqual((reclaimed.pk, reclaimed.attempts), (first.pk, 2))
+        # The first worker's result is dropped, the job belongs to worker-b now
+        with self.flaky(fail_times=0):
+            run(claimed)
+        self.assertEqual(Job.objects.get(pk=first.pk).status, JobStatus.RUNNING)
+
+        Job.objects.create(name="missing", run_at=now)
+        missing = run(claim("worker-a"))
+        self.assertEqual(missing.status, JobStatus.FAILED)
+        self.assertIn("Unknown job", missing.last_error)
+        with self.assertRaises(KeyError):
+            enqueue("missing")
+
+    def test_metrics_report_queue_depth_and_latency(self):
+        """
+        Test that /api/metrics/ reports the queue depth and the wait of started jobs.
+        """
+        now = timezone.now()
+        Job.objects.create(name="flaky", run_at=now - timedelta(seconds=30))
+        Job.objects.create(name="flaky", run_at=now + timedelta(hours=1))
+        Job.objects.create(
+            name="flaky",
+            status=JobStatus.DONE,
+            run_at=now - timedelta(seconds=2),
+            started_at=now,
+            finished_at=now,
+        )
+        response = self.client.get("/api/metrics/")
+        metrics = response.data["payload"]["job_queue"]
+        self.assertEqual(
+            (metrics["queued"], metrics["due"], metrics["running"], metrics["failed"]),
+            (2, 1, 0, 0),
+        )
+        self.assertGreaterEqual(metrics["oldest_due_seconds"], 30)
+        self.assertEqual(metrics["started_last_5m"], 1)
+        self.assertAlmostEqual(metrics["max_wait_ms"], 2000, delta=50)
+
+
+@override_settings(CACHE_SHARED=True)
+class ArticleResponseCacheTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up an admin, a viewer and one article.
+        """
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            username="adminuser",
+            email="admin@example.com",
+            password="adminpassword",
+            role="admin",
+        )
+        self.viewer_user = get_user_model().objects.create_user(
+            username="vieweruser",
+            email="viewer@example.com",
+            password="viewpassword",
+            role="viewer",
+        )
+        self.article = Article.objects.create(
+            title="Article 1", body="body", author=self.admin_user
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_list_is_served_from_cache(self):
+        """
+        Test that the second identical list request is a hit with no queries.
+        """
+        response = self.client.get("/api/articles/", {"page_size": 5})
+        self.assertEqual(response["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            cached = self.client.get("/api/articles/", {"page_size": 5})
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(cached.data, response.data)
+        self.assertEqual(response_cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_if_none_match_returns_not_modified(self):
+        """
+        Test that a matching ETag returns 304.
+        """
+        url = f"/api/articles/{self.article.id}/"
+        response = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_weak_if_none_match_returns_not_modified(self):
+        """
+        Test that the weak form of the ETag, alone or in a list, returns 304.
+        """
+        url = f"/api/articles/{self.article.id}/"
+        etag = self.client.get(url)["ETag"]
+        for header in (f"W/{etag}", f'"other", W/{etag}', "*"):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='W/"other"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cache_is_keyed_by_role(self):
+        """
+        Test that another role does not reuse the admin entry.
+        """
+        self.client.get("/api/articles/")
+        self.client.force_authenticate(user=self.viewer_user)
+        self.assertEqual(self.client.get("/api/articles/")["X-Cache"], "MISS")
+
+    def test_writes_invalidate_cache(self):
+        """
+        Test that update, publish, create and delete invalidate cached pages.
+        """
+        list_url = "/api/articles/"
+        detail_url = f"/api/articles/{self.article.id}/"
+        self.client.get(list_url)
+        self.client.get(detail_url)
+
+        self.client.patch(detail_url, {"title": "Changed"}, format="json")
+        response = self.client.get(detail_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["payload"]["title"], "Changed")
+
+        self.client.patch(
+            f"{detail_url}publish/", {"is_published": True}, format="json"
+        )
+        response = self.client.get(detail_url)
+        self.assertTrue(response.data["payload"]["published"])
+
+        self.client.post(list_url, {"title": "New", "body": "body"}, format="json")
+        response = self.client.get(list_url)
+        self.assertEqual(response.data["payload"]["count"], 2)
+
+        self.client.delete(detail_url)
+        response = self.client.get(list_url)
+        self.assertEqual(response.data["payload"]["count"], 1)
+        self.assertEqual(
+            self.client.get(detail_url).status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    @override_settings(CACHE_SHARED=False)
+    def test_per_process_cache_is_not_used(self):
+        """
+        Test that responses are not cached when every process has its own cache.
+        """
+        url = f"/api/articles/{self.article.id}/"
+        response = self.client.get(url)
+        self.assertNotIn("X-Cache", response)
+        # Written by another worker: its version bump never reaches this cache
+        Article.objects.filter(pk=self.article.pk).update(title="Elsewhere")
+        response = self.client.get(url)
+        self.assertNotIn("X-Cache", response)
+        self.assertEqual(response.data["payload"]["title"], "Elsewhere")
+        self.assertEqual(response_cache.stats(), {"hits": 0, "misses": 0})
+
+    def test_metrics_expose_cache_counters(self):
+        """
+        Test that admins can read the hit/miss counters.
+        """
+        self.client.get("/api/articles/")
+        response = self.client.get("/api/metrics/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["payload"]["article_response_cache"]["misses"], 1
+        )
+
+        self.client.force_authenticate(user=self.viewer_user)
+        response = self.client.get("/api/metrics/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class FakeConnection:
+    """
+    Stand-in for a psycopg2 connection in the pool tests.
+    """
+
+    def __init__(self):
+        self.closed = False
+        self.info = SimpleNamespace(transaction_status=TRANSACTION_STATUS_IDLE)
+
+    def close(self):
+        self.closed = True
+
+    def rollback(self):
+        self.info.transaction_status = TRANSACTION_STATUS_IDLE
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+
+    def make_pool(self, **kwargs):
+        options = {"minconn": 1, "maxconn": 2, "idle_timeout": 600, **kwargs}
+        return ConnectionPool(FakeConnection, **options)
+
+    def test_connections_are_reused(self):
+        """
+        Test that a returned connection is handed out again.
+        """
+        pool = self.make_pool()
+        connection = pool.getconn()
+        pool.putconn(connection)
+        self.assertIs(pool.getconn(), connection)
+
+    def test_open_transactions_are_rolled_back(self):
+        """
+        Test that connections come back to the pool idle.
+        """
+        pool = self.make_pool()
+        connection = pool.getconn()
+        connection.info.transaction_status = TRANSACTION_STATUS_INTRANS
+        pool.putconn(connection)
+        self.assertEqual(connection.info.transaction_status, TRANSACTION_STATUS_IDLE)
+
+    def test_exhausted_pool_fails_after_timeout(self):
+        """
+        Test that MAX_SIZE is enforced and reported in the stats.
+        """
+        pool = self.make_pool(timeout=0.05)
+        held = [pool.getconn(), pool.getconn()]
+        with self.assertRaises(psycopg2_pool.PoolError):
+            pool.getconn()
+
+        stats = pool.stats()
+        self.assertEqual(stats["in_use"], 2)
+        self.assertEqual(stats["utilisation"], 1.0)
+        self.assertEqual(stats["exhausted"], 1)
+        self.assertGreater(stats["waits"], 0)
+        self.assertEqual(len(held), 2)
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], CACHE_SHARED=True)
+class ReplicaRoutingTestCase(APITestCase):
+    """
+    Routing between `default` and a second SQLite database registered as the
+    `replica` alias. Rows created only on one side tell which one answered.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Registered after the test case set-up: the alias is not known to the
+        # test runner, the replica is a throwaway file outside its transactions
+        super().setUpClass()
+        cls.replica_directory = tempfile.TemporaryDirectory()
+        configured = connections.configure_settings(
+            {
+                "default": connections.settings["default"],
+                "replica": {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": os.path.join(cls.replica_directory.name, "replica.db"),
+                },
+            }
+        )
+        connections.settings["replica"] = configured["replica"]
+        call_command("migrate", database="replica", verbosity=0)
+        # bulk_create skips the signals, which would write to the primary
+        Article.objects.using("replica").bulk_create(
+            [Article(title="Replica", body="body", excerpt="body")]
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        cls.replica_directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        """
+        Set up an author, an article on the primary and one only on the replica.
+        """
+        cache.clear()
+        replica_lag.clear()
+        self.author_user = get_user_model().objects.create_user(
+            email="author@example.com",
+            password="authorpass",
+            role="author",
+            username="authorexample",
+        )
+        Article.objects.create(title="Primary", body="body", author=self.author_user)
+        self.client.force_authenticate(user=self.author_user)
+
+    def titles(self, params=None, **extra):
+        response = self.client.get("/api/articles/", params, **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row["title"] for row in response.data["payload"]["results"]]
+
+    def test_reads_use_the_replica(self):
+        """
+        Test that GET requests are answered from the replica.
+        """
+        self.assertEqual(self.titles(), ["Replica"])
+        self.assertEqual(replica_lag.stats(), {"replica": {"lag": 0.0, "usable": True}})
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_reads_use_the_primary(self):
+        """
+        Test that nothing is routed when no replica is configured.
+        """
+        self.assertEqual(self.titles(), ["Primary"])
+
+    @override_settings(CACHE_SHARED=False)
+    def test_per_process_cache_reads_use_the_primary(self):
+        """
+        Test that replicas are not read when the sticky marker cannot be shared.
+        """
+        self.assertEqual(self.titles(), ["Primary"])
+
+    def test_writes_use_the_primary_and_stick(self):
+        """
+        Test that a write goes to the primary and the writer reads its writes.
+        """
+        response = self.client.post(
+            "/api/articles/", {"title": "Written", "body": "body"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Article.objects.using("default").filter(title="Written").exists())
+        self.assertFalse(Article.objects.using("replica").filter(title="Written").exists())
+
+        self.assertEqual(self.titles(), ["Written", "Primary"])
+        # Other clients keep reading from the replica (another page size
+        # skips the list response cached by the first read)
+        self.assertEqual(
+            self.titles({"page_size": 5}, REMOTE_ADDR="10.0.0.2"), ["Replica"]
+        )
+
+    @override_settings(DATABASE_REPLICA_STICKY_SECONDS=0)
+    def test_failed_writes_do_not_stick(self):
+        """
+        Test that a rejected write does not pin the client to the primary.
+        """
+        response = self.client.post("/api/articles/", {"title": ""}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.titles(), ["Replica"])
+
+    def test_lagging_or_unreachable_replica_falls_back(self):
+        """
+        Test that reads go to the primary when the replica lags or is down.
+        """
+        with mock.patch.object(replica_lag, "measure", return_value=60.0):
+            self.assertEqual(self.titles(), ["Primary"])
+        self.assertFalse(replica_lag.stats()["replica"]["usable"])
+
+        replica_lag.clear()
+        with mock.patch.object(replica_lag, "measure", return_value=None):
+            self.assertEqual(self.titles(), ["Primary"])
+
+        replica_lag.clear()
+        cache.clear()
+        self.assertEqual(self.titles(), ["Replica"])
+
+    def test_streams_and_exports_use_the_replica(self):
+        """
+        Test that streamed lists and exports keep reading from the replica.
+        """
+        response = self.client.get("/api/articles/", {"stream": "true"})
+        data = json.loads(b"".join(response.streaming_content))
+        titles = [row["title"] for row in data["payload"]["results"]]
+        self.assertEqual(titles, ["Replica"])
+
+        response = self.client.get("/api/articles/export/")
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual([json.loads(line)["title"] for line in lines], ["Replica"])
+
+
+class SparseFieldsTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up an admin with an article and a comment.
+        """
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            username="adminuser",
+            email="admin@example.com",
+            password="adminpassword",
+            role="admin",
+        )
+        self.article = Article.objects.create(
+            title="Article 1",
+            body="First   line\n" + "word " * 100,
+            author=self.admin_user,
+            published=True,
+        )
+        Comment.objects.create(
+            body="comment", article=self.article, commenter=self.admin_user
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def get_with_queries(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [query["sql"] for query in context.captured_queries]
+
+    def test_excerpt_is_computed_on_save(self):
+        """
+        Test that the excerpt collapses whitespace, is truncated and follows body updates.
+        """
+        self.assertTrue(self.article.excerpt.startswith("First line word"))
+        self.assertEqual(len(self.article.excerpt), EXCERPT_LENGTH)
+
+        self.article.body = "Short body"
+        self.article.save(update_fields=["body"])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.excerpt, "Short body")
+
+    def test_article_list_fields(self):
+        """
+        Test that `?fields=` renders only those fields and never selects `body`.
+        """
+        response, queries = self.get_with_queries(
+            "/api/articles/", {"fields": "id,title,excerpt"}
+        )
+        result = response.data["payload"]["results"][0]
+        self.assertEqual(set(result), {"id", "title", "excerpt"})
+        self.assertFalse([sql for sql in queries if '"article_article"."body"' in sql])
+
+    def test_article_detail_omit(self):
+        """
+        Test that `?omit=` drops fields from the article detail.
+        """
+        response, queries = self.get_with_queries(
+            f"/api/articles/{self.article.id}/", {"omit": "body"}
+        )
+        self.assertNotIn("body", response.data["payload"])
+        self.assertIn("excerpt", response.data["payload"])
+        self.assertFalse([sql for sql in queries if '"article_article"."body"' in sql])
+
+    def test_comment_and_user_fields(self):
+        """
+        Test that comments and users accept `?fields=` as well.
+        """
+        response, _ = self.get_with_queries(
+            f"/api/articles/{self.article.id}/comments/",
+            {"fields": "id,commenter", "expand": "commenter"},
+        )
+        result = response.data["payload"]["results"][0]
+        self.assertEqual(set(result), {"id", "commenter"})
+        self.assertEqual(result["commenter"]["username"], "adminuser")
+
+        response, _ = self.get_with_queries("/api/users/", {"omit": "email,role"})
+        result = response.data["payload"]["results"][0]
+        self.assertNotIn("email", result)
+        self.assertIn("username", result)
+
+
+@override_settings(PAGINATION_MAX_PAGE_SIZE=3, PAGINATION_STREAM_CHUNK_SIZE=2)
+class PageSizeLimitTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up an admin with more articles and comments than the max page size.
+        """
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            username="adminuser",
+            email="admin@example.com",
+            password="adminpassword",
+            role="admin",
+        )
+        self.articles = [
+            Article.objects.create(
+                title=f"Article {index}", body="body", author=self.admin_user
+            )
+            for index in range(5)
+        ]
+        for index in range(5):
+            Comment.objects.create(
+                body=f"comment {index}",
+                article=self.articles[0],
+                commenter=self.admin_user,
+            )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def read_stream(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        with CaptureQueriesContext(connection) as context:
+            content = b"".join(response.streaming_content)
+        return json.loads(content), len(context.captured_queries)
+
+    def test_page_size_is_capped(self):
+        """
+        Test that a page_size above the limit returns a capped page.
+        """
+        response = self.client.get("/api/articles/", {"page_size": 1000000})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["payload"]["results"]), 3)
+        self.assertIsNotNone(response.data["payload"]["next"])
+
+    def test_stream_returns_every_article_in_chunks(self):
+        """
+        Test that `?stream=true` returns all rows with a single query and is not cached.
+        """
+        for _ in range(2):
+            response = self.client.get("/api/articles/", {"stream": "true"})
+            data, queries = self.read_stream(response)
+            self.assertNotIn("X-Cache", response)
+            self.assertTrue(data["success"])
+            self.assertEqual(
+                [article["id"] for article in data["payload"]["results"]],
+                [article.id for article in reversed(self.articles)],
+            )
+            self.assertEqual(queries, 1)
+
+    def test_stream_applies_filters_and_fields(self):
+        """
+        Test that streaming honours filters and sparse fields.
+        """
+        response = self.client.get(
+            "/api/articles/", {"stream": "true", "search": "article", "fields": "id"}
+        )
+        data, _ = self.read_stream(response)
+        self.assertEqual(len(data["payload"]["results"]), 5)
+        self.assertEqual(set(data["payload"]["results"][0]), {"id"})
+
+        response = self.client.get("/api/articles/", {"stream": "true", "title": "Article 1"})
+        data, _ = self.read_stream(response)
+        self.assertEqual(len(data["payload"]["results"]), 1)
+
+    def test_stream_comments_and_users(self):
+        """
+        Test that the comment and user lists stream as well.
+        """
+        response = self.client.get(
+            f"/api/articles/{self.articles[0].id}/comments/", {"stream": "1"}
+        )
+        data, _ = self.read_stream(response)
+        self.assertEqual(len(data["payload"]["results"]), 5)
+
+        response = self.client.get("/api/users/", {"stream": "true"})
+        data, _ = self.read_stream(response)
+        self.assertEqual(data["payload"]["results"][0]["username"], "adminuser")
+
+
+@override_settings(PAGINATION_STREAM_CHUNK_SIZE=2)
+class ExportTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up users, articles and comments to export.
+        """
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            username="adminuser",
+            email="admin@example.com",
+            password="adminpassword",
+            role="admin",
+        )
+        self.viewer_user = get_user_model().objects.create_user(
+            username="vieweruser",
+            email="viewer@example.com",
+            password="viewpassword",
+            role="viewer",
+        )
+        self.articles = [
+            Article.objects.create(
+                title=f"Article {index}",
+                body="body",
+                author=self.admin_user,
+                published=index % 2 == 0,
+            )
+            for index in range(5)
+        ]
+        for index in range(3):
+            Comment.objects.create(
+                body=f"comment {index}",
+                article=self.articles[0],
+                commenter=self.viewer_user,
+            )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def export(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params or {})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            content = b"".join(response.streaming_content).decode()
+        queries = [query["sql"] for query in context.captured_queries]
+        return response, content, queries
+
+    def test_export_articles_ndjson(self):
+        """
+        Test that articles export as NDJSON in id order without a COUNT.
+        """
+        response, content, queries = self.export("/api/articles/export/")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row["id"] for row in rows], [a.id for a in self.articles])
+        self.assertFalse([sql for sql in queries if "COUNT(" in sql])
+
+    def test_export_applies_filters_and_resumes(self):
+        """
+        Test that list filters apply and `since_id` resumes after the last row.
+        """
+        _, content, _ = self.export(
+            "/api/articles/export/",
+            {"published": "true", "since_id": self.articles[0].id},
+        )
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            [row["id"] for row in rows], [self.articles[2].id, self.articles[4].id]
+        )
+
+    def test_export_csv(self):
+        """
+        Test that the CSV export has a header row and one row per article.
+        """
+        response, content, _ = self.export(
+            "/api/articles/export/", {"export_format": "csv", "fields": "id,title"}
+        )
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="articles.csv"', response["Content-Disposition"])
+        lines = content.splitlines()
+        self.assertEqual(lines[0], "id,title")
+        self.assertEqual(lines[1], f"{self.articles[0].id},Article 0")
+        self.assertEqual(len(lines), 6)
+
+    def test_export_comments(self):
+        """
+        Test that comments of an article export with nested values as JSON in CSV.
+        """
+        _, content, _ = self.export(
+            f"/api/articles/{self.articles[0].id}/comments/export/",
+            {"export_format": "csv", "fields": "id,commenter", "expand": "commenter"},
+        )
+        lines = content.splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertIn('""username"": ""vieweruser""', lines[1])
+
+    def test_export_comments_of_missing_article(self):
+        """
+        Test that exporting the comments of a missing or deleted article returns 404.
+        """
+        soft_delete_article(self.articles[1])
+        for article_id in (self.articles[1].id, 0):
+            response = self.client.get(f"/api/articles/{article_id}/comments/export/")
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            self.assertEqual(response.data["message"], "Article not found.")
+
+    def test_empty_csv_export_has_a_header(self):
+        """
+        Test that a CSV export without rows still has its header row.
+        """
+        _, content, _ = self.export(
+            "/api/articles/export/",
+            {"export_format": "csv", "fields": "id,title", "title": "None"},
+        )
+        self.assertEqual(content.splitlines(), ["id,title"])
+        _, content, _ = self.export(
+            f"/api/articles/{self.articles[2].id}/comments/export/",
+            {"export_format": "csv"},
+        )
+        self.assertEqual(
+            content.splitlines(), ["id,article,commenter,body,created_at,updated_at"]
+        )
+
+    def test_export_users_is_admin_only(self):
+        """
+        Test that only admins can export users.
+        """
+        _, content, _ = self.export("/api/users/export/", {"role": "viewer"})
+        self.assertEqual(json.loads(content)["username"], "vieweruser")
+
+        self.client.force_authenticate(user=self.viewer_user)
+        response = self.client.get("/api/users/export/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_rejects_invalid_params(self):
+        """
+        Test that unknown formats and non-integer since_id are rejected.
+        """
+        response = self.client.get("/api/articles/export/", {"export_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get("/api/articles/export/", {"since_id": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ImportContentTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up an author, an article and a scratch directory for input files.
+        """
+        cache.clear()
+        self.author_user = get_user_model().objects.create_user(
+            username="authoruser",
+            email="author@example.com",
+            password="authorpassword",
+            role="author",
+        )
+        self.article = Article.objects.create(
+            title="Existing", body="body", author=self.author_user
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as input_file:
+            input_file.write(content)
+        return path
+
+    def import_content(self, *args, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_content", *args, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_articles_ndjson(self):
+        """
+        Test that valid records are imported with excerpt and search terms, invalid ones reported.
+        """
+        records = [
+            {"title": "Bulk zebra", "body": "Imported   body", "published": True},
+            {"title": "", "body": "missing title"},
+            {"title": "Own author", "body": "body", "author": self.author_user.id},
+            {"title": "Unknown author", "body": "body", "author": 999999},
+        ]
+        path = self.write_file(
+            "articles.ndjson", "\n".join(json.dumps(record) for record in records)
+        )
+        stdout, stderr = self.import_content(
+            path, model="articles", author="author@example.com", batch_size=3
+        )
+
+        self.assertIn("Imported 2 articles", stdout)
+        self.assertIn("Record 2 rejected", stderr)
+        self.assertIn("Record 4 rejected", stderr)
+        article = Article.objects.get(title="Bulk zebra")
+        self.assertEqual(article.author, self.author_user)
+        self.assertTrue(article.published)
+        self.assertEqual(article.excerpt, "Imported body")
+        self.assertTrue(
+            ArticleSearchTerm.objects.filter(term="zebra", article=article).exists()
+        )
+
+    def test_import_users_csv(self):
+        """
+        Test that users are provisioned with hashed passwords and duplicates rejected.
+        """
+        path = self.write_file(
+            "users.csv",
+            "email,username,role,first_name,password\n"
+            "one@example.com,userone,viewer,One,onepass123\n"
+            "author@example.com,taken,viewer,,\n"
+            "two@example.com,usertwo,author,,\n"
+            "two@example.com,userthree,viewer,,\n"
+            "four@example.com,userfour,owner,,\n",
+        )
+        stdout, stderr = self.import_content(
+            path, model="users", batch_size=2, hash_workers=2
+        )
+
+        self.assertIn("Imported 2 users", stdout)
+        for line in (2, 4, 5):
+            self.assertIn(f"Record {line} rejected", stderr)
+        one = User.objects.get(email="one@example.com")
+        self.assertEqual(one.first_name, "One")
+        self.assertTrue(one.check_password("onepass123"))
+        two = User.objects.get(email="two@example.com")
+        self.assertEqual(two.role, "author")
+        self.assertFalse(two.has_usable_password())
+
+    def test_import_comments_csv(self):
+        """
+        Test that comments resolve the article id and commenter email.
+        """
+        path = self.write_file(
+            "comments.csv",
+            "article,commenter,body\n"
+            f"{self.article.id},author@example.com,First\n"
+            f"{self.article.id},{self.author_user.id},Second\n"
+            f"{self.article.id},nobody@example.com,Third\n",
+        )
+        stdout, stderr = self.import_content(path, model="comments")
+
+        self.assertIn("Imported 2 comments", stdout)
+        self.assertIn("Record 3 rejected", stderr)
+        self.assertEqual(
+            list(
+                Comment.objects.filter(article=self.article)
+                .order_by("id")
+                .values_list("body", "commenter_id")
+            ),
+            [("First", self.author_user.id), ("Second", self.author_user.id)],
+        )
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 2)
+        self.assertIsNotNone(self.article.last_commented_at)
+
+    def test_import_resumes_from_checkpoint(self):
+        """
+        Test that a second run skips the records committed by the first one.
+        """
+        path = self.write_file(
+            "articles.csv",
+            "title,body\n" + "".join(f"Title {index},Body\n" for index in range(5)),
+        )
+        checkpoint = os.path.join(self.directory.name, "import.checkpoint")
+        with open(checkpoint, "w") as checkpoint_file:
+            json.dump(
+                {
+                    "source": os.path.abspath(path),
+                    "records": 3,
+                    "imported": 3,
+                    "rejected": 0,
+                },
+                checkpoint_file,
+            )
+
+        self.import_content(
+            path, model="articles", author="author@example.com", checkpoint=checkpoint
+        )
+        titles = Article.objects.filter(title__startswith="Title").values_list(
+            "title", flat=True
+        )
+        self.assertEqual(sorted(titles), ["Title 3", "Title 4"])
+        with open(checkpoint) as checkpoint_file:
+            self.assertEqual(json.load(checkpoint_file)["records"], 5)
+
+        stdout, _ = self.import_content(
+            path, model="articles", author="author@example.com", checkpoint=checkpoint
+        )
+        self.assertIn("Imported 0 articles", stdout)
+
+
+class ArticleBatchTestCase(APITestCase):
+
+    def setUp(self):
+        """
+        Set up users of every role and articles of two authors.
+        """
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            username="adminuser",
+            email="admin@example.com",
+            password="adminpassword",
+            role="admin",
+        )
+        self.author_user = get_user_model().objects.create_user(
+            username="authoruser",
+            email="author@example.com",
+            password="authorpassword",
+            role="author",
+        )
+        self.viewer_user = get_user_model().objects.create_user(
+            username="vieweruser",
+            email="viewer@example.com",
+            password="viewpassword",
+            role="viewer",
+        )
+        self.own_articles = [
+            Article.objects.create(
+                title=f"Own {index}", body="body", author=self.author_user
+            )
+            for index in range(2)
+        ]
+        self.other_article = Article.objects.create(
+            title="Other", body="body", author=self.admin_user
+        )
+
+    def test_batch_create(self):
+        """
+        Test that articles are created with bulk_create, excerpt and search terms.
+        """
+        self.client.force_authenticate(user=self.author_user)
+        data = {
+            "articles": [
+                {"title": "Batch walrus", "body": "First   body"},
+                {"title": "Batch second", "body": "Second body"},
+            ]
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post("/api/articles/batch/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        results = response.data["payload"]["results"]
+        self.assertEqual([result["status"] for result in results], [201, 201])
+        inserts = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('INSERT INTO "article_article"')
+        ]
+        self.assertEqual(len(inserts), 1)
+
+        article = Article.objects.get(pk=results[0]["payload"]["id"])
+        self.assertEqual(article.author, self.author_user)
+        self.assertEqual(article.excerpt, "First body")
+        self.assertTrue(article.search_terms.filter(term="walrus").exists())
+
+    def test_batch_create_validates_every_item(self):
+        """
+        Test that one invalid item rejects the whole batch with per-item results.
+        """
+        self.client.force_authenticate(user=self.author_user)
+        data = {"articles": [{"title": "Valid", "body": "body"}, {"title": "No body"}]}
+        response = self.client.post("/api/articles/batch/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        results = response.data["payload"]["results"]
+        self.assertTrue(results[0]["success"])
+        self.assertIn("body", results[1]["errors"])
+        self.assertFalse(Article.objects.filter(title="Valid").exists())
+
+        self.client.force_authenticate(user=self.viewer_user)
+        response = self.client.post("/api/articles/batch/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_batch_update_applies_author_rules(self):
+        """
+        Test that authors can only batch update their own articles.
+        """
+        self.client.force_authenticate(user=self.author_user)
+        data = {
+            "articles": [
+                {"id": self.own_articles[0].id, "title": "Changed"},
+                {"id": self.other_article.id, "title": "Changed"},
+                {"id": 999999, "title": "Changed"},
+            ]
+        }
+        response = self.client.patch("/api/articles/batch/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [result["status"] for result in response.data["payload"]["results"]],
+            [200, 403, 404],
+        )
+        self.assertFalse(Article.objects.filter(title="Changed").exists())
+
+    @override_settings(CACHE_SHARED=True)
+    def test_batch_update(self):
+        """
+        Test that a batch update writes every item, reindexes and drops cached lists.
+        """
+        self.client.force_authenticate(user=self.author_user)
+        self.client.get("/api/articles/")
+        data = {
+            "articles": [
+                {"id": self.own_articles[0].id, "title": "Renamed narwhal"},
+                {"id": self.own_articles[1].id, "body": "New   body"},
+            ]
+        }
+        response = self.client.patch("/api/articles/batch/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        first, second = Article.objects.filter(
+            pk__in=[article.pk for article in self.own_articles]
+        ).order_by("id")
+        self.assertEqual(first.title, "Renamed narwhal")
+        self.assertEqual(first.body, "body")
+        self.assertEqual(second.excerpt, "New body")
+        self.assertTrue(first.search_terms.filter(term="narwhal").exists())
+
+        response = self.client.get("/api/articles/", {"search": "narwhal"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["payload"]["count"], 1)
+
+    def test_batch_publish(self):
+        """
+        Test that admins publish a batch with a single UPDATE.
+        """
+        self.client.force_authenticate(user=self.admin_user)
+        ids = [article.id for article in self.own_articles]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(
+                "/api/articles/batch/publish/",
+                {"ids": ids, "is_published": True},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["message"], "2 articles successfully published.")
+        updates = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Article.objects.filter(id__in=ids, published=True).count(), 2)
+
+        response = self.client.patch(
+            "/api/articles/batch/publish/",
+            {"ids": [ids[0], 999999], "is_published": False},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Article.objects.get(id=ids[0]).published)
+
+        self.client.force_authenticate(user=self.author_user)
+        response = self.client.patch(
+            "/api/articles/batch/publish/", {"ids": ids, "is_published": False}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_publish_only_writes_published(self):
+        """
+        Test that publishing a single article does not rewrite the other columns.
+        """
+        self.client.force_authenticate(user=self.admin_user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(
+                f"/api/articles/{self.other_article.id}/publish/",
+                {"is_published": True},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        update = next(
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "article_article"')
+        )
+        self.assertIn('"published"', update)
+        self.assertNotIn('"body"', update)
+
+
+class QueryBudgetTestCase(APITestCase):
+    """
+    SQL query budgets for every viewset action.
+      - Actions are run with force_authenticate, so authentication is not counted
+      - List actions are run at every size in `page_sizes` and must make the
+        same number of queries at each of them (no N+1)
+      - A failure prints the captured SQL
+    """
+
+    page_sizes = (1, 5, 20)
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Set up enough distinct authors, articles and commenters to fill the
+        largest page, so per-row lookups cannot hide behind a shared instance.
+        """
+        size = max(cls.page_sizes)
+        cls.admin_user = get_user_model().objects.create_user(
+            username="adminuser",
+            email="admin@example.com",
+            password="adminpassword",
+            role="admin",
+        )
+        cls.users = [
+            get_user_model().objects.create_user(
+                username=f"user{index}",
+                email=f"user{index}@example.com",
+                password="userpassword",
+                role="author",
+            )
+            for index in range(size)
+        ]
+        cls.articles = [
+            Article.objects.create(
+                title=f"Article {index}",
+                body="body",
+                author=user,
+                published=True,
+            )
+            for index, user in enumerate(cls.users)
+        ]
+        cls.article = cls.articles[0]
+        cls.comments = [
+            Comment.objects.create(body="comment", article=cls.article, commenter=user)
+            for user in cls.users
+        ]
+
+    def setUp(self):
+        user_cache.clear()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def capture(self, method, url, data=None):
+        # Measure the uncached path of the article response cache
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data, format="json")
+        self.assertLess(response.status_code, 400, response.data)
+        return [query["sql"] for query in context.captured_queries]
+
+    def format_queries(self, queries):
+        return "\n".join(f"  {index}. {sql}" for index, sql in enumerate(queries, 1))
+
+    def assert_budget(self, method, url, budget, data=None):
+        queries = self.capture(method, url, data)
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            f"{method.upper()} {url} made {len(queries)} queries, budget is "
+            f"{budget}:\n{self.format_queries(queries)}",
+        )
+
+    def assert_list_budget(self, url, budget, params=None):
+        counts = {}
+        for page_size in self.page_sizes:
+            queries = self.capture("get", url, {**(params or {}), "page_size": page_size})
+            counts[page_size] = len(queries)
+            self.assertEqual(
+                len(queries),
+                counts[self.page_sizes[0]],
+                f"GET {url} query count grows with page_size {counts}:\n"
+                f"{self.format_queries(queries)}",
+            )
+            self.assertLessEqual(
+                len(queries),
+                budget,
+                f"GET {url}?page_size={page_size} made {len(queries)} queries, "
+                f"budget is {budget}:\n{self.format_queries(queries)}",
+            )
+
+    def test_user_list(self):
+        """
+        Test the query budget of listing users.
+        """
+        self.assert_list_budget("/api/users/", 2)
+
+    def test_user_retrieve(self):
+        """
+        Test the query budget of retrieving a user.
+        """
+        self.assert_budget("get", f"/api/users/{self.users[0].id}/", 1)
+
+    def test_user_update(self):
+        """
+        Test the query budget of updating a user.
+        """
+        self.assert_budget(
+            "put", f"/api/users/{self.users[0].id}/", 2, {"first_name": "Updated"}
+        )
+
+    def test_user_destroy(self):
+        """
+        Test the query budget of deleting a user.
+        """
+        self.assert_budget("delete", f"/api/users/{self.users[0].id}/", 7)
+
+    def test_article_list(self):
+        """
+        Test the query budget of listing articles.
+        """
+        self.assert_list_budget("/api/articles/", 2)
+
+    def test_article_list_sparse(self):
+        """
+        Test the query budget of listing articles with sparse fields.
+        """
+        self.assert_list_budget("/api/articles/", 2, {"fields": "id,title,excerpt"})
+
+    def test_article_search(self):
+        """
+        Test the query budget of searching articles.
+        """
+        self.assert_list_budget("/api/articles/", 2, {"search": "article"})
+
+    def test_article_retrieve(self):
+        """
+        Test the query budget of retrieving an article.
+        """
+        self.assert_budget("get", f"/api/articles/{self.article.id}/", 1)
+
+    def test_article_create(self):
+        """
+        Test the query budget of creating an article.
+        """
+        self.assert_budget("post", "/api/articles/", 5, {"title": "New", "body": "New"})
+
+    def test_article_update(self):
+        """
+        Test the query budget of updating an article.
+        """
+        self.assert_budget(
+            "put",
+            f"/api/articles/{self.article.id}/",
+            6,
+            {"title": "Updated", "body": "Updated"},
+        )
+
+    def test_article_partial_update(self):
+        """
+        Test the query budget of partially updating an article.
+        """
+        self.assert_budget(
+            "patch", f"/api/articles/{self.article.id}/", 6, {"title": "Updated"}
+        )
+
+    def test_article_publish(self):
+        """
+        Test the query budget of publishing an article.
+        """
+        self.assert_budget(
+            "patch",
+            f"/api/articles/{self.article.id}/publish/",
+            2,
+            {"is_published": False},
+        )
+
+    def test_article_batch_create(self):
+        """
+        Test the query budget of creating a batch of articles.
+        """
+        articles = [{"title": f"New {index}", "body": "New"} for index in range(20)]
+        self.assert_budget("post", "/api/articles/batch/", 7, {"articles": articles})
+
+    def test_article_batch_update(self):
+        """
+        Test the query budget of updating a batch of articles.
+        """
+        articles = [
+            {"id": article.id, "title": "Updated"} for article in self.articles
+        ]
+        self.assert_budget("patch", "/api/articles/batch/", 8, {"articles": articles})
+
+    def test_article_batch_publish(self):
+        """
+        Test the query budget of publishing a batch of articles.
+        """
+        ids = [article.id for article in self.articles]
+        self.assert_budget(
+            "patch",
+            "/api/articles/batch/publish/",
+            4,
+            {"ids": ids, "is_published": False},
+        )
+
+    def test_article_destroy(self):
+        """
+        Test the query budget of deleting an article.
+        """
+        self.assert_budget("delete", f"/api/articles/{self.article.id}/", 2)
+
+    def test_comment_list(self):
+        """
+        Test the query budget of listing the comments of an article.
+        """
+        self.assert_list_budget(f"/api/articles/{self.article.id}/comments/", 2)
+
+    def test_comment_list_expanded(self):
+        """
+        Test the query budget of listing comments with the embedded commenter.
+        """
+        self.assert_list_budget(
+            f"/api/articles/{self.article.id}/comments/", 2, {"expand": "commenter"}
+        )
+
+    def test_comment_create(self):
+        """
+        Test the query budget of creating a comment.
+        """
+        # The insert and the stats update share a transaction (SAVEPOINT/RELEASE)
+        self.assert_budget(
+            "post", f"/api/articles/{self.article.id}/comments/", 6, {"body": "New"}
+        )
+
+    def test_comment_retrieve(self):
+        """
+        Test the query budget of retrieving a comment.
+        """
+        self.assert_budget("get", f"/api/comments/{self.comments[0].id}/", 1)
+
+    def test_comment_partial_update(self):
+        """
+        Test the query budget of updating a comment.
+        """
+        self.assert_budget(
+            "patch", f"/api/comments/{self.comments[0].id}/", 2, {"body": "Updated"}
+        )
+
+    def test_comment_destroy(self):
+        """
+        Test the query budget of deleting a comment.
+        """
+        self.assert_budget("delete", f"/api/comments/{self.comments[0].id}/", 5)
+
+
+class BenchmarkSuiteTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+
+    def test_path_template(self):
+        """
+        Test that collection urls become templates on the real routes.
+        """
+        path, query = path_template("http://localhost:8000/api/article/2/publish/?x=1")
+        self.assertEqual(path, "/api/articles/{article_id}/publish/")
+        self.assertEqual(query, [("x", "1")])
+        path, _ = path_template("{{local}}articles/3/comments/4/")
+        self.assertEqual(path, "/api/articles/{article_id}/comments/{comment_id}/")
+
+    def test_collection_replays_without_errors(self):
+        """
+        Test that every weighted collection request succeeds against seeded data.
+        """
+        endpoints = load_endpoints("CMS.postman_collection.json")
+        admin = seed(users=6, articles=10, comments=20)
+        replayer = Replayer(endpoints, admin)
+        for endpoint in endpoints:
+            replayer.request(endpoint)
+
+        report = replayer.report(elapsed=1)
+        self.assertEqual(set(report["endpoints"]), {e.name for e in endpoints})
+        self.assertEqual(report["overall"]["errors"], 0)
+
+    def test_renderer_benchmark(self):
+        """
+        Test that the renderer benchmark renders real pages identically and reports both renderers.
+        """
+        seed(users=3, articles=5, comments=5)
+        report = compare_renderers(load_payloads(page_size=5), rounds=2)
+        self.assertEqual(set(report), {"article_page", "comment_page"})
+        for results in report.values():
+            self.assertEqual(set(results), {"drf_json", "orjson"})
+            self.assertEqual(results["drf_json"]["bytes"], results["orjson"]["bytes"])
+            self.assertEqual(results["drf_json"]["speedup"], 1.0)
+
+
+class ORJSONRendererTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com",
+            password="adminpass",
+            role="admin",
+            username="adminexample",
+        )
+        self.article = Article.objects.create(
+            title="Caf\u00e9 \u2028 news", body="Body", author=self.admin_user
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_renders_the_same_bytes_as_drf(self):
+        """
+        Test that the orjson renderer matches JSONRenderer for the types DRF responses carry.
+        """
+        data = ReturnDict(
+            {
+                "naive": datetime(2024, 12, 23, 0, 3, 10, 820392),
+                "whole_second": datetime(2024, 12, 23, 0, 3, 10),
+                "utc": datetime(2024, 12, 23, tzinfo=dt_timezone.utc),
+                "day": date(2024, 12, 23),
+                "decimal": Decimal("1.50"),
+                "uuid": uuid.UUID(int=1),
+                "lazy": gettext_lazy("Admin"),
+                "duration": timedelta(seconds=90),
+                "int_keys": {1: "one"},
+                "separator": "a\u2028b\u2029c",
+                "rows": ReturnList(
+                    [{"id": 1, "title": "Caf\u00e9"}], serializer=None
+                ),
+                "none": None,
+            },
+            serializer=None,
+        )
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+        # Falls back to the stdlib for integers over 64 bits and indentation
+        self.assertEqual(
+            ORJSONRenderer().render({"big": 2**70}), b'{"big":1180591620717411303424}'
+        )
+        indented = ORJSONRenderer().render({"a": 1}, "application/json; indent=2", {})
+        self.assertEqual(indented, b'{\n  "a": 1\n}')
+
+    def test_api_responses_and_requests_use_orjson(self):
+        """
+        Test that API responses are rendered and JSON bodies parsed by the orjson classes.
+        """
+        response = self.client.get(f"/api/articles/{self.article.id}/")
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        self.assertIn(b"\\u2028", response.content)
+
+        response = self.client.post(
+            "/api/articles/",
+            b'{"title": "Parsed \xc3\xa9", "body": "Body"}',
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["payload"]["title"], "Parsed \u00e9")
+
+        response = self.client.post(
+            "/api/articles/", b'{"title": NaN}', content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(str(response.data["detail"]).startswith("JSON parse error - "))
+
+    def test_parser_matches_drf(self):
+        """
+        Test that the parser returns what JSONParser returns and raises the same errors.
+        """
+        body = b'{"id": 1, "tags": ["a", "\xc3\xa9"], "nested": {"x": null}}'
+        self.assertEqual(
+            ORJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body))
+        )
+        for invalid in (b"{", b'{"a": NaN}', b"\xff"):
+            with self.assertRaises(ParseError) as orjson_error:
+                ORJSONParser().parse(BytesIO(invalid))
+            with self.assertRaises(ParseError) as drf_error:
+                JSONParser().parse(BytesIO(invalid))
+            self.assertEqual(str(orjson_error.exception), str(drf_error.exception))
+
+
+@override_settings(CACHE_SHARED=True)
+class CompressionTestCase(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com",
+            password="adminpass",
+            role="admin",
+            username="adminexample",
+        )
+        self.article = Article.objects.create(
+            title="Compressed",
+            body="A long article body. " * 200,
+            author=self.admin_user,
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_negotiates_encoding_from_accept_encoding(self):
+        """
+        Test that q-values, wildcards and the server preference pick the encoding.
+        """
+        self.assertEqual(
+            parse_accept_encoding("gzip;q=0.5, br , *;q=0"),
+            {"gzip": 0.5, "br": 1.0, "*": 0.0},
+        )
+        fake = type("FakeCodec", (GzipCodec,), {"name": "br"})
+        factory = RequestFactory()
+        with mock.patch.dict(CODECS, {"br": fake}):
+            for header, expected in [
+                ("gzip, deflate, br", "br"),
+                ("gzip;q=1, br;q=0.5", "gzip"),
+                ("br;q=0, *", "gzip"),
+                ("*", "br"),
+                ("deflate, identity", None),
+                ("", None),
+            ]:
+                request = factory.get("/", HTTP_ACCEPT_ENCODING=header)
+                codec = negotiate(request)
+                self.assertEqual(codec and codec.name, expected, header)
+        request = factory.post("/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertIsNone(negotiate(request))
+
+    def test_large_responses_are_compressed(self):
+        """
+        Test that a large GET response is gzipped and a small one is sent as is.
+        """
+        url = f"/api/articles/{self.article.id}/"
+        plain = self.client.get(url)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(response["ETag"], "W/" + plain["ETag"])
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+        response = self.client.get("/api/users/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        # Responses to writes carry tokens and request data, never compressed
+        response = self.client.patch(
+            url,
+            {"body": "Changed body. " * 200},
+            format="json",
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Content-Encoding", response)
+
+    @override_settings(PAGINATION_STREAM_CHUNK_SIZE=2)
+    def test_streaming_responses_are_compressed_per_chunk(self):
+        """
+        Test that a streamed list is compressed chunk by chunk.
+        """
+        for index in range(5):
+            Article.objects.create(
+                title=f"Article {index}", body="body", author=self.admin_user
+            )
+        plain = b"".join(self.client.get("/api/articles/", {"stream": "true"}))
+        response = self.client.get(
+            "/api/articles/", {"stream": "true"}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertNotIn("Content-Length", response)
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 2)
+        # Every chunk is flushed, so each prefix decompresses on its own
+        self.assertTrue(zlib.decompressobj(31).decompress(chunks[0]))
+        self.assertEqual(gzip.decompress(b"".join(chunks)), plain)
+
+    def test_cache_hits_reuse_the_compressed_body(self):
+        """
+        Test that cached article responses are compressed once and hits send the stored bytes.
+        """
+        url = f"/api/articles/{self.article.id}/"
+        with mock.patch.object(
+            GzipCodec, "compress", autospec=True, side_effect=GzipCodec.compress
+        ) as compress:
+            first = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+            with mock.patch.object(ORJSONRenderer, "render") as render:
+                second = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+            render.assert_not_called()
+            self.assertEqual(compress.call_count, 1)
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+        for header in ("Content-Encoding", "Content-Type", "ETag", "Vary"):
+            self.assertEqual(second[header], first[header])
+
+        # The weak ETag of the compressed response revalidates too
+        response = self.client.get(
+            url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=second["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Clients without gzip still get the rendered JSON
+        plain = self.client.get(url)
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(gzip.decompress(first.content), plain.content)
+
+        self.client.patch(url, {"title": "Changed"}, format="json")
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertIn(b"Changed", gzip.decompress(response.content))
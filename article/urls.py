@@ -4,6 +4,7 @@ from article.views import (
     ArticleViewSet,
     CommentViewSet,
     LoginViewSet,
+    MetricsViewSet,
     RegisterViewSet,
     UserViewSet,
 )
@@ -18,6 +19,7 @@ router.register("register", RegisterViewSet, basename="register")
 router.register("login", LoginViewSet, basename="login")
 router.register("users", UserViewSet, basename="users")
 router.register("articles", ArticleViewSet, basename="article")
+router.register("metrics", MetricsViewSet, basename="metrics")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -28,6 +30,11 @@ urlpatterns = [
         CommentViewSet.as_view({"post": "create", "get": "list"}),
         name="article-comments",
     ),
+    path(
+        "articles/<int:article_id>/comments/export/",
+        CommentViewSet.as_view({"get": "export"}),
+        name="article-comments-export",
+    ),
     path(
         "comments/<int:pk>/",
         CommentViewSet.as_view(
@@ -1,15 +1,29 @@
+from CMS.db_router import replica_lag
 from CMS.pagination import CustomPagination
+from CMS.postgresql_pool.base import pool_stats
+from CMS.streaming import StreamingListMixin
 from api_document.doc import (
     ARTICLE_DOCS,
     COMMENT_DOCS,
     LOGIN_DOCS,
+    METRICS_DOCS,
     REGISTER_DOCS,
     USER_DOCS,
 )
-from article.models import Article, Comment, Role, User
-from rest_framework.viewsets import ModelViewSet
+from article.authentication import (
+    CachedJWTAuthentication,
+    ClaimsRefreshToken,
+    user_cache,
+)
+from article.cache import cache_article_response, response_cache
+from article.hashing import hash_password, password_hashing
+from article.jobs import stats as job_stats
+from article.models import Article, Comment, Role, User, build_excerpt
+from article.purge import soft_delete_article, soft_delete_user
+from article.search import ArticleSearchFilter, index_articles
+from rest_framework.viewsets import ModelViewSet, ViewSet
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
 from .serializers import (
     ArticleSerializer,
     CommentSerializer,
@@ -18,13 +32,100 @@ from .serializers import (
     UserSerializer,
 )
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.filters import SearchFilter
+from rest_framework.filters import OrderingFilter, SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
 from django.contrib.auth import authenticate
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    `?ordering=` that puts NULLs last in both directions and breaks ties on
+    `-id`, so pages do not shuffle rows that share a value.
+    Without the param the view queryset ordering is kept.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param):
+            return queryset
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        expressions = [
+            F(field[1:]).desc(nulls_last=True)
+            if field.startswith("-")
+            else F(field).asc(nulls_last=True)
+            for field in ordering
+        ]
+        if not {"id", "-id"} & set(ordering):
+            expressions.append(F("id").desc())
+        return queryset.order_by(*expressions)
+
+
+class SparseFieldsMixin:
+    """
+    `?fields=a,b` / `?omit=c` support for model viewsets.
+      - The serializer only renders the selected fields
+      - On list/retrieve/export the columns of the model fields that are not rendered
+        are deferred, so they are never read from the database
+    """
+
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+    deferrable_actions = ("list", "retrieve", "export")
+
+    def get_query_param_set(self, name):
+        value = self.request.query_params.get(name, "")
+        return {item.strip() for item in value.split(",") if item.strip()}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_query_param_set(self.fields_query_param)
+        context["omit"] = self.get_query_param_set(self.omit_query_param)
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in self.deferrable_actions or not (
+            self.request.query_params.get(self.fields_query_param)
+            or self.request.query_params.get(self.omit_query_param)
+        ):
+            return queryset
+
+        rendered = {field.source for field in self.get_serializer().fields.values()}
+        deferred = [
+            field.name
+            for field in queryset.model._meta.concrete_fields
+            if not field.primary_key
+            and not field.is_relation
+            and field.name not in rendered
+        ]
+        return queryset.defer(*deferred) if deferred else queryset
+
+
+def unique_violation_field(error, model):
+    """
+    Returns the column of `model` whose unique constraint `error` violated, or
+    None. PostgreSQL names the violated constraint, the message itself also
+    quotes the conflicting value; SQLite only names the column in the message.
+    """
+    table = model._meta.db_table
+    diag = getattr(error.__cause__, "diag", None)
+    constraint_name = getattr(diag, "constraint_name", None)
+    if constraint_name:
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+        columns = constraints.get(constraint_name, {}).get("columns") or []
+        return columns[0] if len(columns) == 1 else None
+    for field in model._meta.concrete_fields:
+        if f"{table}.{field.column}" in str(error):
+            return field.column
+    return None
 
 
 class RegisterViewSet(ModelViewSet):
@@ -57,26 +158,35 @@ class RegisterViewSet(ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user = User.objects.filter(email=email).first()
-        if user is not None:
-            return Response(
-                {
-                    "success": False,
-                    "message": f"{email} is already registered, please try different email.",
-                    "payload": [],
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        create_user = User.objects.create(
+        # Hashed before the insert, a rejected hash leaves no user behind.
+        # The unique constraints are the duplicate check: a single INSERT.
+        create_user = User(
             username=username,
             email=email,
             first_name=first_name,
             last_name=last_name,
             role=Role[role.upper()].value,
+            password=hash_password(password),
         )
-        create_user.set_password(password)
-        create_user.save()
+        try:
+            with transaction.atomic():
+                create_user.save(force_insert=True)
+        except IntegrityError as e:
+            field = unique_violation_field(e, User)
+            if field == "email":
+                return Response(
+                    {
+                        "success": False,
+                        "message": f"{email} is already registered, please try different email.",
+                        "payload": [],
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if field == "username":
+                raise serializers.ValidationError(
+                    {"username": [User._meta.get_field("username").error_messages["unique"]]}
+                )
+            raise
 
         serializer = UserSerializer(create_user)
         return Response(
@@ -111,7 +221,7 @@ class LoginViewSet(ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        user = authenticate(username=email, password=password)
+        user = authenticate(request, username=email, password=password)
         if not user:
             return Response(
                 {"success": False, "message": "Invalid email or password."},
@@ -125,7 +235,7 @@ class LoginViewSet(ModelViewSet):
             )
 
         # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
         access_token = str(refresh.access_token)
 
         user_data = UserSerializer(user).data
@@ -143,9 +253,9 @@ class LoginViewSet(ModelViewSet):
         )
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(SparseFieldsMixin, StreamingListMixin, ModelViewSet):
     __doc__ = USER_DOCS
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     filter_backends = [SearchFilter, DjangoFilterBackend]
     search_fields = [
@@ -165,7 +275,7 @@ class UserViewSet(ModelViewSet):
     pagination_class = CustomPagination
     serializer_class = UserSerializer
     http_method_names = ["get", "put", "delete"]
-    queryset = User.objects.all().order_by("-id")
+    queryset = User.objects.filter(is_delete=False).order_by("-id")
 
     def list(self, request, *args, **kwargs):
         if request.user.role != "admin":
@@ -178,6 +288,8 @@ class UserViewSet(ModelViewSet):
             )
         queryset = self.get_queryset()
         filter_queryset = self.filter_queryset(queryset)
+        if self.wants_stream(request):
+            return self.stream_list(filter_queryset, "Users list fetched successfully.")
         paginate_queryset = self.paginate_queryset(filter_queryset)
         serializer = self.get_serializer(paginate_queryset, many=True)
         payload = self.get_paginated_response(serializer.data)
@@ -189,6 +301,18 @@ class UserViewSet(ModelViewSet):
             }
         )
 
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        if request.user.role != "admin":
+            return Response(
+                {
+                    "success": False,
+                    "message": "You do not have permission to access this. Only admins are allowed.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return self.export_list(self.filter_queryset(self.get_queryset()), "users")
+
     def retrieve(self, request, *args, **kwargs):
         if request.user.role != "admin":
             return Response(
@@ -213,7 +337,7 @@ class UserViewSet(ModelViewSet):
         user = self.get_object()
 
         # Check if the user is allowed to update the details
-        if request.user != user and request.user.role != "admin":
+        if request.user.pk != user.pk and request.user.role != "admin":
             return Response(
                 {
                     "success": False,
@@ -249,7 +373,8 @@ class UserViewSet(ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        user.delete()
+        # Hidden right away, purged with its content by `purge_deleted`
+        soft_delete_user(user)
 
         return Response(
             {
@@ -260,35 +385,39 @@ class UserViewSet(ModelViewSet):
         )
 
 
-class ArticleViewSet(ModelViewSet):
+class ArticleViewSet(SparseFieldsMixin, StreamingListMixin, ModelViewSet):
     __doc__ = ARTICLE_DOCS
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
-    filter_backends = [SearchFilter, DjangoFilterBackend]
+    # `title` and `body` are searched through the inverted index, see article.search
+    filter_backends = [ArticleSearchFilter, DjangoFilterBackend, StableOrderingFilter]
     search_fields = [
         "author__username",
         "author__email",
-        "title",
-        "body",
         "author__role",
-        "published",
-    ]
-    filterset_fields = [
-        "author__username",
-        "author__email",
-        "title",
-        "body",
-        "author__role",
-        "published",
     ]
+    filterset_fields = {
+        "author__username": ["exact"],
+        "author__email": ["exact"],
+        "title": ["exact"],
+        "body": ["exact"],
+        "author__role": ["exact"],
+        "published": ["exact"],
+        "comment_count": ["exact", "gte", "lte"],
+        "last_commented_at": ["gte", "lte", "isnull"],
+    }
+    ordering_fields = ["id", "created_at", "comment_count", "last_commented_at"]
     pagination_class = CustomPagination
     http_method_names = ["get", "post", "patch", "put", "delete"]
     serializer_class = ArticleSerializer
-    queryset = Article.objects.all().order_by("-id")
+    queryset = Article.objects.filter(is_delete=False).order_by("-id")
 
+    @cache_article_response
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         filter_queryset = self.filter_queryset(queryset)
+        if self.wants_stream(request):
+            return self.stream_list(filter_queryset, "Articles retrieved successfully.")
         paginate_queryset = self.paginate_queryset(filter_queryset)
         serializer = self.get_serializer(paginate_queryset, many=True)
         payload = self.get_paginated_response(serializer.data)
@@ -301,6 +430,11 @@ class ArticleViewSet(ModelViewSet):
             status=status.HTTP_200_OK,
         )
 
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        return self.export_list(self.filter_queryset(self.get_queryset()), "articles")
+
+    @cache_article_response
     def retrieve(self, request, *args, **kwargs):
         article = self.get_object()
         serializer = self.get_serializer(article)
@@ -325,7 +459,7 @@ class ArticleViewSet(ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        serializer.save(author=request.user)
+        serializer.save(author_id=request.user.pk)
         return Response(
             {
                 "success": True,
@@ -335,6 +469,252 @@ class ArticleViewSet(ModelViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    def get_batch_items(self, request, key):
+        """
+        Returns (items, error response) for the list under `key` in the body.
+        """
+        items = request.data.get(key) if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            message = f"'{key}' must be a non-empty list."
+        elif len(items) > settings.ARTICLE_BATCH_MAX_SIZE:
+            message = f"At most {settings.ARTICLE_BATCH_MAX_SIZE} articles per request."
+        else:
+            return items, None
+        return None, Response(
+            {"success": False, "message": message},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    def get_batch_ids(self, items):
+        """
+        Returns the item ids with a result for every item without a valid, unique id.
+        """
+        ids = []
+        errors = {}
+        for index, item in enumerate(items):
+            article_id = item.get("id") if isinstance(item, dict) else item
+            if not isinstance(article_id, int) or isinstance(article_id, bool):
+                errors[index] = "A valid integer 'id' is required."
+            elif article_id in ids:
+                errors[index] = "Duplicate article id."
+            ids.append(article_id)
+        return ids, {
+            index: {
+                "id": ids[index],
+                "success": False,
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": message,
+            }
+            for index, message in errors.items()
+        }
+
+    def batch_response(self, results, message, success_status):
+        failed = [result for result in results if not result["success"]]
+        if failed:
+            return Response(
+                {
+                    "success": False,
+                    "message": f"{len(failed)} of {len(results)} articles are invalid, nothing was saved.",
+                    "payload": {"results": results},
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {"success": True, "message": message, "payload": {"results": results}},
+            status=success_status,
+        )
+
+    @action(detail=False, methods=["post"], url_path="batch")
+    def batch_create(self, request):
+        if request.user.role not in ["admin", "author"]:
+            return Response(
+                {
+                    "success": False,
+                    "message": "You do not have permission to create article.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        items, error = self.get_batch_items(request, "articles")
+        if error:
+            return error
+
+        serializer = self.get_serializer(data=items, many=True)
+        if not serializer.is_valid():
+            results = []
+            for index, errors in enumerate(serializer.errors):
+                result = {"index": index, "success": not errors}
+                if errors:
+                    result.update(status=status.HTTP_400_BAD_REQUEST, errors=errors)
+                results.append(result)
+            return self.batch_response(results, "", status.HTTP_201_CREATED)
+
+        articles = [
+            Article(**data, author_id=request.user.pk, excerpt=build_excerpt(data["body"]))
+            for data in serializer.validated_data
+        ]
+        with transaction.atomic():
+            Article.objects.bulk_create(articles)
+            index_articles(articles)
+        response_cache.invalidate_lists()
+
+        rows = self.get_serializer(articles, many=True).data
+        results = [
+            {
+                "index": index,
+                "success": True,
+                "status": status.HTTP_201_CREATED,
+                "payload": row,
+            }
+            for index, row in enumerate(rows)
+        ]
+        return self.batch_response(
+            results,
+            f"{len(articles)} articles created successfully.",
+            status.HTTP_201_CREATED,
+        )
+
+    @batch_create.mapping.patch
+    def batch_update(self, request):
+        if request.user.role not in ["admin", "author"]:
+            return Response(
+                {
+                    "success": False,
+                    "message": "You do not have permission to edit articles.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        items, error = self.get_batch_items(request, "articles")
+        if error:
+            return error
+        ids, invalid = self.get_batch_ids(items)
+        valid_ids = [
+            article_id for index, article_id in enumerate(ids) if index not in invalid
+        ]
+
+        with transaction.atomic():
+            articles = (
+                Article.objects.filter(is_delete=False)
+                .select_for_update()
+                .in_bulk(valid_ids)
+            )
+            results = []
+            changes = []
+            for index, (article_id, item) in enumerate(zip(ids, items)):
+                if index in invalid:
+                    results.append(invalid[index])
+                    continue
+                article = articles.get(article_id)
+                result = {"id": article_id, "success": False}
+                if article is None:
+                    result.update(
+                        status=status.HTTP_404_NOT_FOUND, message="Article not found."
+                    )
+                elif request.user.role == "author" and article.author_id != request.user.pk:
+                    result.update(
+                        status=status.HTTP_403_FORBIDDEN,
+                        message="You can only edit your own articles.",
+                    )
+                else:
+                    serializer = self.get_serializer(article, data=item, partial=True)
+                    if serializer.is_valid():
+                        result.update(success=True, status=status.HTTP_200_OK)
+                        changes.append((article, serializer.validated_data))
+                    else:
+                        result.update(
+                            status=status.HTTP_400_BAD_REQUEST, errors=serializer.errors
+                        )
+                results.append(result)
+
+            if len(changes) != len(items):
+                return self.batch_response(results, "", status.HTTP_200_OK)
+
+            now = timezone.now()
+            fields = {"updated_at"}
+            reindex = []
+            for article, data in changes:
+                for name, value in data.items():
+                    setattr(article, name, value)
+                if "body" in data:
+                    article.excerpt = build_excerpt(article.body)
+                    fields.add("excerpt")
+                if {"title", "body"} & set(data):
+                    reindex.append(article)
+                article.updated_at = now
+                fields.update(data)
+            Article.objects.bulk_update([article for article, _ in changes], fields)
+            index_articles(reindex)
+        response_cache.invalidate_articles(valid_ids)
+
+        rows = self.get_serializer([article for article, _ in changes], many=True).data
+        for result, row in zip(results, rows):
+            result["payload"] = row
+        return self.batch_response(
+            results,
+            f"{len(changes)} articles updated successfully.",
+            status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["patch"], url_path="batch/publish")
+    def batch_publish(self, request):
+        if request.user.role != "admin":
+            return Response(
+                {
+                    "success": False,
+                    "message": "You do not have permission to publish/unpublish this article.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        is_published = request.data.get("is_published")
+        if is_published is None or not isinstance(is_published, bool):
+            return Response(
+                {
+                    "success": False,
+                    "message": "'is_published' parameter must be a boolean value (true/false).",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        items, error = self.get_batch_items(request, "ids")
+        if error:
+            return error
+        ids, invalid = self.get_batch_ids(items)
+        valid_ids = [
+            article_id for index, article_id in enumerate(ids) if index not in invalid
+        ]
+
+        with transaction.atomic():
+            existing = set(
+                Article.objects.filter(id__in=valid_ids, is_delete=False).values_list(
+                    "id", flat=True
+                )
+            )
+            results = [
+                invalid.get(index)
+                or (
+                    {"id": article_id, "success": True, "status": status.HTTP_200_OK}
+                    if article_id in existing
+                    else {
+                        "id": article_id,
+                        "success": False,
+                        "status": status.HTTP_404_NOT_FOUND,
+                        "message": "Article not found.",
+                    }
+                )
+                for index, article_id in enumerate(ids)
+            ]
+            if invalid or len(existing) != len(ids):
+                return self.batch_response(results, "", status.HTTP_200_OK)
+            Article.objects.filter(id__in=valid_ids).update(
+                published=is_published, updated_at=timezone.now()
+            )
+        response_cache.invalidate_articles(ids)
+
+        action_message = "published" if is_published else "unpublished"
+        return self.batch_response(
+            results,
+            f"{len(ids)} articles successfully {action_message}.",
+            status.HTTP_200_OK,
+        )
+
     @action(
         detail=True,
         methods=["patch"],
@@ -365,7 +745,7 @@ class ArticleViewSet(ModelViewSet):
             )
 
         article.published = is_published
-        article.save()
+        article.save(update_fields=["published", "updated_at"])
 
         action_message = "published" if is_published else "unpublished"
         serializer = ArticleSerializer(article)
@@ -391,7 +771,7 @@ class ArticleViewSet(ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        if request.user.role == "author" and article.author != request.user:
+        if request.user.role == "author" and article.author_id != request.user.pk:
             return Response(
                 {
                     "success": False,
@@ -416,8 +796,9 @@ class ArticleViewSet(ModelViewSet):
 
     def destroy(self, request, *args, **kwargs):
         article = self.get_object()
-        if request.user.role == "admin" or article.author == request.user:
-            article.delete()
+        if request.user.role == "admin" or article.author_id == request.user.pk:
+            # Hidden right away, purged with its comments by `purge_deleted`
+            soft_delete_article(article)
             return Response(
                 {"success": True, "message": "Article deleted successfully."},
                 status=status.HTTP_204_NO_CONTENT,
@@ -431,9 +812,9 @@ class ArticleViewSet(ModelViewSet):
         )
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(SparseFieldsMixin, StreamingListMixin, ModelViewSet):
     __doc__ = COMMENT_DOCS
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = CommentSerializer
     filter_backends = [SearchFilter, DjangoFilterBackend]
@@ -450,13 +831,36 @@ class CommentViewSet(ModelViewSet):
     ]
     pagination_class = CustomPagination
     http_method_names = ["post", "get", "delete", "patch"]
-    queryset = Comment.objects.all().order_by("-id")
+    # The commenter is joined and projected to the columns the serializer renders.
+    # Comments of soft deleted articles and users are hidden until purged.
+    queryset = (
+        Comment.objects.select_related("commenter")
+        .filter(article__is_delete=False, commenter__is_delete=False)
+        .only(
+            "id",
+            "article",
+            "commenter",
+            "body",
+            "created_at",
+            "updated_at",
+            "commenter__email",
+            "commenter__username",
+            "commenter__role",
+        )
+        .order_by("-id")
+    )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        expand = self.request.query_params.get("expand", "")
+        context["expand"] = {name.strip() for name in expand.split(",") if name.strip()}
+        return context
 
     def create(self, request, *args, **kwargs):
         article_id = self.kwargs.get("article_id")
         print(f"article_id : {article_id}")
         try:
-            article = Article.objects.get(id=article_id)
+            article = Article.objects.get(id=article_id, is_delete=False)
         except Article.DoesNotExist:
             return Response(
                 {"success": False, "message": "Article not found."},
@@ -465,7 +869,9 @@ class CommentViewSet(ModelViewSet):
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(commenter=request.user, article=article)
+        # The article comment stats are updated by the post_save signal
+        with transaction.atomic():
+            serializer.save(commenter_id=request.user.pk, article=article)
         return Response(
             {
                 "success": True,
@@ -483,7 +889,11 @@ class CommentViewSet(ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        comment = self.filter_queryset(Comment.objects.filter(article_id=article_id))
+        comment = self.filter_queryset(
+            self.get_queryset().filter(article_id=article_id)
+        )
+        if self.wants_stream(request):
+            return self.stream_list(comment, "Comments retrieved successfully.")
         comments = self.paginate_queryset(comment)
         serializer = self.get_serializer(comments, many=True)
         payload = self.get_paginated_response(serializer.data)
@@ -496,9 +906,21 @@ class CommentViewSet(ModelViewSet):
             status=status.HTTP_200_OK,
         )
 
+    def export(self, request, *args, **kwargs):
+        article_id = self.kwargs.get("article_id")
+        if not Article.objects.filter(id=article_id, is_delete=False).exists():
+            return Response(
+                {"success": False, "message": "Article not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        comments = self.filter_queryset(
+            self.get_queryset().filter(article_id=article_id)
+        )
+        return self.export_list(comments, f"article-{article_id}-comments")
+
     def partial_update(self, request, *args, **kwargs):
         comment = self.get_object()
-        if request.user != comment.commenter and request.user.role != "admin":
+        if request.user.pk != comment.commenter_id and request.user.role != "admin":
             return Response(
                 {
                     "success": False,
@@ -521,8 +943,9 @@ class CommentViewSet(ModelViewSet):
 
     def destroy(self, request, *args, **kwargs):
         comment = self.get_object()
-        if request.user.role == "admin" or comment.commenter == request.user:
-            comment.delete()
+        if request.user.role == "admin" or comment.commenter_id == request.user.pk:
+            with transaction.atomic():
+                comment.delete()
             return Response(
                 {"success": True, "message": "Comment deleted successfully."},
                 status=status.HTTP_204_NO_CONTENT,
@@ -546,3 +969,34 @@ class CommentViewSet(ModelViewSet):
             },
             status=status.HTTP_200_OK,
         )
+
+
+class MetricsViewSet(ViewSet):
+    __doc__ = METRICS_DOCS
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        if request.user.role != "admin":
+            return Response(
+                {
+                    "success": False,
+                    "message": "You do not have permission to access this. Only admins are allowed.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(
+            {
+                "success": True,
+                "message": "Metrics fetched successfully.",
+                "payload": {
+                    "article_response_cache": response_cache.stats(),
+                    "database_pools": pool_stats(),
+                    "database_replicas": replica_lag.stats(),
+                    "job_queue": job_stats(),
+                    "jwt_user_cache": user_cache.stats(),
+                    "password_hashing": password_hashing.stats(),
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,33 @@
+#!/bin/sh
+# Benchmarks the dev entrypoint (runserver) against the production entrypoint
+# (gunicorn) one after the other on the same host, same database and same
+# request mix. Reports land in benchmarks/results/{dev,serve}.json.
+#
+# Usage: benchmarks/compare_servers.sh EMAIL PASSWORD [CONCURRENCY] [DURATION]
+set -e
+
+EMAIL=$1
+PASSWORD=$2
+CONCURRENCY=${3:-16}
+DURATION=${4:-30}
+OUT=benchmarks/results
+mkdir -p "$OUT"
+
+for mode in dev serve; do
+  ./docker-entrypoint.sh "$mode" >"$OUT/$mode.log" 2>&1 &
+  SERVER=$!
+  sleep 5
+  python3 benchmarks/http_load.py --url http://localhost:8000 \
+    --email "$EMAIL" --password "$PASSWORD" \
+    --path "/api/articles/?page_size=20" \
+    --path "/api/articles/?page_size=20&published=true" \
+    --path "/api/users/?page_size=20" \
+    --concurrency "$CONCURRENCY" --duration "$DURATION" \
+    --output "$OUT/$mode.json"
+  kill "$SERVER"
+  wait "$SERVER" 2>/dev/null || true
+  # runserver/gunicorn leave children behind when the shell is killed first
+  pkill -f "manage.py runserver" 2>/dev/null || true
+  pkill -f "gunicorn --config" 2>/dev/null || true
+  sleep 2
+done
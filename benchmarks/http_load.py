@@ -0,0 +1,134 @@
+"""
+Closed-loop HTTP load generator for comparing server setups on the same host.
+
+Each of --concurrency threads keeps one keep-alive connection open and sends
+requests back to back for --duration seconds, cycling through --path values.
+
+    python benchmarks/http_load.py --url http://localhost:8000 \
+        --email admin@example.com --password Admin@123 \
+        --path /api/articles/ --path /api/articles/1/ \
+        --concurrency 16 --duration 30 --output serve.json
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stats import summarize  # noqa: E402
+
+
+def login(url, email, password):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+    body = json.dumps({"email": email, "password": password})
+    connection.request(
+        "POST", "/api/login/", body, {"Content-Type": "application/json"}
+    )
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    if response.status != 200:
+        raise SystemExit(f"Login failed: {payload}")
+    return payload["payload"]["access_token"]
+
+
+def fetch(connection, path, headers):
+    connection.request("GET", path, headers=headers)
+    response = connection.getresponse()
+    response.read()
+    if response.getheader("Connection", "").lower() == "close":
+        connection.close()
+    return response.status
+
+
+def worker(url, paths, headers, deadline, results, lock):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+    latencies = []
+    errors = 0
+    index = 0
+    while time.monotonic() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            status = fetch(connection, path, headers)
+        except (OSError, http.client.HTTPException):
+            # The server may drop idle keep-alive sockets (e.g. worker recycling)
+            connection.close()
+            try:
+                status = fetch(connection, path, headers)
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+                continue
+        if status >= 400:
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+    with lock:
+        results["latencies"].extend(latencies)
+        results["errors"] += errors
+
+
+def run(url, paths, token, concurrency, duration):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    results = {"latencies": [], "errors": 0}
+    lock = threading.Lock()
+    started = time.monotonic()
+    deadline = started + duration
+    threads = [
+        threading.Thread(
+            target=worker, args=(url, paths, headers, deadline, results, lock)
+        )
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(
+        results["latencies"], time.monotonic() - started, results["errors"]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument("--token", help="JWT access token")
+    parser.add_argument("--email", help="Log in with these credentials instead")
+    parser.add_argument("--password")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    token = args.token
+    if token is None and args.email:
+        token = login(args.url, args.email, args.password)
+
+    report = {
+        "url": args.url,
+        "paths": args.paths or ["/api/articles/"],
+        "concurrency": args.concurrency,
+        **run(
+            args.url,
+            args.paths or ["/api/articles/"],
+            token,
+            args.concurrency,
+            args.duration,
+        ),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Micro-benchmark of the JSON renderers on real serializer output.
+
+Builds the response envelopes of an article list page and a comment list page
+from seeded rows (see benchmarks.suite.seed), renders each one with DRF's
+stdlib JSONRenderer and with CMS.renderers.ORJSONRenderer, and reports the
+time per render and the memory it allocates. Allocations are measured with
+tracemalloc in a separate pass, tracing would skew the timings.
+"""
+import time
+import tracemalloc
+
+from rest_framework.renderers import JSONRenderer
+
+from CMS.renderers import ORJSONRenderer
+from article.models import Article, Comment
+from article.serializers import ArticleSerializer, CommentSerializer
+from benchmarks.stats import percentile
+
+RENDERERS = {"drf_json": JSONRenderer, "orjson": ORJSONRenderer}
+
+
+def envelope(message, rows, count):
+    return {
+        "success": True,
+        "message": message,
+        "payload": {
+            "count": count,
+            "count_strategy": "exact",
+            "next": "http://testserver/api/articles/?page=2",
+            "previous": None,
+            "results": rows,
+        },
+    }
+
+
+def load_payloads(page_size):
+    """
+    Returns {name: response data} rendered by the benchmark.
+    """
+    articles = Article.objects.order_by("-id")[:page_size]
+    comments = Comment.objects.select_related("commenter").order_by("-id")[:page_size]
+    return {
+        "article_page": envelope(
+            "Articles retrieved successfully.",
+            ArticleSerializer(articles, many=True).data,
+            Article.objects.count(),
+        ),
+        "comment_page": envelope(
+            "Comments retrieved successfully.",
+            CommentSerializer(
+                comments, many=True, context={"expand": {"commenter"}}
+            ).data,
+            Comment.objects.count(),
+        ),
+    }
+
+
+def measure(renderer, data, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        content = renderer.render(data)
+        timings.append(time.perf_counter() - started)
+
+    # A fresh trace starts its peak at zero (reset_peak needs Python 3.9)
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        renderer.render(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "bytes": len(content),
+        "mean_us": round(sum(timings) / rounds * 1e6, 1),
+        "p50_us": round(percentile(timings, 0.50) * 1e6, 1),
+        "p95_us": round(percentile(timings, 0.95) * 1e6, 1),
+        "peak_alloc_kb": round((peak - baseline) / 1024, 1),
+    }
+
+
+def compare_renderers(payloads, rounds=200):
+    """
+    Returns {payload: {renderer: measurements}} plus the speedup of every
+    renderer over DRF's JSONRenderer, after checking they render the same bytes.
+    """
+    report = {}
+    for name, data in payloads.items():
+        renderers = {label: cls() for label, cls in RENDERERS.items()}
+        outputs = {
+            label: renderer.render(data) for label, renderer in renderers.items()
+        }
+        if len(set(outputs.values())) != 1:
+            raise AssertionError(f"Renderers disagree on {name}.")
+        results = {
+            label: measure(renderer, data, rounds)
+            for label, renderer in renderers.items()
+        }
+        base = results["drf_json"]["mean_us"]
+        for result in results.values():
+            result["speedup"] = round(base / result["mean_us"], 2)
+        report[name] = results
+    return report
@@ -0,0 +1,27 @@
+import math
+
+
+def percentile(samples, fraction):
+    """
+    Nearest-rank percentile of a list of samples, `fraction` in [0, 1].
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """
+    Returns throughput and latency percentiles (milliseconds) for a run.
+    """
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    }
@@ -0,0 +1,305 @@
+"""
+In-process API benchmark built from CMS.postman_collection.json.
+
+Requests from the collection become weighted endpoint templates: ids in the
+paths are replaced by ids of seeded rows and bodies are made unique where the
+API requires it. Requests are replayed through django.test.Client with the
+real JWT authentication, and every request is timed and its SQL queries
+counted. Requires a configured Django (see the benchmark_api command).
+"""
+import json
+import random
+import re
+import time
+from collections import namedtuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from article.authentication import ClaimsRefreshToken
+from article.models import Article, Comment, Role, User, build_excerpt
+from article.search import rebuild_index
+from benchmarks.stats import summarize
+
+SEED_PASSWORD = "Bench@12345"
+
+# Relative frequency of each collection request in the replayed mix.
+# Deletes are left out by default, they shrink the data set while it is measured.
+DEFAULT_WEIGHTS = {
+    "RetrieveArticles": 30,
+    "GetArticle": 25,
+    "RetrieveComments": 15,
+    "GetComment": 5,
+    "AddComment": 5,
+    "CreateArticle": 4,
+    "RetrieveUsers": 3,
+    "UpdateArticle": 3,
+    "GetUser": 2,
+    "UpdateComment": 2,
+    "PublishArticle": 2,
+    "LoginUser": 1,
+    "GenerateJWTToken": 1,
+    "RegisterUser": 1,
+    "UpdateUser": 1,
+}
+
+ID_SEGMENTS = {
+    "users": "{user_id}",
+    "articles": "{article_id}",
+    "article": "{article_id}",
+    "comments": "{comment_id}",
+}
+
+Endpoint = namedtuple("Endpoint", "name method path query body weight")
+
+
+def iter_requests(items):
+    for item in items:
+        if "item" in item:
+            yield from iter_requests(item["item"])
+        else:
+            yield item
+
+
+def path_template(raw_url):
+    """
+    Turns `http://localhost:8000/api/article/2/publish/?a=b` into
+    ("/api/articles/{article_id}/publish/", [("a", "b")]).
+    """
+    raw_url = raw_url.replace("{{local}}", "http://localhost:8000/api/")
+    parts = urlsplit(raw_url)
+    segments = parts.path.strip("/").split("/")
+    for index, segment in enumerate(segments):
+        if segment == "article":
+            segments[index] = "articles"
+        if segment.isdigit() and index and segments[index - 1] in ID_SEGMENTS:
+            segments[index] = ID_SEGMENTS[segments[index - 1]]
+    return "/" + "/".join(segments) + "/", parse_qsl(parts.query)
+
+
+def load_endpoints(collection_path, weights=None):
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    with open(collection_path) as collection_file:
+        collection = json.load(collection_file)
+
+    endpoints = []
+    for item in iter_requests(collection["item"]):
+        weight = weights.get(item["name"], 0)
+        if weight <= 0:
+            continue
+        request = item["request"]
+        url = request["url"]["raw"] if isinstance(request["url"], dict) else request["url"]
+        path, query = path_template(url)
+        raw_body = request.get("body", {}).get("raw") or ""
+        body = json.loads(raw_body) if raw_body.strip() else None
+        endpoints.append(
+            Endpoint(item["name"], request["method"], path, query, body, weight)
+        )
+    return endpoints
+
+
+def seed(users, articles, comments, batch_size=1000):
+    """
+    Bulk inserts the benchmark data set and returns the admin user.
+    Passwords share a single hash so seeding does not pay PBKDF2 per user.
+    """
+    password = make_password(SEED_PASSWORD)
+    roles = [Role.ADMIN, Role.AUTHOR, Role.VIEWER]
+    User.objects.bulk_create(
+        [
+            User(
+                username=f"benchuser{index}",
+                email=f"benchuser{index}@example.com",
+                password=password,
+                role=roles[index % len(roles)] if index else Role.ADMIN,
+                is_active=True,
+            )
+            for index in range(users)
+        ],
+        batch_size=batch_size,
+    )
+    user_ids = list(User.objects.order_by("id").values_list("id", flat=True))
+    bodies = [f"Benchmark body {index} " * 50 for index in range(articles)]
+    Article.objects.bulk_create(
+        [
+            Article(
+                title=f"Benchmark article {index}",
+                body=body,
+                excerpt=build_excerpt(body),
+                author_id=user_ids[index % len(user_ids)],
+                published=index % 2 == 0,
+            )
+            for index, body in enumerate(bodies)
+        ],
+        batch_size=batch_size,
+    )
+    for _ in rebuild_index(batch_size):
+        pass
+    article_ids = list(Article.objects.values_list("id", flat=True))
+    Comment.objects.bulk_create(
+        [
+            Comment(
+                body=f"Benchmark comment {index}",
+                article_id=article_ids[index % len(article_ids)],
+                commenter_id=user_ids[index % len(user_ids)],
+            )
+            for index in range(comments)
+        ],
+        batch_size=batch_size,
+    )
+    return User.objects.get(username="benchuser0")
+
+
+class Replayer:
+    """
+    Replays a weighted endpoint mix and collects per-endpoint samples.
+    """
+
+    def __init__(self, endpoints, admin, seed_value=0):
+        self.endpoints = endpoints
+        self.random = random.Random(seed_value)
+        self.client = Client()
+        self.admin = admin
+        self.token = str(ClaimsRefreshToken.for_user(admin).access_token)
+        self.counter = 0
+        self.ids = {
+            "user_id": list(
+                User.objects.exclude(pk=admin.pk).values_list("id", flat=True)
+            ),
+            "article_id": list(Article.objects.values_list("id", flat=True)),
+            "comment_id": list(Comment.objects.values_list("id", flat=True)),
+        }
+        self.samples = {
+            endpoint.name: {"latencies": [], "queries": [], "errors": 0}
+            for endpoint in endpoints
+        }
+
+    def build(self, endpoint):
+        self.counter += 1
+        path = endpoint.path
+        for key, ids in self.ids.items():
+            if "{%s}" % key in path:
+                value = self.random.choice(ids)
+                if endpoint.method == "DELETE":
+                    ids.remove(value)
+                path = path.replace("{%s}" % key, str(value))
+
+        query = [
+            (key, self.admin.email if "@" in value else value)
+            for key, value in endpoint.query
+        ]
+        if query:
+            path += "?" + urlencode(query)
+
+        body = dict(endpoint.body) if endpoint.body else None
+        if body and "email" in body:
+            if endpoint.name == "RegisterUser":
+                body["email"] = f"registered{self.counter}@example.com"
+            else:
+                body["email"] = self.admin.email
+        if body and "password" in body and endpoint.name != "RegisterUser":
+            body["password"] = SEED_PASSWORD
+        if body and "username" in body:
+            body["username"] = f"{body['username']}{self.counter}"
+        return path, body
+
+    def request(self, endpoint):
+        path, body = self.build(endpoint)
+        headers = {}
+        if endpoint.name not in ("RegisterUser", "LoginUser", "GenerateJWTToken"):
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {self.token}"
+        method = getattr(self.client, endpoint.method.lower())
+        kwargs = {"content_type": "application/json", **headers}
+        if body is not None:
+            kwargs["data"] = json.dumps(body)
+
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = method(path, **kwargs)
+            elapsed = time.perf_counter() - started
+
+        sample = self.samples[endpoint.name]
+        sample["latencies"].append(elapsed)
+        sample["queries"].append(len(context.captured_queries))
+        if response.status_code >= 400:
+            sample["errors"] += 1
+
+    def run(self, requests, warmup=0):
+        weights = [endpoint.weight for endpoint in self.endpoints]
+        schedule = self.random.choices(self.endpoints, weights, k=warmup + requests)
+        for endpoint in schedule[:warmup]:
+            self.request(endpoint)
+        for sample in self.samples.values():
+            sample.update(latencies=[], queries=[], errors=0)
+
+        started = time.perf_counter()
+        for endpoint in schedule[warmup:]:
+            self.request(endpoint)
+        return time.perf_counter() - started
+
+    def report(self, elapsed):
+        endpoints = {}
+        all_latencies = []
+        all_queries = []
+        errors = 0
+        for name, sample in sorted(self.samples.items()):
+            latencies = sample["latencies"]
+            if not latencies:
+                continue
+            # Single client: an endpoint's throughput is its serial capacity
+            endpoints[name] = {
+                **summarize(latencies, sum(latencies), sample["errors"]),
+                "queries_per_request": round(
+                    sum(sample["queries"]) / len(sample["queries"]), 2
+                ),
+                "queries_max": max(sample["queries"]),
+            }
+            all_latencies += latencies
+            all_queries += sample["queries"]
+            errors += sample["errors"]
+        overall = summarize(all_latencies, elapsed, errors)
+        if all_queries:
+            overall["queries_per_request"] = round(
+                sum(all_queries) / len(all_queries), 2
+            )
+        return {"overall": overall, "endpoints": endpoints}
+
+
+def compare(report, baseline, tolerance):
+    """
+    Lists endpoints whose p95 latency grew by more than `tolerance` (a ratio)
+    or whose queries per request grew at all against a baseline report.
+    """
+    regressions = []
+    for name, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        if current["queries_per_request"] > previous["queries_per_request"]:
+            regressions.append(
+                f"{name}: queries/request {previous['queries_per_request']} -> "
+                f"{current['queries_per_request']}"
+            )
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (
+            1 + tolerance
+        ):
+            regressions.append(
+                f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms"
+            )
+    return regressions
+
+
+def parse_weights(values):
+    """
+    Parses `Name=weight` overrides from the command line.
+    """
+    weights = {}
+    for value in values or []:
+        match = re.fullmatch(r"(\w+)=(\d+)", value)
+        if not match:
+            raise ValueError(f"Invalid weight {value!r}, expected Name=weight")
+        weights[match.group(1)] = int(match.group(2))
+    return weights
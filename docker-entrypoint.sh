@@ -1,4 +1,25 @@
 #!/bin/sh
+# Usage: docker-entrypoint.sh [serve|migrate|dev|worker]
+#   serve    production pre-fork server configured by gunicorn.conf.py (default)
+#   migrate  apply migrations and exit, run once per deploy, not per replica
+#   dev      single-process Django development server
+#   worker   background job worker, see article.jobs
+set -e
 
-python3 manage.py migrate
-python3 manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+case "${1:-serve}" in
+  migrate)
+    exec python3 manage.py migrate --noinput
+    ;;
+  dev)
+    exec python3 manage.py runserver 0.0.0.0:8000
+    ;;
+  worker)
+    exec python3 manage.py run_jobs
+    ;;
+  serve)
+    exec gunicorn --config gunicorn.conf.py
+    ;;
+  *)
+    exec "$@"
+    ;;
+esac
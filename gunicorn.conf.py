@@ -0,0 +1,44 @@
+"""
+Gunicorn configuration for the production serving mode.
+
+Pre-fork process model: one master process that binds the socket and forks
+GUNICORN_WORKERS worker processes. Each worker serves requests on
+GUNICORN_THREADS threads (gthread) or on an event loop (ASGI). Workers are
+recycled after GUNICORN_MAX_REQUESTS requests (plus jitter so they do not all
+restart at once), and get GUNICORN_GRACEFUL_TIMEOUT seconds to finish in-flight
+requests on reload/shutdown. See the "Production Server" section of README.md.
+"""
+import multiprocessing
+import os
+
+interface = os.environ.get("SERVER_INTERFACE", "wsgi")
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+
+if interface == "asgi":
+    wsgi_app = "CMS.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "CMS.wsgi:application"
+    worker_class = "gthread" if threads > 1 else "sync"
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(
+    os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "False").lower() == "true"
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Connections opened by a preloaded master must never be shared by workers
+    if server.cfg.preload_app:
+        from django.db import connections
+
+        connections.close_all()